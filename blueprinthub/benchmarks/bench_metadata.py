@@ -0,0 +1,56 @@
+"""Benchmark load_template_metadata over many synthetic templates.
+
+Usage: PYTHONPATH=. python benchmarks/bench_metadata.py [COUNT]
+
+Reports cold (parse), warm in-process and warm persistent-cache timings.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from blueprinthub import core
+
+METADATA = """name: bench-{i}
+description: Synthetic template {i} for benchmarking metadata loading
+tags: [python, cli, bench]
+dependencies:
+  poetry: [typer, rich, jinja2, pyyaml]
+  pip: [typer, rich, jinja2, pyyaml]
+variables:
+  name: {{default: bench_{i}, prompt: Project name}}
+  author: {{default: Anonymous, prompt: Author}}
+"""
+
+
+def _time(label: str, paths) -> None:
+    start = time.perf_counter()
+    for path in paths:
+        core.load_template_metadata(path)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<22} {elapsed * 1000:8.1f} ms  ({elapsed / len(paths) * 1e6:.1f} us/template)"
+    )
+
+
+def main(count: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(count):
+            path = Path(root) / f"bench_{i}"
+            path.mkdir()
+            (path / ".template.yml").write_text(METADATA.format(i=i))
+            paths.append(path)
+
+        cache_path = Path(root) / "metadata.marshal"
+        core._metadata_cache = core._MetadataCache(cache_path)
+        _time("cold (parse)", paths)
+        _time("warm (in-process)", paths)
+        core._metadata_cache.flush()
+        core._metadata_cache = core._MetadataCache(cache_path)
+        _time("warm (marshal cache)", paths)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
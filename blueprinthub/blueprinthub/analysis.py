@@ -0,0 +1,282 @@
+"""Find strings worth templatizing in an imported repository.
+
+Candidates come from three places: the repository name in each of its
+spellings (``to-do-app``, ``to_do_app``, ``TO_DO_APP``, ``ToDoApp``,
+``To Do App``, ``todoapp``), the authors in ``git log``, and versions
+declared in manifests (``"version": "1.2.0"``, ``version = "1.2.0"``,
+``__version__ = "1.2.0"``). Versions are read from the few manifest
+files first; then the selected files are scanned once, in parallel
+chunks, for all candidates with a single alternation regex, and each
+candidate is ranked by how many files it appears in and then by how often.
+Candidates only match as whole words, so ``app`` is neither counted nor
+replaced inside ``application``.
+
+Name spellings are mapped to Jinja expressions over one kebab-case
+``name`` variable, so a single answer renders every spelling correctly.
+"""
+
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+from git import Repo
+
+# Files larger than this are data, not code worth templatizing.
+MAX_FILE_BYTES = 1024 * 1024
+# Below this many bytes, starting a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 4 * 1024 * 1024
+CHUNK_FILES = 256
+GIT_LOG_LIMIT = 1000
+
+_WORDS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_WORD_CHAR = re.compile(r"\w")
+# Starts with a literal so the regex engine can skip ahead with a fast search.
+_VERSION_DECL = re.compile(
+    r"""version(?:"|__)?\s*[:=]\s*["'](\d+\.\d+(?:\.\d+)*(?:[-+][0-9A-Za-z.]+)?)["']"""
+)
+MANIFESTS = {
+    "package.json",
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "Cargo.toml",
+    "__init__.py",
+    "version.py",
+    "_version.py",
+    "__about__.py",
+}
+
+
+class Suggestion(NamedTuple):
+    """A string found in the repository and how it could be templatized."""
+
+    text: str
+    expression: str  # Jinja expression that renders back to text.
+    variable: str
+    default: str  # Default for the variable when the template is created.
+    kind: str  # "name", "author" or "version"
+    count: int
+    files: int
+    checked: bool  # Whether to pre-select it in the import prompt.
+
+
+def repo_name(url: str) -> str:
+    """Return the repository name from a clone URL or path."""
+    name = Path(urlparse(url).path.rstrip("/")).name
+    return name[:-4] if name.endswith(".git") else name
+
+
+def name_variants(name: str) -> Dict[str, str]:
+    """Map each common spelling of name to a Jinja expression over kebab ``name``."""
+    words = [word.lower() for word in _WORDS.findall(name)]
+    if not words:
+        return {}
+    variants: Dict[str, str] = {}
+    for text, expression in (
+        ("-".join(words), "name"),
+        ("_".join(words), "name | replace('-', '_')"),
+        ("_".join(words).upper(), "name | replace('-', '_') | upper"),
+        (
+            "".join(word.capitalize() for word in words),
+            "name | replace('-', ' ') | title | replace(' ', '')",
+        ),
+        (
+            " ".join(word.capitalize() for word in words),
+            "name | replace('-', ' ') | title",
+        ),
+        ("".join(words), "name | replace('-', '')"),
+    ):
+        variants.setdefault(text, expression)
+    return variants
+
+
+def git_authors(repo_path: Path) -> Counter:
+    """Count commits per author name in the repository's recent history."""
+    try:
+        log = Repo(repo_path).git.log("--format=%an", "-n", str(GIT_LOG_LIMIT))
+    except Exception:  # Not a git checkout, or an empty history.
+        return Counter()
+    return Counter(
+        author
+        for author in map(str.strip, log.splitlines())
+        if author and not author.endswith("[bot]")
+    )
+
+
+def _escape(literal: str) -> str:
+    # Keep "1.2.3" from matching inside "11.2.30" and "app" inside "happy".
+    pattern = re.escape(literal)
+    if literal[:1].isdigit():
+        pattern = r"(?<![\d.])" + pattern
+    elif _WORD_CHAR.match(literal[:1]):
+        pattern = r"\b" + pattern
+    if literal[-1:].isdigit():
+        pattern += r"(?!\d|\.\d)"
+    elif _WORD_CHAR.match(literal[-1:]):
+        pattern += r"\b"
+    return pattern
+
+
+@lru_cache(maxsize=8)
+def _literal_pattern(literals: Tuple[str, ...]) -> "re.Pattern":
+    # Longest first, so "to-do-app" wins over a shorter "to-do".
+    ordered = sorted(literals, key=len, reverse=True)
+    return re.compile("|".join(map(_escape, ordered)))
+
+
+def declared_versions(root: Path, rel_paths: Iterable[str]) -> Counter:
+    """Count versions declared in the manifest files among rel_paths."""
+    declared: Counter = Counter()
+    for rel_path in rel_paths:
+        if rel_path.rsplit("/", 1)[-1] not in MANIFESTS:
+            continue
+        try:
+            with open(os.path.join(root, rel_path), "rb") as file_handle:
+                text = file_handle.read(MAX_FILE_BYTES).decode(
+                    "utf-8", errors="replace"
+                )
+        except OSError:
+            continue
+        declared.update(_VERSION_DECL.findall(text))
+    return declared
+
+
+def _scan_chunk(job) -> Dict[str, Tuple[int, int]]:
+    """Count (occurrences, files) of each literal in a chunk of files."""
+    root, rel_paths, literals = job
+    pattern = _literal_pattern(literals)
+    totals: Dict[str, Tuple[int, int]] = {}
+    for rel_path in rel_paths:
+        try:
+            with open(os.path.join(root, rel_path), "rb") as file_handle:
+                data = file_handle.read(MAX_FILE_BYTES + 1)
+        except OSError:
+            continue
+        if len(data) > MAX_FILE_BYTES or b"\0" in data[:8192]:
+            continue  # Too large, or binary.
+        text = data.decode("utf-8", errors="replace")
+        for literal, count in Counter(pattern.findall(text)).items():
+            seen, spread = totals.get(literal, (0, 0))
+            totals[literal] = (seen + count, spread + 1)
+    return totals
+
+
+def scan_files(
+    root: Path,
+    rel_paths: List[str],
+    literals: Iterable[str],
+    jobs: Optional[int] = None,
+) -> Dict[str, Tuple[int, int]]:
+    """Return {literal: (occurrences, files)} over rel_paths.
+
+    The files are split into chunks that run in a process pool when there
+    is enough to read to pay for starting one.
+    """
+    literals = tuple(sorted(set(literals)))
+    if not literals:
+        return {}
+    chunks = [
+        (str(root), rel_paths[i : i + CHUNK_FILES], literals)
+        for i in range(0, len(rel_paths), CHUNK_FILES)
+    ]
+    total_bytes = 0
+    for rel_path in rel_paths:
+        try:
+            total_bytes += os.path.getsize(os.path.join(root, rel_path))
+        except OSError:
+            pass
+    if len(chunks) > 1 and total_bytes > PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = [*pool.map(_scan_chunk, chunks)]
+    else:
+        results = [_scan_chunk(chunk) for chunk in chunks]
+
+    totals: Dict[str, Tuple[int, int]] = {}
+    for chunk_totals in results:
+        for literal, (count, spread) in chunk_totals.items():
+            seen, files = totals.get(literal, (0, 0))
+            totals[literal] = (seen + count, files + spread)
+    return totals
+
+
+def suggest_variables(
+    root: Path,
+    rel_paths: List[str],
+    name: str,
+    authors: Optional[Counter] = None,
+    jobs: Optional[int] = None,
+) -> List[Suggestion]:
+    """Rank templatizable strings found in rel_paths, most widespread first."""
+    variants = name_variants(name)
+    authors = git_authors(root) if authors is None else authors
+    declared = declared_versions(root, rel_paths)
+    totals = scan_files(root, rel_paths, [*variants, *authors, *declared], jobs)
+    canonical = next(iter(variants), name)
+    top_author = authors.most_common(1)[0][0] if authors else None
+    top_version = declared.most_common(1)[0][0] if declared else None
+
+    suggestions = []
+    for text, expression in variants.items():
+        if text in totals:
+            # A lone lowercase word ("flask") is as likely an import as the name.
+            ambiguous = text == canonical and "-" not in text and text.islower()
+            suggestions.append(
+                Suggestion(
+                    text,
+                    expression,
+                    "name",
+                    canonical,
+                    "name",
+                    *totals[text],
+                    not ambiguous,
+                )
+            )
+    for author in authors:
+        if author in totals:
+            suggestions.append(
+                Suggestion(
+                    author,
+                    "author",
+                    "author",
+                    top_author,
+                    "author",
+                    *totals[author],
+                    True,
+                )
+            )
+    for version in declared:
+        if version in totals:
+            suggestions.append(
+                Suggestion(
+                    version,
+                    "version",
+                    "version",
+                    version,
+                    "version",
+                    *totals[version],
+                    version == top_version,
+                )
+            )
+    return sorted(suggestions, key=lambda s: (-s.files, -s.count, s.text))
+
+
+def templatize(content: str, mapping: Dict[str, str]) -> str:
+    """Replace every mapped string with ``{{ expression }}`` in a single pass."""
+    if not mapping:
+        return content
+    pattern = _literal_pattern(tuple(sorted(mapping)))
+    return pattern.sub(lambda match: f"{{{{ {mapping[match.group(0)]} }}}}", content)
+
+
+def guess_variable(text: str) -> Optional[str]:
+    """Guess which standard variable a string typed in by the user stands for."""
+    if re.fullmatch(r"v?\d+(\.\d+)+([-.+][0-9A-Za-z.]+)?", text):
+        return "version"
+    if "@" in text:
+        return "author"
+    return None
@@ -0,0 +1,183 @@
+"""Packed single-file template bundles for BlueprintHub.
+
+Layout: a fixed header, the file records, then a JSON index::
+
+    magic(4) version(1) pad(3) index_offset(8) index_length(8)
+    record bytes ...
+    {"files": {"rel/path": {"offset", "length", "size", "codec", "sha256"}}}
+
+Bundles are read through ``mmap``: uncompressed records are served as
+memoryview slices of the mapping, so rendering a bundle opens one file no
+matter how many templates it holds.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+import jinja2
+
+BUNDLE_SUFFIX = ".bphub"
+MAGIC = b"BPHB"
+VERSION = 1
+HEADER = struct.Struct(">4sB3xQQ")
+MIN_COMPRESS_SIZE = 512
+
+
+class BundleError(Exception):
+    """Raised when a bundle is missing, corrupt or lacks an entry."""
+
+
+def is_bundle(path: Path) -> bool:
+    """Return True if path points at a packed template bundle."""
+    return path.suffix == BUNDLE_SUFFIX and path.is_file()
+
+
+def encode_record(data: bytes, compress: bool = True) -> Tuple[bytes, Dict]:
+    """Encode file content as a stored record plus its index entry."""
+    entry = {
+        "size": len(data),
+        "codec": "raw",
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    if compress and len(data) >= MIN_COMPRESS_SIZE:
+        packed = zlib.compress(data, 6)
+        if len(packed) < len(data) * 0.9:
+            entry["codec"] = "zlib"
+            return packed, entry
+    return data, entry
+
+
+def write_records(
+    bundle_path: Path, records: Iterable[Tuple[str, Union[bytes, memoryview], Dict]]
+) -> None:
+    """Write pre-encoded records to a bundle atomically, sharing identical content."""
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", dir=bundle_path.parent)
+    files: Dict[str, Dict] = {}
+    by_digest: Dict[Tuple[str, str], Dict] = {}
+    try:
+        with os.fdopen(fd, "wb") as file_handle:
+            file_handle.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+            offset = HEADER.size
+            for name, stored, entry in records:
+                key = (entry["sha256"], entry["codec"])
+                if key not in by_digest:
+                    file_handle.write(stored)
+                    by_digest[key] = {"offset": offset, "length": len(stored)}
+                    offset += len(stored)
+                files[name] = {**entry, **by_digest[key]}
+            index = json.dumps({"files": files}, sort_keys=True).encode("utf-8")
+            file_handle.write(index)
+            file_handle.seek(0)
+            file_handle.write(HEADER.pack(MAGIC, VERSION, offset, len(index)))
+        os.replace(tmp_name, bundle_path)
+    except OSError:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def pack_template(template_path: Path, bundle_path: Path, compress: bool = True) -> int:
+    """Pack a template directory into a bundle; return the number of files."""
+    names: List[str] = []
+    for root, dirs, files in os.walk(template_path):
+        dirs[:] = sorted(d for d in dirs if d != ".git")
+        rel_root = Path(root).relative_to(template_path)
+        names += [(rel_root / name).as_posix() for name in sorted(files)]
+
+    def records():
+        for name in names:
+            with open(template_path / name, "rb") as file_handle:
+                stored, entry = encode_record(file_handle.read(), compress)
+            yield name, stored, entry
+
+    write_records(bundle_path, records())
+    return len(names)
+
+
+class Bundle:
+    """Memory-mapped, read-only view of a template bundle."""
+
+    def __init__(self, bundle_path: Path):
+        self.path = Path(bundle_path)
+        try:
+            with open(self.path, "rb") as file_handle:
+                self._mmap = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise BundleError(f"Cannot open bundle {self.path}: {e}") from e
+        self._view = memoryview(self._mmap)
+        try:
+            magic, version, index_offset, index_length = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC or version != VERSION:
+                raise BundleError(f"{self.path} is not a version {VERSION} bundle")
+            raw_index = self._view[index_offset : index_offset + index_length]
+            self.files: Dict[str, Dict] = json.loads(str(raw_index, "utf-8"))["files"]
+        except (struct.error, ValueError, KeyError) as e:
+            self.close()
+            raise BundleError(f"Corrupt bundle {self.path}: {e}") from e
+
+    def __enter__(self) -> "Bundle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory mapping."""
+        if self._view is None:
+            return
+        view, self._view = self._view, None
+        try:
+            view.release()
+            self._mmap.close()
+        except BufferError:
+            # Views returned by read() are still alive; the mapping goes with them.
+            pass
+
+    def names(self) -> List[str]:
+        """Return the relative paths stored in the bundle."""
+        return sorted(self.files)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.files
+
+    def stored(self, name: str) -> memoryview:
+        """Return the raw (possibly compressed) record for name."""
+        try:
+            entry = self.files[name]
+        except KeyError:
+            raise BundleError(f"{name} not found in {self.path}") from None
+        return self._view[entry["offset"] : entry["offset"] + entry["length"]]
+
+    def read(self, name: str) -> Union[bytes, memoryview]:
+        """Return file content; uncompressed entries are zero-copy views."""
+        record = self.stored(name)
+        if self.files[name]["codec"] == "zlib":
+            return zlib.decompress(record)
+        return record
+
+    def read_text(self, name: str) -> str:
+        """Return file content decoded as UTF-8."""
+        return str(self.read(name), "utf-8")
+
+
+class BundleLoader(jinja2.BaseLoader):
+    """Jinja loader serving template sources straight from a bundle."""
+
+    def __init__(self, bundle: Bundle):
+        self.bundle = bundle
+
+    def get_source(self, environment, template):
+        if template not in self.bundle:
+            raise jinja2.TemplateNotFound(template)
+        return self.bundle.read_text(template), None, lambda: True
+
+    def list_templates(self):
+        return self.bundle.names()
@@ -1,101 +1,250 @@
-from typing import Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import itertools
+import json
+import shutil
+import sys
+import warnings
 import typer
 import questionary
 import yaml
 from pathlib import Path
 
-from blueprinthub.templates import create_project, get_template_descriptions
-from blueprinthub.github import import_github_repo
+from blueprinthub.templates import (
+    TemplateEntry,
+    TemplateSource,
+    create_project,
+    get_template_descriptions,
+    iter_templates,
+)
+from blueprinthub.github import import_repo
+from blueprinthub.hooks import HookCache
+from blueprinthub.bundle import BUNDLE_SUFFIX, is_bundle, pack_template
+from blueprinthub.core import (
+    CACHE_DIR,
+    TEMPLATES_DIR,
+    VERSIONS_DIR,
+    BlueprintWarning,
+    console,
+    load_metadata,
+    locate_template,
+    split_template_ref,
+)
+from blueprinthub.layers import prune_resolved, resolve_template
+from blueprinthub.matrix import full_product, pairwise, run_matrix, variable_space
+from blueprinthub.models import MetadataError, TemplateMetadata, VariableSpec
+from blueprinthub.planner import plan_project
+from blueprinthub.questions import (
+    AnswerError,
+    load_answers,
+    resolve_answers,
+    template_questions,
+)
+from blueprinthub.registry import (
+    RegistryError,
+    fetch_template,
+    get_client,
+    make_server,
+)
+from blueprinthub.render_cache import RenderCache
+from blueprinthub.search import SearchIndex
+from blueprinthub.store import (
+    collect_garbage,
+    dedupe_template,
+    store_lock,
+    store_stats,
+    template_versions,
+)
+from blueprinthub.update import read_project_record, update_fleet, update_project
+from blueprinthub.watch import check_watchable, watch_template
 
 app = typer.Typer(
     help="BlueprintHub - Scalable CLI for project scaffolding and GitHub imports"
 )
+cache_app = typer.Typer(help="Inspect or clear the render-output cache")
+app.add_typer(cache_app, name="cache")
+
+
+_show_other_warning = warnings.showwarning
+
+
+def _show_warning(message, category, filename, lineno, file=None, line=None):
+    if issubclass(category, BlueprintWarning):
+        console.print(f"Warning: {message}", style="yellow")
+    else:
+        _show_other_warning(message, category, filename, lineno, file, line)
+
+
+@app.callback()
+def main():
+    """Print the library's warnings the way the CLI reports everything else."""
+    warnings.showwarning = _show_warning
+    warnings.simplefilter("always", BlueprintWarning)
+
+
+REGISTRY_OPTION = typer.Option(
+    None, "--registry", help="Template registry URL (default: $BLUEPRINTHUB_REGISTRY)"
+)
+HOOKS_OPTION = typer.Option(
+    None,
+    "--hooks/--no-hooks",
+    help="Run the template's post-render hooks (default: only for local templates)",
+)
+
+
+def _find_template(template_name: str, registry: Optional[str]) -> Path:
+    """Locate a template locally, falling back to the registry's cached bundle."""
+    template_path = locate_template(template_name)
+    if template_path is None:
+        client = get_client(registry)
+        if client is not None:
+            with client:
+                template_path = fetch_template(client, template_name)
+    if template_path is None:
+        typer.echo(f"Template '{template_name}' not found.")
+        raise typer.Exit(1)
+    return template_path
+
+
+SECTION_TITLES = {
+    TemplateSource.user: "Local Templates:",
+    TemplateSource.starter: "Starter Templates:",
+    TemplateSource.registry: "Registry Templates:",
+}
+
+
+def _iter_registry(client) -> Iterator[Tuple[TemplateEntry, TemplateMetadata]]:
+    """Yield registry templates with their index record, warning on failure."""
+    try:
+        remote = client.index()
+    except RegistryError as e:
+        typer.echo(f"Warning: {e}")
+        return
+    finally:
+        client.close()
+    for name, info in sorted(remote.items()):
+        try:
+            metadata = TemplateMetadata.from_dict(info)
+        except MetadataError as e:
+            typer.echo(f"Warning: Skipping registry template '{name}': {e}")
+            continue
+        yield TemplateEntry(
+            name, client.bundle_path(name), TemplateSource.registry
+        ), metadata
 
 
 @app.command()
-def list():
-    """List all available templates and optionally select one to create."""
-    templates = get_template_descriptions()
-    if not templates:
+def list(
+    source: Optional[TemplateSource] = typer.Option(
+        None, "--source", help="Only list templates from this source"
+    ),
+    tag: Optional[List[str]] = typer.Option(
+        None, "--tag", help="Only list templates carrying this tag (repeatable)"
+    ),
+    page: int = typer.Option(1, "--page", min=1, help="Page to show"),
+    page_size: int = typer.Option(20, "--page-size", min=1, help="Entries per page"),
+    registry: Optional[str] = REGISTRY_OPTION,
+):
+    """List available templates page by page and optionally select one to create."""
+    entries: Iterator[Tuple[TemplateEntry, Optional[TemplateMetadata]]] = (
+        (entry, None) for entry in iter_templates(source)
+    )
+    client = get_client(registry) if source in (None, TemplateSource.registry) else None
+    if client is not None:
+        entries = itertools.chain(entries, _iter_registry(client))
+
+    wanted_tags = set(tag or [])
+    skip = (page - 1) * page_size
+    shown: Dict[str, str] = {}
+    section = None
+    has_more = False
+    for entry, info in entries:
+        # Metadata is only read for entries that are filtered on or printed.
+        if wanted_tags or skip == 0:
+            info = info or load_metadata(entry.path)
+        if wanted_tags and not wanted_tags <= set(info.tags):
+            continue
+        if skip:
+            skip -= 1
+            continue
+        if len(shown) == page_size:
+            has_more = True
+            break
+        if entry.source != section:
+            section = entry.source
+            typer.echo(SECTION_TITLES[section])
+        desc = info.description
+        shown[entry.name] = desc
+        typer.echo(f"{(page - 1) * page_size + len(shown)}. {entry.name}: {desc}")
+
+    if not shown:
         typer.echo("No templates available.")
         return
+    if has_more:
+        typer.echo(f"More templates available: use --page {page + 1}")
 
-    typer.echo("Available templates:")
-    for i, (name, desc) in enumerate(templates.items(), 1):
-        typer.echo(f"{i}. {name}: {desc}")
-
-    if questionary.confirm(
-        "Would you like to create a project from one of these?"
-    ).ask():
+    if (
+        sys.stdin.isatty()
+        and questionary.confirm(
+            "Would you like to create a project from one of these?"
+        ).ask()
+    ):
         template_name = questionary.select(
-            "Select a template:", choices=[*templates.keys()]
+            "Select a template:", choices=[*shown.keys()]
         ).ask()
         if template_name:
-            run_create(template_name)  # ✅ This avoids typer.ArgumentInfo issue
+            # ✅ This avoids typer.ArgumentInfo issue
+            run_create(template_name, registry)
 
 
-def run_create(template_name: str):
-    """Helper function to create a project interactively (not CLI-exposed)."""
-    templates = get_template_descriptions()
-    if template_name not in templates:
-        typer.echo(f"Template '{template_name}' not found.")
+def _resolve_answers(
+    questions: List[VariableSpec], answers: Dict, interactive: bool
+) -> Dict:
+    """Resolve answers, exiting with a readable error if one does not fit."""
+    try:
+        return resolve_answers(questions, answers, interactive)
+    except AnswerError as e:
+        typer.echo(f"Error: {e}")
         raise typer.Exit(1)
 
-    default_project_name = template_name
-    variables = {
-        "name": questionary.text("Project name", default=default_project_name).ask(),
-        "author": questionary.text("Author name", default="Your Name").ask(),
-        "version": "0.1.0",  # Added version variable to fix template rendering
-        "dep_manager": questionary.select(
-            "Package manager", choices=["poetry", "pip", "uv"], default="poetry"
-        ).ask(),
-        "components": [],
-    }
-
-    if "fastapi" in template_name or "flask" in template_name:
-        variables["database"] = questionary.select(
-            "Database",
-            choices=["None", "SQLite", "PostgreSQL", "MySQL"],
-            default="None",
-        ).ask()
-        if questionary.confirm("Include ORM?").ask():
-            variables["orm"] = questionary.select(
-                "ORM library",
-                choices=["SQLAlchemy", "Tortoise ORM"],
-                default="SQLAlchemy",
-            ).ask()
-    elif "data_science" in template_name:
-        variables["libraries"] = questionary.checkbox(
-            "Select libraries",
-            choices=["numpy", "pandas", "matplotlib", "scikit-learn"],
-        ).ask()
-    elif "cli" in template_name:
-        variables["cli_tool"] = questionary.select(
-            "CLI framework", choices=["typer", "click"], default="typer"
-        ).ask()
 
-    if questionary.confirm("Include Docker?").ask():
-        variables["components"].append("Docker")
-    if questionary.confirm("Include CI/CD (GitHub Actions)?").ask():
-        variables["components"].append("CI/CD (GitHub Actions)")
-    extra_libs = questionary.text(
-        "Additional libraries (comma-separated, e.g., pydantic, httpx)"
-    ).ask()
-    if extra_libs:
-        variables["extra_libs"] = [lib.strip() for lib in extra_libs.split(",")]
+def _project_variables(
+    template_path: Path, answers: Dict, default_name: str
+) -> Optional[Dict]:
+    """Answer the template's questions, prompting only for what is missing."""
+    metadata = load_metadata(resolve_template(template_path))
+    questions = template_questions(metadata, {"name": default_name})
+    interactive = sys.stdin.isatty()
+    variables = _resolve_answers(questions, answers, interactive)
+    if not interactive or all(spec.name in answers for spec in questions):
+        return variables
 
     summary = yaml.dump(variables, default_flow_style=False)
     typer.echo("\nYour project configuration:")
     typer.echo(summary)
-
     if not questionary.confirm("Proceed with this configuration?").ask():
         typer.echo("Aborted.")
+        return None
+    return variables
+
+
+def run_create(template_name: str, registry: Optional[str] = None):
+    """Helper function to create a project interactively (not CLI-exposed)."""
+    template_path = _find_template(template_name, registry)
+    variables = _project_variables(
+        template_path, {}, split_template_ref(template_name)[0]
+    )
+    if variables is None:
         return
 
     output_dir = variables["name"]
     typer.echo("✓ Creating project structure...")
     create_project(
-        template_name, output_dir=Path(output_dir), variables=variables, dry_run=False
+        template_name,
+        output_dir=Path(output_dir),
+        variables=variables,
+        dry_run=False,
+        template_path=template_path,
     )
     typer.echo(f"✓ Setting up dependencies with {variables['dep_manager']}...")
     typer.echo(f"✓ Project created successfully at ./{output_dir}")
@@ -104,88 +253,395 @@ def run_create(template_name: str):
 
 @app.command()
 def create(
-    template_name: str = typer.Argument(..., help="Name of the template to use"),
+    template_name: str = typer.Argument(
+        ..., help="Name of the template to use, optionally as NAME@VERSION"
+    ),
     project_dir: Optional[str] = typer.Argument(None, help="Output directory"),
     dry_run: bool = typer.Option(
         False, "--dry-run", help="Preview without creating files"
     ),
+    registry: Optional[str] = REGISTRY_OPTION,
+    cache: bool = typer.Option(
+        True, "--cache/--no-cache", help="Reuse an identical earlier render"
+    ),
+    answers: Optional[Path] = typer.Option(
+        None,
+        "--answers",
+        help="YAML or JSON file of answers to the template's questions",
+    ),
+    var: Optional[List[str]] = typer.Option(
+        None, "--var", help="Answer one question as KEY=VALUE (repeatable)"
+    ),
+    sandbox: bool = typer.Option(
+        False, "--sandbox", help="Render in a resource-limited sandbox"
+    ),
+    hooks: Optional[bool] = HOOKS_OPTION,
 ):
-    """Create a project from a template with interactive options via CLI."""
-    templates = get_template_descriptions()
-    if template_name not in templates:
+    """Create a project from a template, prompting only for unanswered questions."""
+    template_path = _find_template(template_name, registry)
+    variables = _project_variables(
+        template_path,
+        load_answers(answers, var or []),
+        project_dir or split_template_ref(template_name)[0],
+    )
+    if variables is None:
+        return
+
+    output_dir = project_dir or variables["name"]
+    if not dry_run:
+        typer.echo("✓ Creating project structure...")
+    create_project(
+        template_name,
+        output_dir=Path(output_dir),
+        variables=variables,
+        dry_run=dry_run,
+        template_path=template_path,
+        use_cache=cache,
+        sandbox=sandbox,
+        hooks=hooks,
+    )
+    if dry_run:
+        return
+    typer.echo(f"✓ Setting up dependencies with {variables['dep_manager']}...")
+    typer.echo(f"✓ Project created successfully at ./{output_dir}")
+    typer.echo("Next steps: cd into your project and start coding!")
+
+
+@app.command()
+def plan(
+    template_name: str = typer.Argument(
+        ..., help="Name of the template to use, optionally as NAME@VERSION"
+    ),
+    project_dir: Optional[str] = typer.Argument(None, help="Output directory"),
+    registry: Optional[str] = REGISTRY_OPTION,
+    answers: Optional[Path] = typer.Option(
+        None,
+        "--answers",
+        help="YAML or JSON file of answers to the template's questions",
+    ),
+    var: Optional[List[str]] = typer.Option(
+        None, "--var", help="Answer one question as KEY=VALUE (repeatable)"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write the plan here instead of stdout"
+    ),
+    sandbox: bool = typer.Option(
+        False, "--sandbox", help="Render in a resource-limited sandbox"
+    ),
+):
+    """Print, as JSON, every file 'create' would write, without writing any."""
+    template_path = resolve_template(_find_template(template_name, registry))
+    questions = template_questions(
+        load_metadata(template_path), {"name": project_dir or template_name}
+    )
+    variables = _resolve_answers(
+        questions, load_answers(answers, var or []), interactive=False
+    )
+    result = plan_project(
+        template_path, Path(project_dir or variables["name"]), variables, sandbox
+    )
+    text = json.dumps(result, indent=2, default=str)
+    if output is not None:
+        output.write_text(text + "\n", encoding="utf-8")
+    else:
+        typer.echo(text)
+    if result["errors"]:
+        raise typer.Exit(1)
+
+
+@app.command()
+def watch(
+    template_name: str = typer.Argument(
+        ..., help="Name or directory of the template to watch"
+    ),
+    preview: Optional[Path] = typer.Option(
+        None, "--preview", help="Preview directory (default: cache/preview/<name>)"
+    ),
+    answers: Optional[Path] = typer.Option(
+        None,
+        "--answers",
+        help="YAML or JSON file of answers to the template's questions",
+    ),
+    var: Optional[List[str]] = typer.Option(
+        None, "--var", help="Answer one question as KEY=VALUE (repeatable)"
+    ),
+):
+    """Re-render a template into a preview directory whenever it changes."""
+    name = split_template_ref(template_name)[0]
+    template_path = None
+    if len(Path(template_name).parts) == 1 and template_name not in (".", ".."):
+        template_path = locate_template(template_name)
+    if template_path is None and Path(template_name).is_dir():
+        template_path = Path(template_name).resolve()
+        name = template_path.name
+    if template_path is None:
         typer.echo(f"Template '{template_name}' not found.")
         raise typer.Exit(1)
+    check_watchable(template_path)
+    questions = template_questions(load_metadata(template_path), {"name": name})
+    variables = _resolve_answers(
+        questions, load_answers(answers, var or []), interactive=False
+    )
+    watch_template(template_path, preview or CACHE_DIR / "preview" / name, variables)
 
-    default_project_name = project_dir if project_dir else template_name
-    variables = {
-        "name": questionary.text("Project name", default=default_project_name).ask(),
-        "author": questionary.text("Author name", default="Your Name").ask(),
-        "version": "0.1.0",  # Added version variable to fix template rendering
-        "dep_manager": questionary.select(
-            "Package manager", choices=["poetry", "pip", "uv"], default="poetry"
-        ).ask(),
-        "components": [],
-    }
-
-    if "fastapi" in template_name or "flask" in template_name:
-        variables["database"] = questionary.select(
-            "Database",
-            choices=["None", "SQLite", "PostgreSQL", "MySQL"],
-            default="None",
-        ).ask()
-        if questionary.confirm("Include ORM?").ask():
-            variables["orm"] = questionary.select(
-                "ORM library",
-                choices=["SQLAlchemy", "Tortoise ORM"],
-                default="SQLAlchemy",
-            ).ask()
-    elif "data_science" in template_name:
-        variables["libraries"] = questionary.checkbox(
-            "Select libraries",
-            choices=["numpy", "pandas", "matplotlib", "scikit-learn"],
-        ).ask()
-    elif "cli" in template_name:
-        variables["cli_tool"] = questionary.select(
-            "CLI framework", choices=["typer", "click"], default="typer"
-        ).ask()
 
-    if questionary.confirm("Include Docker?").ask():
-        variables["components"].append("Docker")
-    if questionary.confirm("Include CI/CD (GitHub Actions)?").ask():
-        variables["components"].append("CI/CD (GitHub Actions)")
-    extra_libs = questionary.text(
-        "Additional libraries (comma-separated, e.g., pydantic, httpx)"
-    ).ask()
-    if extra_libs:
-        variables["extra_libs"] = [lib.strip() for lib in extra_libs.split(",")]
+@app.command(name="test-template")
+def test_template(
+    template_name: str = typer.Argument(..., help="Name of the template to test"),
+    full: bool = typer.Option(
+        False, "--full/--pairwise", help="Every combination, or a pairwise subset"
+    ),
+    var: Optional[List[str]] = typer.Option(
+        None, "--var", help="Pin a variable to one value as KEY=VALUE (repeatable)"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", help="Worker processes (default: CPU count)"
+    ),
+    registry: Optional[str] = REGISTRY_OPTION,
+):
+    """Render a template across its variable combinations and validate outputs."""
+    template_path = resolve_template(_find_template(template_name, registry))
+    questions = template_questions(
+        load_metadata(template_path), {"name": template_name}
+    )
+    space = variable_space(questions)
+    for key, value in load_answers(None, var or []).items():
+        space[key] = [value]
+    combinations = full_product(space) if full else pairwise(space)
+    typer.echo(f"Rendering {len(combinations)} combinations of '{template_name}'...")
 
-    summary = yaml.dump(variables, default_flow_style=False)
-    typer.echo("\nYour project configuration:")
-    typer.echo(summary)
-    if not questionary.confirm("Proceed with this configuration?").ask():
-        typer.echo("Aborted.")
-        return
+    report = run_matrix(template_path, combinations, jobs)
+    for failure in report.failures:
+        varied = {k: v for k, v in failure.variables.items() if len(space[k]) > 1}
+        typer.echo(f"FAIL {failure.path or '<render>'}: {failure.error}")
+        typer.echo(f"     with {varied}")
+    rate = report.combinations / report.seconds if report.seconds else 0.0
+    typer.echo(
+        f"{report.combinations} combinations, {report.files} files, "
+        f"{report.bytes} bytes in {report.seconds:.2f}s "
+        f"({rate:.1f} renders/s, {report.files / (report.seconds or 1):.0f} files/s); "
+        f"{len(report.failures)} failures."
+    )
+    if report.failures:
+        raise typer.Exit(1)
 
-    output_dir = project_dir or variables["name"]
-    if dry_run:
-        typer.echo(
-            f"[Dry Run] Would create '{output_dir}' from '{template_name}' with options: {variables}"
-        )
+
+@app.command()
+def update(
+    project_dir: Path = typer.Argument(Path("."), help="Generated project to update"),
+    registry: Optional[str] = REGISTRY_OPTION,
+    hooks: Optional[bool] = HOOKS_OPTION,
+):
+    """Merge template changes into a project generated by 'create'."""
+    template_name = read_project_record(project_dir)["template_name"]
+    template_path = _find_template(template_name, registry)
+    result = update_project(project_dir, template_path, hooks=hooks)
+    if result is None:
+        typer.echo(f"{project_dir} is up to date with '{template_name}'.")
         return
+    for label, paths in (
+        ("Updated", result.updated),
+        ("Merged", result.merged),
+        ("Removed", result.removed),
+    ):
+        for path in paths:
+            typer.echo(f"{label}: {path}")
+    typer.echo(
+        f"{len(result.updated)} updated, {len(result.merged)} merged, "
+        f"{len(result.removed)} removed, {result.unchanged} unchanged."
+    )
+    if result.conflicts:
+        for path in result.conflicts:
+            typer.echo(f"Conflict: {path}")
+        typer.echo("Resolve the conflicts above, then commit the result.")
+        raise typer.Exit(1)
 
-    typer.echo("✓ Creating project structure...")
-    create_project(
-        template_name, output_dir=Path(output_dir), variables=variables, dry_run=False
+
+@app.command(name="update-all")
+def update_all(
+    projects: Optional[List[Path]] = typer.Argument(
+        None, help="Generated projects to update"
+    ),
+    projects_file: Optional[Path] = typer.Option(
+        None, "--from", help="File listing one project directory per line"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", help="Worker processes (default: CPU count)"
+    ),
+    hooks: Optional[bool] = HOOKS_OPTION,
+):
+    """Update many generated projects in parallel, without prompting."""
+    project_dirs = [*(projects or [])]
+    if projects_file is not None:
+        with open(projects_file, "r", encoding="utf-8") as file_handle:
+            project_dirs += [Path(line.strip()) for line in file_handle if line.strip()]
+    if not project_dirs:
+        typer.echo("No projects given.")
+        raise typer.Exit(1)
+
+    entries = update_fleet(project_dirs, jobs=jobs, hooks=hooks)
+    counts: Dict[str, int] = {}
+    for entry in entries:
+        counts[entry.status] = counts.get(entry.status, 0) + 1
+        line = f"{entry.status:<11} {entry.project_dir}"
+        if entry.result is not None:
+            line += (
+                f" ({len(entry.result.updated)} updated, "
+                f"{len(entry.result.merged)} merged, "
+                f"{len(entry.result.conflicts)} conflicts)"
+            )
+        if entry.error:
+            line += f": {entry.error}"
+        typer.echo(line)
+    typer.echo(
+        ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
     )
-    typer.echo(f"✓ Setting up dependencies with {variables['dep_manager']}...")
-    typer.echo(f"✓ Project created successfully at ./{output_dir}")
-    typer.echo("Next steps: cd into your project and start coding!")
+    if counts.get("conflicts") or counts.get("failed"):
+        raise typer.Exit(1)
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Words to look for"),
+    limit: int = typer.Option(10, "--limit", "-n", help="Maximum results"),
+    reindex: bool = typer.Option(
+        False, "--reindex", help="Re-read every template, not just changed ones"
+    ),
+):
+    """Search templates by name, description, tags, dependencies and contents."""
+    index = SearchIndex()
+    index.refresh(full=reindex)
+    results = index.search(query, limit=limit)
+    if not results:
+        typer.echo(f"No templates match '{query}'.")
+        return
+    for name, score, desc in results:
+        typer.echo(f"{name} ({score:.2f}): {desc}")
 
 
 @app.command(name="import")
-def import_github(github_url: str):
-    """Import a GitHub repository as a reusable template."""
-    import_github_repo(github_url)
+def import_source(
+    source: str = typer.Argument(
+        ..., help="Git remote (https://, ssh, file://), directory or tar/zip archive"
+    ),
+    include: Optional[List[str]] = typer.Option(
+        None, "--include", help="Only offer files matching this glob (repeatable)"
+    ),
+    exclude: Optional[List[str]] = typer.Option(
+        None, "--exclude", help="Never offer files matching this glob (repeatable)"
+    ),
+):
+    """Import a repository, directory or archive as a reusable template."""
+    import_repo(source, include or (), exclude or ())
+
+
+@app.command()
+def versions(
+    template_name: str = typer.Argument(..., help="Name of a local template"),
+):
+    """List the stored versions of a local template."""
+    numbers = template_versions(template_name)
+    if not numbers:
+        typer.echo(f"Template '{template_name}' has no stored versions.")
+        return
+    for number in numbers:
+        saved = datetime.fromtimestamp(
+            (VERSIONS_DIR / template_name / str(number)).stat().st_mtime
+        )
+        latest = "  (latest)" if number == numbers[-1] else ""
+        typer.echo(f"{template_name}@{number}  {saved:%Y-%m-%d %H:%M}{latest}")
+
+
+@app.command()
+def pack(
+    template_name: str = typer.Argument(..., help="Name of the template to pack"),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Bundle path (default: TEMPLATES_DIR)"
+    ),
+    compress: bool = typer.Option(True, help="zlib-compress compressible files"),
+):
+    """Pack a template into a single memory-mappable bundle file."""
+    template_path = locate_template(template_name)
+    if template_path is None:
+        typer.echo(f"Template '{template_name}' not found.")
+        raise typer.Exit(1)
+    bundle_path = output or TEMPLATES_DIR / f"{template_name}{BUNDLE_SUFFIX}"
+    count = pack_template(resolve_template(template_path), bundle_path, compress)
+    typer.echo(f"Packed {count} files into {bundle_path}")
+
+
+@app.command()
+def serve(
+    directory: Optional[Path] = typer.Option(
+        None, "--dir", help="Directory of .bphub bundles (default: pack all templates)"
+    ),
+    host: str = typer.Option("127.0.0.1", help="Interface to bind"),
+    port: int = typer.Option(8765, help="Port to listen on"),
+):
+    """Serve templates to other BlueprintHub clients as a registry."""
+    if directory is None:
+        directory = CACHE_DIR / "serve"
+        directory.mkdir(parents=True, exist_ok=True)
+        for template_name in get_template_descriptions():
+            template_path = resolve_template(locate_template(template_name))
+            bundle_path = directory / f"{template_name}{BUNDLE_SUFFIX}"
+            if is_bundle(template_path):
+                shutil.copyfile(template_path, bundle_path)
+            else:
+                pack_template(template_path, bundle_path)
+    server = make_server(directory, host, port, verbose=True)
+    typer.echo(f"Serving {directory} at http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@app.command()
+def gc():
+    """Deduplicate stored templates; remove unreferenced blobs and layer trees."""
+    # Exclusive: a blob put by a concurrent writer is unreferenced until linked.
+    with store_lock(exclusive=True):
+        converted = sum(
+            dedupe_template(template_dir)
+            for template_dir in TEMPLATES_DIR.iterdir()
+            if template_dir.is_dir() and not template_dir.name.startswith(".")
+        )
+        removed, freed = collect_garbage()
+    pruned = prune_resolved(entry.path for entry in iter_templates())
+    stats = store_stats()
+    typer.echo(f"Deduplicated {converted} files.")
+    typer.echo(f"Removed {removed} unreferenced blobs ({freed} bytes).")
+    typer.echo(f"Removed {pruned} outdated resolved layer trees.")
+    typer.echo(
+        f"Store: {stats['blobs']} blobs, {stats['stored_bytes']} bytes, "
+        f"{stats['saved_bytes']} bytes saved by sharing."
+    )
+
+
+@cache_app.command("stats")
+def cache_stats():
+    """Show render cache hits, misses and size."""
+    stats = RenderCache().stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+    typer.echo(
+        f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {hit_rate}"
+    )
+    typer.echo(
+        f"Entries: {stats['entries']}  Size: {stats['bytes']} / {stats['max_bytes']} bytes"
+    )
+
+
+@cache_app.command("clear")
+def cache_clear():
+    """Remove every cached render, hook result and resolved layer tree."""
+    RenderCache().clear()
+    HookCache().clear()
+    prune_resolved()
+    typer.echo("Render cache cleared.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""Optional component generators (Docker, CI) for BlueprintHub."""
+
+from typing import Dict, List
+
+from .models import TemplateMetadata
+
+PYTHON_VERSION = "3.10"
+CI_PYTHON_VERSIONS = ["3.10", "3.11", "3.12"]
+UV_IMAGE = "ghcr.io/astral-sh/uv:0.5.11"
+NOTEBOOK_PACKAGES = ["nbconvert", "ipykernel"]
+
+DOCKERIGNORE = """\
+.git
+.github
+.venv
+venv
+__pycache__
+*.py[cod]
+*.egg-info
+.pytest_cache
+.mypy_cache
+.ruff_cache
+.coverage
+htmlcov
+dist
+build
+.env
+Dockerfile
+.dockerignore
+"""
+
+# Per dep_manager: (manifests copied before the source tree, builder steps,
+# command installing extra packages into /app/.venv).
+_DOCKER_BUILDERS = {
+    "poetry": (
+        ["pyproject.toml", "poetry.lock*"],
+        """ENV POETRY_NO_INTERACTION=1 \\
+    POETRY_VIRTUALENVS_IN_PROJECT=1
+RUN --mount=type=cache,target=/root/.cache/pip \\
+    pip install poetry
+COPY {manifests} ./
+RUN --mount=type=cache,target=/root/.cache/pypoetry \\
+    poetry install --only main --no-root""",
+        "/app/.venv/bin/pip install",
+    ),
+    "pip": (
+        ["requirements.txt"],
+        """RUN python -m venv /app/.venv
+ENV PATH="/app/.venv/bin:$PATH"
+COPY {manifests} ./
+RUN --mount=type=cache,target=/root/.cache/pip \\
+    pip install -r requirements.txt""",
+        "pip install",
+    ),
+    "uv": (
+        ["requirements.txt"],
+        """COPY --from={uv_image} /uv /usr/local/bin/uv
+ENV UV_LINK_MODE=copy \\
+    UV_COMPILE_BYTECODE=1
+RUN uv venv /app/.venv
+COPY {manifests} ./
+RUN --mount=type=cache,target=/root/.cache/uv \\
+    uv pip install --python /app/.venv/bin/python -r requirements.txt""",
+        "uv pip install --python /app/.venv/bin/python",
+    ),
+}
+
+
+def _docker_command(variables: Dict[str, str], metadata: TemplateMetadata) -> List[str]:
+    """Return the runtime CMD for the template's main file."""
+    name = variables.get("name", "unnamed")
+    main_file = metadata.main_file
+    if main_file.endswith(".py"):
+        return ["python", f"{name}/{main_file}"]
+    if main_file.endswith(".ipynb"):
+        return [
+            "jupyter",
+            "nbconvert",
+            "--to",
+            "notebook",
+            "--execute",
+            "--stdout",
+            f"{name}/{main_file}",
+        ]
+    return ["python", "-m", name]
+
+
+def generate_dockerfile(variables: Dict[str, str], metadata: TemplateMetadata) -> str:
+    """Build a multi-stage Dockerfile with dependency layers ahead of the source."""
+    dep_manager = variables.get("dep_manager", "poetry")
+    manifests, builder_steps, installer = _DOCKER_BUILDERS.get(
+        dep_manager, _DOCKER_BUILDERS["pip"]
+    )
+    builder_steps = builder_steps.format(
+        manifests=" ".join(manifests), uv_image=UV_IMAGE
+    )
+    if metadata.main_file.endswith(".ipynb"):
+        # The notebook CMD runs jupyter nbconvert from the project venv.
+        builder_steps += f"\nRUN {installer} {' '.join(NOTEBOOK_PACKAGES)}"
+    python_version = variables.get("python_version", PYTHON_VERSION)
+    cmd = ", ".join(f'"{part}"' for part in _docker_command(variables, metadata))
+    return f"""# syntax=docker/dockerfile:1
+FROM python:{python_version}-slim AS builder
+ENV PIP_DISABLE_PIP_VERSION_CHECK=1
+WORKDIR /app
+{builder_steps}
+
+FROM python:{python_version}-slim AS runtime
+ENV PYTHONDONTWRITEBYTECODE=1 \\
+    PYTHONUNBUFFERED=1 \\
+    PATH="/app/.venv/bin:$PATH"
+WORKDIR /app
+RUN useradd --create-home --uid 1000 app
+COPY --from=builder /app/.venv /app/.venv
+COPY --chown=app:app . .
+USER app
+CMD [{cmd}]
+"""
+
+
+def generate_dockerignore(variables: Dict[str, str], metadata: TemplateMetadata) -> str:
+    """Return .dockerignore content keeping the build context small."""
+    return DOCKERIGNORE + "".join(f"{pattern}\n" for pattern in metadata.dockerignore)
+
+
+# Per dep_manager: (setup steps, dependency install command, command prefix).
+_CI_SETUP = {
+    "poetry": (
+        """      - run: pipx install poetry
+      - uses: actions/setup-python@v5
+        with:
+          python-version: ${{ matrix.python-version }}
+          cache: poetry
+          cache-dependency-path: |
+            poetry.lock
+            pyproject.toml""",
+        "poetry install --no-interaction && poetry run pip install {test_deps}",
+        "poetry run ",
+    ),
+    "pip": (
+        """      - uses: actions/setup-python@v5
+        with:
+          python-version: ${{ matrix.python-version }}
+          cache: pip
+          cache-dependency-path: requirements*.txt""",
+        "pip install -r requirements.txt {test_deps}",
+        "",
+    ),
+    "uv": (
+        """      - uses: actions/setup-python@v5
+        with:
+          python-version: ${{ matrix.python-version }}
+      - uses: astral-sh/setup-uv@v3
+        with:
+          enable-cache: true
+          cache-dependency-glob: |
+            requirements*.txt
+            uv.lock""",
+        "uv pip install --system -r requirements.txt {test_deps}",
+        "",
+    ),
+}
+
+
+def _ci_settings(variables: Dict[str, str], metadata: TemplateMetadata) -> Dict:
+    """Merge CI settings from template metadata with per-project variables."""
+    python_versions = variables.get(
+        "python_versions", metadata.ci.python_versions or CI_PYTHON_VERSIONS
+    )
+    shards = int(variables.get("test_shards", metadata.ci.shards or 1) or 1)
+    return {"python_versions": [str(v) for v in python_versions], "shards": shards}
+
+
+def generate_ci_workflow(variables: Dict[str, str], metadata: TemplateMetadata) -> str:
+    """Build a GitHub Actions workflow with dependency caching and a test matrix."""
+    dep_manager = variables.get("dep_manager", "poetry")
+    setup, install, prefix = _CI_SETUP.get(dep_manager, _CI_SETUP["pip"])
+    settings = _ci_settings(variables, metadata)
+    shards = settings["shards"]
+
+    versions = ", ".join(f'"{v}"' for v in settings["python_versions"])
+    matrix = f"        python-version: [{versions}]\n"
+    test_deps = "pytest"
+    test_cmd = f"{prefix}pytest"
+    if shards > 1:
+        groups = ", ".join(str(i) for i in range(1, shards + 1))
+        matrix += f"        shard: [{groups}]\n"
+        test_deps += " pytest-split"
+        test_cmd += f" --splits {shards} --group ${{{{ matrix.shard }}}}"
+
+    return f"""name: CI
+on:
+  push:
+  pull_request:
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    strategy:
+      fail-fast: false
+      matrix:
+{matrix}    steps:
+      - uses: actions/checkout@v4
+{setup}
+      - run: {install.format(test_deps=test_deps)}
+      - run: {test_cmd}
+"""
@@ -1,8 +1,13 @@
 """Core utilities for BlueprintHub."""
 
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+import atexit
+import copy
+import marshal
 import os
+import sys
+import warnings
 import jinja2
 import questionary
 import typer
@@ -10,40 +15,235 @@ import yaml
 from rich.console import Console
 import shutil
 
+from .bundle import BUNDLE_SUFFIX, Bundle, BundleError, BundleLoader, is_bundle
+from .components import (
+    generate_ci_workflow,
+    generate_dockerfile,
+    generate_dockerignore,
+)
+from .models import MetadataError, TemplateMetadata
+
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 STARTER_TEMPLATES_DIR = Path(__file__).parent.parent / "starter_templates"
+VERSIONS_DIR = TEMPLATES_DIR / ".versions"
+# Written into every generated project by create; never template content.
+PROJECT_STATE_NAMES = frozenset({".blueprint", ".blueprint.json"})
+CACHE_DIR = Path(
+    os.environ.get("BLUEPRINTHUB_CACHE_DIR", Path.home() / ".cache" / "blueprinthub")
+)
 console = Console()
 
 
+class BlueprintWarning(UserWarning):
+    """A problem that does not stop the current operation.
+
+    The CLI prints these in yellow; library callers can filter or record them.
+    """
+
+
+class FileRenderError(Exception):
+    """One template file could not be rendered or written."""
+
+    def __init__(self, rel_path: str, error: Exception):
+        super().__init__(f"{rel_path}: {error}")
+        self.rel_path = rel_path
+        self.error = error
+
+
+def split_template_ref(template_ref: str) -> Tuple[str, Optional[str]]:
+    """Split ``name@version`` into the template name and version (or None)."""
+    name, _, version = template_ref.partition("@")
+    return name, version or None
+
+
+def locate_template(template_name: str) -> Optional[Path]:
+    """Return the directory of a local or starter template, if it exists.
+
+    ``name@3`` resolves to stored version 3 of a local template and
+    ``name@latest`` to the current one.
+    """
+    template_name, version = split_template_ref(template_name)
+    if version is not None and version != "latest":
+        version_path = VERSIONS_DIR / template_name / version
+        return version_path if version.isdigit() and version_path.is_dir() else None
+    for base_dir in (TEMPLATES_DIR, STARTER_TEMPLATES_DIR):
+        template_path = base_dir / template_name
+        if template_path.exists():
+            return template_path
+    bundle_path = TEMPLATES_DIR / f"{template_name}{BUNDLE_SUFFIX}"
+    if bundle_path.exists():
+        return bundle_path
+    return None
+
+
+def is_local_template(template_path: Path) -> bool:
+    """Return True for user, starter and stored-version templates.
+
+    Anything else, such as a bundle fetched from a registry, came from
+    another machine, so its post-render hooks only run when asked for.
+    """
+    template_path = Path(template_path)
+    return (
+        template_path.parent in (TEMPLATES_DIR, STARTER_TEMPLATES_DIR)
+        or template_path.parent.parent == VERSIONS_DIR
+    )
+
+
+class _MetadataCache:
+    """Parsed .template.yml files, memoized in process and persisted with marshal.
+
+    Entries are keyed by absolute path and validated against the file's
+    mtime and size, so edits are picked up without explicit invalidation.
+    """
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+        self.entries: Optional[Dict[str, Tuple[int, int, Dict]]] = None
+        self.dirty = False
+
+    def _read_disk(self) -> Dict[str, Tuple[int, int, Dict]]:
+        try:
+            with open(self.cache_path, "rb") as file_handle:
+                data = marshal.load(file_handle)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if isinstance(data, dict) and data.get("python") == sys.version_info[:2]:
+            return data["entries"]
+        return {}
+
+    def get(self, key: str, mtime_ns: int, size: int) -> Optional[Dict]:
+        if self.entries is None:
+            self.entries = self._read_disk()
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+            return entry[2]
+        return None
+
+    def put(self, key: str, mtime_ns: int, size: int, metadata: Dict) -> None:
+        if self.entries is None:
+            self.entries = self._read_disk()
+        self.entries[key] = (mtime_ns, size, metadata)
+        self.dirty = True
+
+    def flush(self) -> None:
+        """Merge new entries into the on-disk cache; called at interpreter exit."""
+        if not self.dirty or self.entries is None:
+            return
+        entries = {**self._read_disk(), **self.entries}
+        try:
+            payload = marshal.dumps(
+                {"python": sys.version_info[:2], "entries": entries}
+            )
+        except ValueError:
+            # Non-plain YAML values (e.g. dates) cannot be marshalled; keep only
+            # the entries that can.
+            entries = {k: v for k, v in entries.items() if _marshallable(v)}
+            payload = marshal.dumps(
+                {"python": sys.version_info[:2], "entries": entries}
+            )
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(
+                f".{self.cache_path.name}.{os.getpid()}"
+            )
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError:
+            pass  # The cache is an optimisation; never fail the command over it.
+
+
+def _marshallable(value) -> bool:
+    try:
+        marshal.dumps(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _copy_metadata(metadata: Dict) -> Dict:
+    """Return a private deep copy so callers cannot mutate the cached object."""
+    try:
+        return marshal.loads(marshal.dumps(metadata))
+    except ValueError:
+        return copy.deepcopy(metadata)
+
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_metadata_cache = _MetadataCache(CACHE_DIR / "metadata.marshal")
+atexit.register(_metadata_cache.flush)
+_metadata_models: Dict[str, Tuple[Tuple[int, int], TemplateMetadata]] = {}
+
+
+def _read_metadata(template_path: Path) -> Tuple[str, Optional[Tuple[int, int]], Dict]:
+    """Return (cache key, stat stamp, shared parsed document) for a template."""
+    bundled = is_bundle(template_path)
+    metadata_file = template_path if bundled else template_path / ".template.yml"
+    key = os.path.abspath(metadata_file)
+    try:
+        stat = os.stat(metadata_file)
+    except OSError:
+        return key, None, {}
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _metadata_cache.get(key, *stamp)
+    if cached is not None:
+        return key, stamp, cached
+
+    try:
+        if bundled:
+            with Bundle(template_path) as bundle:
+                if ".template.yml" not in bundle:
+                    return key, stamp, {}
+                text = bundle.read_text(".template.yml")
+        else:
+            with open(metadata_file, "r", encoding="utf-8") as file_handle:
+                text = file_handle.read()
+        metadata = yaml.load(text, Loader=_YAML_LOADER) or {}
+    except (yaml.YAMLError, IOError, BundleError) as e:
+        warnings.warn(f"Failed to load {metadata_file}: {e}", BlueprintWarning)
+        return key, None, {}
+    _metadata_cache.put(key, *stamp, metadata)
+    return key, stamp, metadata
+
+
 def load_template_metadata(template_path: Path) -> Dict[str, str]:
     """Load metadata from a .template.yml file if it exists."""
-    metadata_file = template_path / ".template.yml"
+    return _copy_metadata(_read_metadata(template_path)[2])
+
+
+def load_metadata(template_path: Path) -> TemplateMetadata:
+    """Load and validate a template's metadata, memoized by file stat."""
+    key, stamp, document = _read_metadata(template_path)
+    memo = _metadata_models.get(key)
+    if stamp is not None and memo is not None and memo[0] == stamp:
+        return memo[1]
     try:
-        if metadata_file.exists():
-            with open(metadata_file, "r", encoding="utf-8") as file_handle:
-                return yaml.safe_load(file_handle) or {}
-    except (yaml.YAMLError, IOError) as e:
-        console.print(f"Warning: Failed to load {metadata_file}: {e}", style="yellow")
-    return {}
+        metadata = TemplateMetadata.from_dict(document)
+    except MetadataError as e:
+        warnings.warn(f"Invalid metadata in {key}: {e}", BlueprintWarning)
+        metadata = TemplateMetadata()
+    if stamp is not None:
+        _metadata_models[key] = (stamp, metadata)
+    return metadata
 
 
 def save_template_metadata(template_path: Path, metadata: Dict[str, str]) -> None:
-    """Save metadata to a .template.yml file."""
+    """Save metadata to a .template.yml file, atomically replacing any old one."""
     metadata_file = template_path / ".template.yml"
+    tmp_file = template_path / f".template.yml.{os.getpid()}.tmp"
     try:
-        with open(metadata_file, "w", encoding="utf-8") as file_handle:
+        with open(tmp_file, "w", encoding="utf-8") as file_handle:
             yaml.safe_dump(metadata, file_handle)
+        os.replace(tmp_file, metadata_file)
     except IOError as e:
+        if tmp_file.exists():
+            tmp_file.unlink()
         console.print(f"Error: Failed to save {metadata_file}: {e}", style="red")
         raise typer.Exit(1)
 
 
-def render_template(
-    template_path: Path, output_dir: Path, variables: Dict[str, str]
-) -> None:
-    """Render a template directory with Jinja2, handling edge cases."""
-    if not isinstance(output_dir, Path):
-        output_dir = Path(output_dir)
+def prepare_output_dir(output_dir: Path) -> None:
+    """Clear an existing output directory after the user confirms."""
     if output_dir.exists():
         if not questionary.confirm(f"Directory {output_dir} exists. Overwrite?").ask():
             console.print("Aborted.", style="yellow")
@@ -54,63 +254,112 @@ def render_template(
             console.print(f"Error: Failed to clear {output_dir}: {e}", style="red")
             raise typer.Exit(1)
 
+
+def render_template(
+    template_path: Path,
+    output_dir: Path,
+    variables: Dict[str, str],
+    bytecode_cache: Optional[jinja2.BytecodeCache] = None,
+) -> None:
+    """Render a template directory with Jinja2, handling edge cases."""
+    if not isinstance(output_dir, Path):
+        output_dir = Path(output_dir)
+    prepare_output_dir(output_dir)
+
     if not template_path.exists():
         console.print(f"Error: Template path {template_path} not found.", style="red")
         raise typer.Exit(1)
 
-    env = jinja2.Environment(
-        loader=jinja2.FileSystemLoader(template_path), undefined=jinja2.StrictUndefined
-    )
+    bundle = Bundle(template_path) if is_bundle(template_path) else None
     try:
-        for root, _, files in os.walk(template_path):
-            rel_root = Path(root).relative_to(template_path)
-            output_root = (
-                output_dir
-                if str(rel_root) == "."
-                else output_dir
-                / rel_root.with_name(
-                    variables.get("name", "unnamed")
-                    if rel_root.name == "{{ name }}"
-                    else rel_root.name
-                )
-            )
-            output_root.mkdir(parents=True, exist_ok=True)
-            for file in files:
-                if file == ".template.yml":
-                    continue
-                try:
-                    template = env.get_template(str(rel_root / file))
-                    output_file = output_root / file
-                    content = template.render(**variables)
-                    with open(output_file, "w", encoding="utf-8") as file_handle:
-                        file_handle.write(content)
-                except jinja2.TemplateError as e:
-                    console.print(f"Error rendering {file}: {e}", style="red")
-                    raise typer.Exit(1)
+        if bundle is not None:
+            loader: jinja2.BaseLoader = BundleLoader(bundle)
+            template_files = bundle.names()
+        else:
+            loader = jinja2.FileSystemLoader(template_path)
+            template_files = _walk_template_files(template_path)
+        env = jinja2.Environment(
+            loader=loader,
+            undefined=jinja2.StrictUndefined,
+            bytecode_cache=bytecode_cache,
+        )
+        _render_files(env, template_files, output_dir, variables)
+    except FileRenderError as e:
+        console.print(f"Error rendering {e.rel_path}: {e.error}", style="red")
+        raise typer.Exit(1)
     except (OSError, PermissionError) as e:
         console.print(f"Error creating files in {output_dir}: {e}", style="red")
         raise typer.Exit(1)
+    finally:
+        if bundle is not None:
+            bundle.close()
 
 
-def generate_dependency_file(
-    output_dir: Path, variables: Dict[str, str], metadata: Dict[str, str]
+def _walk_template_files(template_path: Path) -> List[str]:
+    """Return the relative POSIX paths of every file in a template directory."""
+    template_files = []
+    for root, dirs, files in os.walk(template_path):
+        rel_root = Path(root).relative_to(template_path)
+        if rel_root == Path("."):
+            dirs[:] = [d for d in dirs if d not in PROJECT_STATE_NAMES]
+            files = [f for f in files if f not in PROJECT_STATE_NAMES]
+        template_files += [(rel_root / file).as_posix() for file in files]
+    return template_files
+
+
+def _output_path(rel_path: str, output_dir: Path, variables: Dict[str, str]) -> Path:
+    """Map a template-relative path to its output path, expanding '{{ name }}'."""
+    name = variables.get("name", "unnamed")
+    parts = [name if part == "{{ name }}" else part for part in rel_path.split("/")]
+    return output_dir.joinpath(*parts)
+
+
+def _render_files(
+    env: jinja2.Environment,
+    template_files: Iterable[str],
+    output_dir: Path,
+    variables: Dict[str, str],
 ) -> None:
-    """Generate dependency file based on dep_manager, with fallback."""
+    """Render each template file through env and write it below output_dir.
+
+    Shared by every renderer that writes files; a template error or an
+    unreadable source or unwritable target is raised as FileRenderError.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    created_dirs = {output_dir}
+    for rel_path in template_files:
+        if rel_path.rsplit("/", 1)[-1] == ".template.yml":
+            continue
+        output_file = _output_path(rel_path, output_dir, variables)
+        try:
+            if output_file.parent not in created_dirs:
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(output_file.parent)
+            content = env.get_template(rel_path).render(**variables)
+            with open(output_file, "w", encoding="utf-8") as file_handle:
+                file_handle.write(content)
+        except (jinja2.TemplateError, OSError, UnicodeDecodeError) as e:
+            raise FileRenderError(rel_path, e) from e
+
+
+def dependency_file_content(
+    variables: Dict[str, str], metadata: TemplateMetadata
+) -> Optional[Tuple[str, str]]:
+    """Return (file name, content) of the dependency file for dep_manager."""
     dep_manager = variables.get("dep_manager", "poetry")
     extra_libs = variables.get("extra_libs", [])
-    base_deps = metadata.get("dependencies", {}).get(dep_manager, [])
+    base_deps = list(metadata.dependencies.get(dep_manager, ()))
     extra_libs = [
         lib for lib in extra_libs if lib and lib.strip() and lib != "none"
     ]  # Filter junk
 
-    try:
-        if dep_manager == "poetry":
-            deps = "\n".join(f'{lib} = "*"' for lib in base_deps + extra_libs)
-            orm_dep = f'{variables["orm"]} = "*"' if variables.get("orm") else ""
-            cli_dep = (
-                f'{variables["cli_tool"]} = "*"' if variables.get("cli_tool") else ""
-            )
-            content = f"""[tool.poetry]
+    if dep_manager == "poetry":
+        deps = "\n".join(f'{lib} = "*"' for lib in base_deps + extra_libs)
+        orm_dep = f'{variables["orm"]} = "*"' if variables.get("orm") else ""
+        cli_dep = f'{variables["cli_tool"]} = "*"' if variables.get("cli_tool") else ""
+        return (
+            "pyproject.toml",
+            f"""[tool.poetry]
 name = "{variables.get("name", "unnamed")}"
 version = "{variables.get("version", "0.1.0")}"
 description = ""
@@ -121,58 +370,59 @@ python = "^3.10"
 {deps}
 {orm_dep}
 {cli_dep}
-"""
-            with open(output_dir / "pyproject.toml", "w", encoding="utf-8") as f:
-                f.write(content)
-        elif dep_manager in ("pip", "uv"):
-            extras = [variables.get("orm", ""), variables.get("cli_tool", "")]
-            deps = [d for d in base_deps + extra_libs + extras if d]
-            with open(output_dir / "requirements.txt", "w", encoding="utf-8") as f:
-                f.write("\n".join(deps))
-        else:
-            console.print(
-                f"Warning: Unsupported dep_manager '{dep_manager}', skipping dependency file.",
-                style="yellow",
-            )
+""",
+        )
+    if dep_manager in ("pip", "uv"):
+        extras = [variables.get("orm", ""), variables.get("cli_tool", "")]
+        deps = [d for d in base_deps + extra_libs + extras if d]
+        return "requirements.txt", "\n".join(deps)
+    return None
+
+
+def generate_dependency_file(
+    output_dir: Path, variables: Dict[str, str], metadata: TemplateMetadata
+) -> None:
+    """Generate dependency file based on dep_manager, with fallback."""
+    dependency_file = dependency_file_content(variables, metadata)
+    if dependency_file is None:
+        console.print(
+            f"Warning: Unsupported dep_manager '{variables.get('dep_manager')}', "
+            "skipping dependency file.",
+            style="yellow",
+        )
+        return
+    try:
+        file_name, content = dependency_file
+        with open(output_dir / file_name, "w", encoding="utf-8") as f:
+            f.write(content)
     except IOError as e:
         console.print(f"Error writing dependency file: {e}", style="red")
         raise typer.Exit(1)
 
 
+def component_file_contents(
+    variables: Dict[str, str], metadata: TemplateMetadata
+) -> Dict[str, str]:
+    """Return {relative path: content} for the selected components."""
+    components = variables.get("components", [])
+    files = {}
+    if "Docker" in components:
+        files["Dockerfile"] = generate_dockerfile(variables, metadata)
+        files[".dockerignore"] = generate_dockerignore(variables, metadata)
+    if "CI/CD (GitHub Actions)" in components:
+        files[".github/workflows/ci.yml"] = generate_ci_workflow(variables, metadata)
+    return files
+
+
 def generate_component_files(
-    output_dir: Path, variables: Dict[str, str], metadata: Dict[str, str]
+    output_dir: Path, variables: Dict[str, str], metadata: TemplateMetadata
 ) -> None:
     """Generate files for selected components, with fallback."""
-    components = variables.get("components", [])
-    dep_manager = variables.get("dep_manager", "poetry")
-    main_file = metadata.get("main_file", "main.py")
-
     try:
-        if "Docker" in components:
-            cmd = f"{'poetry run python' if dep_manager == 'poetry' else 'python'} {variables.get('name', 'unnamed')}/{main_file}"
-            docker_content = f"""FROM python:3.10-slim
-COPY . /app
-WORKDIR /app
-RUN {"poetry install" if dep_manager == "poetry" else "pip install -r requirements.txt"}
-CMD ["sh", "-c", "{cmd}"]
-"""
-            with open(output_dir / "Dockerfile", "w", encoding="utf-8") as f:
-                f.write(docker_content)
-        if "CI/CD (GitHub Actions)" in components:
-            os.makedirs(output_dir / ".github/workflows", exist_ok=True)
-            with open(
-                output_dir / ".github/workflows/ci.yml", "w", encoding="utf-8"
-            ) as f:
-                f.write("""name: CI
-on: [push]
-jobs:
-  build:
-    runs-on: ubuntu-latest
-    steps:
-      - uses: actions/checkout@v3
-      - run: poetry install
-      - run: poetry run pytest
-""")
+        for rel_path, content in component_file_contents(variables, metadata).items():
+            os.makedirs((output_dir / rel_path).parent, exist_ok=True)
+            with open(output_dir / rel_path, "w", encoding="utf-8") as f:
+                f.write(content)
     except (OSError, IOError) as e:
         console.print(f"Error generating component files: {e}", style="red")
         raise typer.Exit(1)
@@ -1,59 +1,68 @@
-"""GitHub repository import functionality for BlueprintHub."""
+"""Repository import functionality for BlueprintHub."""
 
-from pathlib import Path
-import tempfile
-import shutil
-from git import Repo
+from typing import Dict, Iterable
 import questionary
 import typer
-from .core import TEMPLATES_DIR, render_template, save_template_metadata, console
+from .analysis import guess_variable, suggest_variables, templatize
+from .core import save_template_metadata, console
+from .picker import _format_size, pick_files
+from .sources import open_source
+from .store import template_transaction, write_file
 from .utils import handle_error
 
 
-def import_github_repo(github_url: str) -> None:
-    """Import a GitHub repository as a template."""
-    if (
-        not github_url.startswith(("http://", "https://"))
-        or "github.com" not in github_url
-    ):
-        console.print(
-            "Error: Invalid GitHub URL. Must be a valid GitHub repository URL.",
-            style="red",
-        )
-        raise typer.Exit(1)
-
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        tmp_path = Path(tmp_dir)
-        console.print(f"Cloning {github_url}...", style="yellow")
-        try:
-            Repo.clone_from(github_url, tmp_path, env={"GIT_ASKPASS": "false"})
-        except Exception as e:
-            handle_error(e, "Failed to clone repository")
-
-        files = [
-            str(f.relative_to(tmp_path))
-            for f in tmp_path.rglob("*")
-            if f.is_file() and ".git" not in str(f)
-        ]
-        if not files:
+def import_repo(
+    location: str, include: Iterable[str] = (), exclude: Iterable[str] = ()
+) -> None:
+    """Import a directory, archive or git repository as a template."""
+    with open_source(location) as source:
+        tree = source.tree(include, exclude)
+        if not tree.count:
             console.print("No files found in repository.", style="red")
             raise typer.Exit(1)
+        console.print(
+            f"Found {tree.count} files ({_format_size(tree.size)}).", style="yellow"
+        )
 
-        selected_files = questionary.checkbox(
-            "Select files/folders to include in the template:", choices=files
-        ).ask()
+        # Include patterns already say what to import; start with all of it picked.
+        selected_files = pick_files(tree, select_all=bool(include))
         if not selected_files:
             console.print("No files selected. Aborting.", style="red")
             raise typer.Exit(1)
+        root = source.checkout(selected_files)
 
         content_preview = {
-            file: open(tmp_path / file, "r", encoding="utf-8").read()[:200]
+            file: open(root / file, "r", encoding="utf-8", errors="replace").read(200)
             for file in selected_files[:3]
         }
         console.print("Preview of selected files:", content_preview)
 
+        console.print("Looking for strings to templatize...", style="yellow")
+        suggestions = suggest_variables(
+            root, selected_files, source.name, authors=source.authors()
+        )
+        # Original string -> Jinja expression, and variable -> default value.
+        variable_map: Dict[str, str] = {}
+        defaults: Dict[str, str] = {}
+        if suggestions:
+            chosen = questionary.checkbox(
+                "Templatize these strings?",
+                choices=[
+                    questionary.Choice(
+                        f"{s.text!r} -> {{{{ {s.expression} }}}}  "
+                        f"({s.count}x in {s.files} files)",
+                        value=s,
+                        checked=s.checked,
+                    )
+                    for s in suggestions
+                ],
+            ).ask()
+            for suggestion in chosen or []:
+                variable_map[suggestion.text] = suggestion.expression
+                defaults.setdefault(suggestion.variable, suggestion.default)
+
         variables_input = questionary.text(
-            "Enter strings to templatize (comma-separated):"
+            "Enter other strings to templatize (comma-separated):"
         ).ask()
         variables = (
             [v.strip() for v in variables_input.split(",")] if variables_input else []
@@ -61,19 +70,12 @@ def import_github_repo(github_url: str) -> None:
 
         # Map variables to standard keys
         standard_vars = ["name", "author", "version"]
-        variable_map = {}
         for var in variables:
-            if var:
+            if var and var not in variable_map:
                 mapped_var = questionary.select(
                     f"Map '{var}' to which variable?",
                     choices=standard_vars + ["custom (enter manually)"],
-                    default="name"
-                    if "to-do" in var or "app" in var
-                    else "author"
-                    if "seenu" in var
-                    else "version"
-                    if "." in var
-                    else "custom",
+                    default=guess_variable(var) or "custom (enter manually)",
                 ).ask()
                 if mapped_var == "custom (enter manually)":
                     mapped_var = (
@@ -83,45 +85,46 @@ def import_github_repo(github_url: str) -> None:
                         or var
                     )
                 variable_map[var] = mapped_var
+                defaults.setdefault(mapped_var, var)
 
         template_name = questionary.text("Enter a name for this template:").ask()
         if not template_name or not template_name.strip():
             console.print("Error: Template name cannot be empty.", style="red")
             raise typer.Exit(1)
 
-        template_path = TEMPLATES_DIR / template_name
-        try:
-            template_path.mkdir(parents=True, exist_ok=True)
-        except PermissionError:
-            console.print(
-                f"Error: No permission to write to {TEMPLATES_DIR}.", style="red"
-            )
-            raise typer.Exit(1)
-
-        name_dir = template_path / "{{ name }}"
-        name_dir.mkdir(exist_ok=True)
-
-        for file in selected_files:
-            src = tmp_path / file
-            dest = name_dir / Path(file).name
-            try:
-                with open(src, "r", encoding="utf-8") as src_file:
-                    content = src_file.read()
-                for orig_var, mapped_var in variable_map.items():
-                    content = content.replace(orig_var, f"{{{{ {mapped_var} }}}}")
-                with open(dest, "w", encoding="utf-8") as dest_file:
-                    dest_file.write(content)
-            except (IOError, UnicodeDecodeError) as e:
-                handle_error(e, f"Failed to process file {file}")
-
+        template_name = template_name.strip()
         metadata = {
             "author": questionary.text("Author name:").ask() or "Unknown",
             "description": questionary.text("Template description:").ask()
             or "No description",
-            "variables": variable_map,
+            "variables": defaults,
             "main_file": "index.html",  # Default for React, adjust if needed
+            "sandbox": True,  # Third-party content: render with resource limits
         }
-        save_template_metadata(template_path, metadata)
+
+        # Build the template aside and swap it in whole, so parallel imports
+        # and running creates never see a half-written template.
+        with template_transaction(template_name) as template_path:
+            name_dir = template_path / "{{ name }}"
+            name_dir.mkdir()
+
+            for file in selected_files:
+                src = root / file
+                dest = name_dir / file
+                try:
+                    data = src.read_bytes()
+                    try:
+                        content = data.decode("utf-8")
+                    except UnicodeDecodeError:
+                        # Templates are rendered as text; binaries would break create.
+                        console.print(f"Skipping binary file {file}.", style="yellow")
+                        continue
+                    content = templatize(content, variable_map)
+                    write_file(dest, content.encode("utf-8"))
+                except IOError as e:
+                    handle_error(e, f"Failed to process file {file}")
+
+            save_template_metadata(template_path, metadata)
         console.print(
             f"Template '{template_name}' imported successfully.", style="green"
         )
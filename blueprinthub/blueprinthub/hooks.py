@@ -0,0 +1,293 @@
+"""Post-render hooks for BlueprintHub.
+
+Templates list commands to run in the generated project::
+
+    hooks:
+      - git init
+      - name: format
+        run: black .
+        timeout: 60
+      - name: lock
+        run: [poetry, lock, --no-update]
+        after: format
+
+Hooks run in a bounded thread pool; each starts as soon as the hooks it
+runs ``after`` have succeeded, and is killed when it exceeds its timeout.
+The hook stage is cached as a whole: the key hashes the hook definitions
+and every file of the freshly rendered project, and the entry holds the
+files the hooks created, changed or deleted. Regenerating an identical
+project replays that diff instead of running the hooks again. Tool
+versions are not part of the key; use ``--no-cache`` to rerun them.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .core import CACHE_DIR, PROJECT_STATE_NAMES, console
+from .models import HookSpec
+from .render_cache import RenderCache, _clone_file
+
+HOOK_CACHE_DIR = CACHE_DIR / "hooks"
+HOOK_CACHE_VERSION = 1
+HOOK_JOBS = min(4, os.cpu_count() or 1)
+OUTPUT_TAIL = 2000
+
+
+class HookResult(NamedTuple):
+    """Outcome of one hook: ok, failed, timeout, skipped or cached."""
+
+    name: str
+    status: str
+    seconds: float
+    output: str = ""
+
+
+def _run_hook(hook: HookSpec, project_dir: Path) -> HookResult:
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            hook.run,
+            cwd=project_dir,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=hook.timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return HookResult(
+            hook.name,
+            "timeout",
+            time.perf_counter() - start,
+            f"killed after {hook.timeout:g} s",
+        )
+    except OSError as e:
+        return HookResult(hook.name, "failed", time.perf_counter() - start, str(e))
+    output = completed.stdout.decode("utf-8", errors="replace")[-OUTPUT_TAIL:]
+    status = "ok" if completed.returncode == 0 else "failed"
+    if status == "failed":
+        output = f"exit code {completed.returncode}\n{output}"
+    return HookResult(hook.name, status, time.perf_counter() - start, output)
+
+
+def run_hooks(
+    project_dir: Path, hooks: Iterable[HookSpec], jobs: Optional[int] = None
+) -> List[HookResult]:
+    """Run hooks concurrently, each once its ``after`` hooks have succeeded."""
+    pending = {hook.name: hook for hook in hooks}
+    order = [*pending]
+    results: Dict[str, HookResult] = {}
+    with ThreadPoolExecutor(max_workers=jobs or HOOK_JOBS) as pool:
+        running = {}
+        while pending or running:
+            scheduled = True
+            while scheduled:
+                scheduled = False
+                for hook in [*pending.values()]:
+                    if not all(dep in results for dep in hook.after):
+                        continue
+                    del pending[hook.name]
+                    scheduled = True
+                    if any(results[dep].status != "ok" for dep in hook.after):
+                        results[hook.name] = HookResult(
+                            hook.name, "skipped", 0.0, "a hook it runs after failed"
+                        )
+                    else:
+                        future = pool.submit(_run_hook, hook, project_dir)
+                        running[future] = hook.name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return [results[name] for name in order if name in results]
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_handle:
+        for chunk in iter(lambda: file_handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot(
+    project_dir: Path, previous: Optional[Dict[str, Tuple]] = None
+) -> Dict[str, Tuple]:
+    """Map every path under project_dir to (size, mtime_ns, mode, digest).
+
+    Directories and symlinks are included (as "dir" and "link:<target>"),
+    so replaying a diff can recreate e.g. an empty ``.git/refs``. Files
+    whose stat matches previous are not hashed again.
+    """
+    previous = previous or {}
+    state: Dict[str, Tuple] = {}
+    for root, dirs, names in os.walk(project_dir):
+        rel_root = os.path.relpath(root, project_dir)
+        if rel_root == ".":
+            rel_root = ""
+            # Written by create after the hooks run; never part of their diff.
+            dirs[:] = [d for d in dirs if d not in PROJECT_STATE_NAMES]
+            names = [n for n in names if n not in PROJECT_STATE_NAMES]
+        for name, is_dir in [(d, True) for d in dirs] + [(n, False) for n in names]:
+            path = os.path.join(root, name)
+            rel_path = f"{rel_root}/{name}" if rel_root else name
+            stat = os.lstat(path)
+            if os.path.islink(path):
+                digest = f"link:{os.readlink(path)}"
+            elif is_dir:
+                digest = "dir"
+            else:
+                old = previous.get(rel_path)
+                if old and old[:3] == (stat.st_size, stat.st_mtime_ns, stat.st_mode):
+                    digest = old[3]
+                else:
+                    digest = _hash_file(path)
+            state[rel_path] = (stat.st_size, stat.st_mtime_ns, stat.st_mode, digest)
+    return state
+
+
+def hooks_key(hooks: Iterable[HookSpec], state: Dict[str, Tuple]) -> str:
+    """Hash hook definitions and the project's content (not its mtimes)."""
+    digest = hashlib.sha256(f"v{HOOK_CACHE_VERSION}\n".encode())
+    for hook in hooks:
+        digest.update(json.dumps([hook.name, hook.run, hook.after]).encode() + b"\n")
+    for rel_path in sorted(state):
+        _, _, mode, content = state[rel_path]
+        digest.update(f"{rel_path}\0{mode:o}\0{content}\n".encode())
+    return digest.hexdigest()[:40]
+
+
+class HookCache(RenderCache):
+    """Size-bounded LRU cache of the changes a hook stage made to a project."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        super().__init__(root or HOOK_CACHE_DIR, max_bytes)
+
+    def replay(self, key: str, project_dir: Path) -> Optional[List[str]]:
+        """Apply a cached diff to project_dir; return the hook names, or None."""
+        entry = self._entry(key)
+        try:
+            info = self._read_info(entry)
+        except (OSError, ValueError):
+            self._record("misses")
+            return None
+        for rel_path in info["deleted"]:
+            target = project_dir / rel_path
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target)
+            elif target.exists() or target.is_symlink():
+                target.unlink()
+        shutil.copytree(
+            entry / "files",
+            project_dir,
+            symlinks=True,
+            copy_function=_clone_file,
+            dirs_exist_ok=True,
+        )
+        self._write_info(entry, {**info, "last_used": time.time_ns()})
+        self._record("hits")
+        return info["hooks"]
+
+    def store_diff(
+        self,
+        key: str,
+        project_dir: Path,
+        before: Dict[str, Tuple],
+        after: Dict[str, Tuple],
+        hook_names: List[str],
+    ) -> None:
+        """Save what the hooks changed between two snapshots of project_dir."""
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        changed = [
+            rel_path
+            for rel_path, state in after.items()
+            if before.get(rel_path, ())[2:] != state[2:]
+        ]
+        # Deepest first, so replay removes files before their directories.
+        deleted = sorted(set(before) - set(after), reverse=True)
+        size = sum(after[rel_path][0] for rel_path in changed)
+        if size > self.max_bytes:
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=entry.parent))
+        try:
+            files = staging / "files"
+            files.mkdir()
+            for rel_path in sorted(changed):
+                src, dest = project_dir / rel_path, files / rel_path
+                digest = after[rel_path][3]
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                if digest.startswith("link:"):
+                    os.symlink(digest[len("link:") :], dest)
+                elif digest == "dir":
+                    dest.mkdir(exist_ok=True)
+                else:
+                    _clone_file(str(src), str(dest))
+            self._write_info(
+                staging,
+                {
+                    "size": size,
+                    "last_used": time.time_ns(),
+                    "deleted": deleted,
+                    "hooks": hook_names,
+                },
+            )
+            staging.rename(entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self.evict()
+
+
+def run_post_render_hooks(
+    project_dir: Path,
+    hooks: Iterable[HookSpec],
+    use_cache: bool = True,
+    jobs: Optional[int] = None,
+) -> List[HookResult]:
+    """Run a template's hooks in project_dir, replaying a cached run if possible."""
+    hooks = [*hooks]
+    if not hooks:
+        return []
+    project_dir = Path(project_dir)
+    before = snapshot(project_dir)
+    key = hooks_key(hooks, before)
+    cache = HookCache() if use_cache else None
+    if cache is not None:
+        names = cache.replay(key, project_dir)
+        if names is not None:
+            return [HookResult(name, "cached", 0.0) for name in names]
+    results = run_hooks(project_dir, hooks, jobs)
+    if cache is not None and all(result.status == "ok" for result in results):
+        after = snapshot(project_dir, before)
+        cache.store_diff(
+            key, project_dir, before, after, [result.name for result in results]
+        )
+    return results
+
+
+def report_hooks(results: List[HookResult]) -> bool:
+    """Print one line per hook (plus output of failures); return True if all ran."""
+    ok = True
+    for result in results:
+        if result.status in ("ok", "cached"):
+            detail = (
+                "cached" if result.status == "cached" else f"{result.seconds:.1f} s"
+            )
+            console.print(f"Hook '{result.name}' done ({detail})", style="green")
+            continue
+        ok = False
+        console.print(f"Hook '{result.name}' {result.status}", style="red")
+        if result.output:
+            console.print(result.output.rstrip(), style="red", markup=False)
+    return ok
@@ -0,0 +1,212 @@
+"""Template inheritance and composition for BlueprintHub.
+
+A template may declare a base and overlays in its ``.template.yml``::
+
+    extends: python_base
+    overlays:
+      - docker_overlay
+      - ci_overlay
+
+Layers are applied base-first, then the template itself, then each overlay;
+later layers win for files with the same relative path and for scalar
+metadata keys. Layers may be directories or packed bundles. The flattened
+tree is cached under ``CACHE_DIR/resolved``, keyed by the fingerprints of
+every layer, so a composed template renders from a single directory just
+like a plain one; ``gc`` removes trees no current template resolves to.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import typer
+import yaml
+
+from .bundle import Bundle, BundleError, is_bundle
+from .core import CACHE_DIR, console, load_template_metadata, locate_template
+from .utils import fingerprint_tree
+
+RESOLVED_DIR = CACHE_DIR / "resolved"
+# Staging directories older than this were left behind by a crashed resolve.
+STALE_STAGING_SECONDS = 3600
+COMPOSITION_KEYS = ("extends", "overlays")
+
+
+class LayerError(Exception):
+    """A template's layers cannot be found or flattened."""
+
+
+def is_composed(metadata: Dict) -> bool:
+    """Return True if the metadata declares a base template or overlays."""
+    return bool(metadata.get("extends") or metadata.get("overlays"))
+
+
+def merge_metadata(base: Dict, overlay: Dict) -> Dict:
+    """Deep-merge two metadata dicts; lists are unioned, scalars overridden."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        current = merged.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merged[key] = merge_metadata(current, value)
+        elif isinstance(current, list) and isinstance(value, list):
+            merged[key] = current + [item for item in value if item not in current]
+        else:
+            merged[key] = value
+    return merged
+
+
+def _find_layer(name: str) -> Path:
+    """Locate a layer by template name or raise LayerError."""
+    layer_path = locate_template(name)
+    if layer_path is None:
+        raise LayerError(f"Template layer '{name}' not found.")
+    return layer_path
+
+
+def template_layers(
+    template_path: Path, _stack: Optional[List[Path]] = None
+) -> List[Path]:
+    """Return the ordered, de-duplicated layers that make up a template."""
+    stack = _stack or []
+    if template_path in stack:
+        chain = " -> ".join(p.name for p in stack + [template_path])
+        raise LayerError(f"Template inheritance cycle: {chain}")
+    stack = stack + [template_path]
+
+    metadata = load_template_metadata(template_path)
+    layers: List[Path] = []
+    if metadata.get("extends"):
+        layers += template_layers(_find_layer(metadata["extends"]), stack)
+    layers.append(template_path)
+    for overlay in metadata.get("overlays") or []:
+        layers += template_layers(_find_layer(overlay), stack)
+
+    unique: List[Path] = []
+    for layer in layers:
+        if layer not in unique:
+            unique.append(layer)
+    return unique
+
+
+def _layers_key(layers: List[Path]) -> str:
+    """Hash layer identities and contents into a cache key."""
+    digest = hashlib.sha256()
+    for layer in layers:
+        if is_bundle(layer):
+            stat = layer.stat()
+            fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        else:
+            fingerprint = fingerprint_tree(layer)
+        digest.update(f"{layer.resolve()}\0{fingerprint}\n".encode())
+    return digest.hexdigest()[:32]
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    """Hardlink a file into the resolved tree, copying across filesystems."""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def _build_resolved_tree(layers: List[Path], dest: Path) -> None:
+    """Flatten layers into dest, writing the merged metadata."""
+    # rel_path -> (bundle holding it, or None for a file on disk; source)
+    files: Dict[str, Tuple[Optional[Bundle], str]] = {}
+    metadata: Dict = {}
+    with ExitStack() as stack:
+        for layer in layers:
+            metadata = merge_metadata(metadata, load_template_metadata(layer))
+            if is_bundle(layer):
+                bundle = stack.enter_context(Bundle(layer))
+                for name in bundle.names():
+                    if name.rsplit("/", 1)[-1] != ".template.yml":
+                        files[name] = (bundle, name)
+                continue
+            for root, _, names in os.walk(layer):
+                rel_root = os.path.relpath(root, layer)
+                for name in names:
+                    if name != ".template.yml":
+                        rel_path = os.path.normpath(os.path.join(rel_root, name))
+                        files[rel_path] = (None, os.path.join(root, name))
+
+        for rel_path, (bundle, src) in files.items():
+            target = dest / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if bundle is None:
+                _link_or_copy(src, str(target))
+            else:
+                target.write_bytes(bundle.read(src))
+
+    for key in COMPOSITION_KEYS:
+        metadata.pop(key, None)
+    with open(dest / ".template.yml", "w", encoding="utf-8") as file_handle:
+        yaml.safe_dump(metadata, file_handle)
+
+
+def resolve_template(template_path: Path) -> Path:
+    """Return a flattened directory for a composed template, cached per layer set."""
+    try:
+        return resolve_layers(template_path)
+    except LayerError as e:
+        console.print(f"Error: {e}", style="red")
+        raise typer.Exit(1)
+
+
+def resolve_layers(template_path: Path) -> Path:
+    """Like resolve_template, but raises LayerError instead of exiting."""
+    if not is_composed(load_template_metadata(template_path)):
+        return template_path
+
+    layers = template_layers(template_path)
+    resolved_path = RESOLVED_DIR / _layers_key(layers)
+    if resolved_path.exists():
+        return resolved_path
+
+    try:
+        RESOLVED_DIR.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=RESOLVED_DIR))
+        _build_resolved_tree(layers, staging)
+        try:
+            staging.rename(resolved_path)
+        except OSError:
+            # Another process resolved the same layers first.
+            shutil.rmtree(staging, ignore_errors=True)
+    except (OSError, yaml.YAMLError, BundleError) as e:
+        raise LayerError(f"Cannot resolve template layers: {e}") from e
+    return resolved_path
+
+
+def prune_resolved(template_paths: Iterable[Path] = ()) -> int:
+    """Remove resolved trees that none of template_paths resolves to now.
+
+    With no template paths every tree is removed. Returns the number removed.
+    """
+    current = set()
+    for template_path in template_paths:
+        try:
+            if is_composed(load_template_metadata(template_path)):
+                current.add(_layers_key(template_layers(template_path)))
+        except (LayerError, OSError):
+            continue  # Nothing to keep for a template that cannot resolve.
+    if not RESOLVED_DIR.is_dir():
+        return 0
+    removed = 0
+    for entry in RESOLVED_DIR.iterdir():
+        if entry.name in current:
+            continue
+        if entry.name.startswith(".staging-"):
+            try:
+                age = time.time() - entry.stat().st_mtime
+            except OSError:
+                continue
+            if age < STALE_STAGING_SECONDS:
+                continue  # Another process is resolving right now.
+        shutil.rmtree(entry, ignore_errors=True)
+        removed += 1
+    return removed
@@ -0,0 +1,210 @@
+"""Render a template across its variable space and validate every output.
+
+The space comes from the template's questions: every choice of a select,
+both values of a bool, and for multi-select lists the empty set, each
+single choice and all choices together (every subset when there are
+three or fewer). Free-text questions keep their default. ``pairwise``
+reduces the full product to a set of combinations that still covers
+every pair of values, which is usually enough to catch interactions
+between, say, ``dep_manager`` and ``components``.
+"""
+
+import ast
+import itertools
+import json
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import jinja2
+import typer
+import yaml
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - Python 3.10
+    tomllib = None
+
+from .core import _walk_template_files
+from .models import VariableSpec
+from .planner import plan_project
+from .update import BYTECODE_DIR, render_project, warm_bytecode_cache
+
+
+class MatrixFailure(NamedTuple):
+    """One failed combination: which file (if any) and why."""
+
+    variables: Dict[str, Any]
+    path: Optional[str]
+    error: str
+
+
+class MatrixReport(NamedTuple):
+    """Aggregate outcome of a matrix run."""
+
+    combinations: int
+    files: int
+    bytes: int
+    seconds: float
+    failures: List[MatrixFailure]
+
+
+def _check_python(text: str) -> None:
+    ast.parse(text)
+
+
+def _check_yaml(text: str) -> None:
+    for _ in yaml.safe_load_all(text):
+        pass
+
+
+def _check_toml(text: str) -> None:
+    if tomllib is not None:
+        tomllib.loads(text)
+
+
+def _check_json(text: str) -> None:
+    json.loads(text)
+
+
+VALIDATORS: Dict[str, Callable[[str], None]] = {
+    ".py": _check_python,
+    ".yml": _check_yaml,
+    ".yaml": _check_yaml,
+    ".toml": _check_toml,
+    ".json": _check_json,
+}
+
+
+def _values(spec: VariableSpec) -> List[Any]:
+    """Return the values of one question that the matrix should try."""
+    if spec.type == "bool":
+        return [True, False]
+    if spec.type == "list" and spec.choices:
+        choices = [*spec.choices]
+        if len(choices) <= 3:
+            return [
+                [*subset]
+                for size in range(len(choices) + 1)
+                for subset in itertools.combinations(choices, size)
+            ]
+        return [[]] + [[choice] for choice in choices] + [choices]
+    if spec.choices:
+        return [*spec.choices]
+    return [spec.default]
+
+
+def variable_space(questions: List[VariableSpec]) -> Dict[str, List[Any]]:
+    """Map each question to the values the matrix should try."""
+    return {spec.name: _values(spec) for spec in questions}
+
+
+def full_product(space: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Return every combination of values."""
+    names = [*space]
+    return [dict(zip(names, row)) for row in itertools.product(*space.values())]
+
+
+def _pair(i: int, a: int, j: int, b: int) -> tuple:
+    """Return the (lower index, value, higher index, value) key of a pair."""
+    return (i, a, j, b) if i < j else (j, b, i, a)
+
+
+def pairwise(space: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Return a small set of combinations covering every pair of values.
+
+    Greedy all-pairs: seed each row with an uncovered pair, then give every
+    other variable the value that covers the most still-uncovered pairs.
+    """
+    names = [*space]
+    sizes = [len(space[name]) for name in names]
+    if len(names) < 2:
+        return full_product(space)
+    uncovered = {
+        (i, a, j, b)
+        for i, j in itertools.combinations(range(len(names)), 2)
+        for a in range(sizes[i])
+        for b in range(sizes[j])
+    }
+    rows = []
+    while uncovered:
+        i, a, j, b = min(uncovered)
+        row = {i: a, j: b}
+        for k in range(len(names)):
+            if k in row:
+                continue
+            row[k] = max(
+                range(sizes[k]),
+                key=lambda v: sum(_pair(k, v, m, row[m]) in uncovered for m in row),
+            )
+        uncovered -= {
+            (p, row[p], q, row[q])
+            for p, q in itertools.combinations(range(len(names)), 2)
+        }
+        rows.append({names[k]: space[names[k]][row[k]] for k in range(len(names))})
+    return rows
+
+
+def validate_tree(root: Path) -> List[MatrixFailure]:
+    """Run the syntax validator matching each file's extension."""
+    failures = []
+    for rel_path in sorted(_walk_template_files(root)):
+        validator = VALIDATORS.get(Path(rel_path).suffix)
+        if validator is None:
+            continue
+        try:
+            validator((root / rel_path).read_text(encoding="utf-8"))
+        except Exception as e:  # Each validator raises its own error type.
+            failures.append(MatrixFailure({}, rel_path, f"{type(e).__name__}: {e}"))
+    return failures
+
+
+def _render_combination(job) -> tuple:
+    """Render and validate one combination inside a pool worker."""
+    template_path, variables, bytecode_dir = job
+    bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_dir)
+    with tempfile.TemporaryDirectory(prefix="blueprinthub-matrix-") as tmp_dir:
+        output_dir = Path(tmp_dir) / "out"
+        try:
+            render_project(template_path, output_dir, variables, bytecode_cache)
+        except typer.Exit:
+            errors = plan_project(template_path, output_dir, variables)["errors"]
+            failures = [
+                MatrixFailure(variables, error["source"], error["error"])
+                for error in errors
+            ] or [MatrixFailure(variables, None, "rendering failed")]
+            return failures, 0, 0
+        except Exception as e:  # One broken combination must not stop the run.
+            return [MatrixFailure(variables, None, f"{type(e).__name__}: {e}")], 0, 0
+        failures = [
+            failure._replace(variables=variables)
+            for failure in validate_tree(output_dir)
+        ]
+        paths = [p for p in output_dir.rglob("*") if p.is_file()]
+        return failures, len(paths), sum(p.stat().st_size for p in paths)
+
+
+def run_matrix(
+    template_path: Path,
+    combinations: List[Dict[str, Any]],
+    jobs: Optional[int] = None,
+) -> MatrixReport:
+    """Render every combination in a process pool sharing compiled templates."""
+    BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+    warm_bytecode_cache(
+        template_path, jinja2.FileSystemBytecodeCache(str(BYTECODE_DIR))
+    )
+    start = time.perf_counter()
+    failures: List[MatrixFailure] = []
+    files = size = 0
+    plan = [(template_path, variables, str(BYTECODE_DIR)) for variables in combinations]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for found, count, total in pool.map(_render_combination, plan, chunksize=8):
+            failures += found
+            files += count
+            size += total
+    return MatrixReport(
+        len(combinations), files, size, time.perf_counter() - start, failures
+    )
@@ -0,0 +1,250 @@
+"""Typed template metadata for BlueprintHub.
+
+``.template.yml`` is validated once, when it is loaded, into frozen
+slots dataclasses; the render pipeline then reads attributes instead of
+probing nested dicts with ``.get()`` fallbacks.
+
+Variables may be declared in three shapes::
+
+    variables:            # 1. full spec
+      name: {default: myapp, description: "Project name", choices: [...]}
+    variables:            # 2. bare defaults, as saved by the wizard
+      name: myapp
+      components: [Docker]
+    variables: [name, author]   # 3. names only, no defaults
+"""
+
+import shlex
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+DEFAULT_DESCRIPTION = "No description available"
+DEFAULT_MAIN_FILE = "main.py"
+VARIABLE_TYPES = ("str", "list", "bool", "int")
+DEFAULT_HOOK_TIMEOUT = 300.0
+_SPEC_KEYS = {"default", "description", "prompt", "choices", "type"}
+
+
+class MetadataError(ValueError):
+    """Raised when a .template.yml does not match the metadata schema."""
+
+
+def _scalar(value: Any, where: str) -> str:
+    if isinstance(value, (dict, list)):
+        raise MetadataError(f"{where}: expected a string, got {type(value).__name__}")
+    return "" if value is None else str(value)
+
+
+def _strings(value: Any, where: str) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    if not isinstance(value, list):
+        raise MetadataError(f"{where}: expected a list, got {type(value).__name__}")
+    return tuple(_scalar(item, f"{where}[{i}]") for i, item in enumerate(value))
+
+
+def _mapping(value: Any, where: str) -> Dict:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise MetadataError(f"{where}: expected a mapping, got {type(value).__name__}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class VariableSpec:
+    """One template variable and how to ask for it."""
+
+    name: str
+    default: Any = None
+    description: str = ""
+    choices: Tuple[str, ...] = ()
+    type: str = "str"
+
+    @classmethod
+    def from_value(cls, name: str, value: Any) -> "VariableSpec":
+        """Build a spec from either a full mapping or a bare default value."""
+        where = f"variables.{name}"
+        if isinstance(value, dict) and value and set(value) <= _SPEC_KEYS:
+            var_type = _scalar(value.get("type", "str"), f"{where}.type")
+            if var_type not in VARIABLE_TYPES:
+                raise MetadataError(
+                    f"{where}.type: must be one of {', '.join(VARIABLE_TYPES)}"
+                )
+            choices = _strings(value.get("choices"), f"{where}.choices")
+            default = value.get("default")
+            if choices and default is not None and var_type != "list":
+                if str(default) not in choices:
+                    raise MetadataError(f"{where}.default: {default!r} not in choices")
+            return cls(
+                name,
+                default,
+                _scalar(value.get("description", value.get("prompt")), where),
+                choices,
+                var_type,
+            )
+        if isinstance(value, list):
+            return cls(name, value, type="list")
+        if isinstance(value, bool):
+            return cls(name, value, type="bool")
+        return cls(name, value)
+
+
+@dataclass(frozen=True, slots=True)
+class CISettings:
+    """CI matrix settings; None means "use the generator default"."""
+
+    python_versions: Optional[Tuple[str, ...]] = None
+    shards: Optional[int] = None
+
+    @classmethod
+    def from_value(cls, value: Any) -> "CISettings":
+        ci = _mapping(value, "ci")
+        versions = ci.get("python_versions")
+        shards = ci.get("shards")
+        if shards is not None and (
+            isinstance(shards, bool) or not isinstance(shards, int) or shards < 1
+        ):
+            raise MetadataError("ci.shards: expected a positive integer")
+        return cls(
+            None if versions is None else _strings(versions, "ci.python_versions"),
+            shards,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class HookSpec:
+    """A command run in the generated project after it is rendered."""
+
+    name: str
+    run: Tuple[str, ...]
+    after: Tuple[str, ...] = ()
+    timeout: float = DEFAULT_HOOK_TIMEOUT
+
+    @classmethod
+    def from_value(cls, value: Any, index: int) -> "HookSpec":
+        """Build a hook from a mapping, a command string or an argument list."""
+        where = f"hooks[{index}]"
+        if isinstance(value, (str, list)):
+            value = {"run": value}
+        value = _mapping(value, where)
+        command = value.get("run")
+        if isinstance(command, str):
+            run = tuple(shlex.split(command))
+        else:
+            run = _strings(command, f"{where}.run")
+        if not run:
+            raise MetadataError(f"{where}.run: expected a command")
+        timeout = value.get("timeout", DEFAULT_HOOK_TIMEOUT)
+        if (
+            isinstance(timeout, bool)
+            or not isinstance(timeout, (int, float))
+            or timeout <= 0
+        ):
+            raise MetadataError(f"{where}.timeout: expected a positive number")
+        after = value.get("after")
+        return cls(
+            _scalar(value.get("name"), f"{where}.name") or run[0],
+            run,
+            _strings([after] if isinstance(after, str) else after, f"{where}.after"),
+            float(timeout),
+        )
+
+
+def _hooks(value: Any) -> Tuple[HookSpec, ...]:
+    """Validate the hooks list: unique names, known and acyclic ``after``."""
+    if value is None:
+        return ()
+    if not isinstance(value, list):
+        raise MetadataError(f"hooks: expected a list, got {type(value).__name__}")
+    hooks = tuple(HookSpec.from_value(item, i) for i, item in enumerate(value))
+    names = set()
+    for hook in hooks:
+        if hook.name in names:
+            raise MetadataError(f"hooks: duplicate name {hook.name!r}; name each hook")
+        names.add(hook.name)
+    for hook in hooks:
+        for dep in hook.after:
+            if dep not in names:
+                raise MetadataError(f"hooks.{hook.name}.after: no hook named {dep!r}")
+    ordered: set = set()
+    while len(ordered) < len(hooks):
+        ready = {
+            hook.name
+            for hook in hooks
+            if hook.name not in ordered and set(hook.after) <= ordered
+        }
+        if not ready:
+            raise MetadataError("hooks: 'after' dependencies form a cycle")
+        ordered |= ready
+    return hooks
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateMetadata:
+    """Validated contents of a template's .template.yml."""
+
+    name: str = ""
+    description: str = DEFAULT_DESCRIPTION
+    tags: Tuple[str, ...] = ()
+    dependencies: Mapping[str, Tuple[str, ...]] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    variables: Mapping[str, VariableSpec] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    main_file: str = DEFAULT_MAIN_FILE
+    dockerignore: Tuple[str, ...] = ()
+    ci: CISettings = CISettings()
+    extends: Optional[str] = None
+    overlays: Tuple[str, ...] = ()
+    hooks: Tuple[HookSpec, ...] = ()
+    # Untrusted (e.g. imported) templates render in the sandbox, without hooks.
+    sandbox: bool = False
+    # The document as loaded, for keys the model does not cover; read-only.
+    raw: Mapping[str, Any] = field(
+        default_factory=lambda: MappingProxyType({}), compare=False, repr=False
+    )
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "TemplateMetadata":
+        """Validate a parsed .template.yml document; raise MetadataError if invalid."""
+        data = _mapping(data, "metadata")
+
+        dependencies = {
+            str(manager): _strings(deps, f"dependencies.{manager}")
+            for manager, deps in _mapping(
+                data.get("dependencies"), "dependencies"
+            ).items()
+        }
+
+        declared = data.get("variables")
+        if isinstance(declared, list):
+            declared = {_scalar(name, "variables"): None for name in declared}
+        variables = {
+            str(name): VariableSpec.from_value(str(name), value)
+            for name, value in _mapping(declared, "variables").items()
+        }
+
+        extends = data.get("extends")
+        return cls(
+            name=_scalar(data.get("name"), "name"),
+            description=_scalar(data.get("description"), "description")
+            or DEFAULT_DESCRIPTION,
+            tags=_strings(data.get("tags"), "tags"),
+            dependencies=MappingProxyType(dependencies),
+            variables=MappingProxyType(variables),
+            main_file=_scalar(data.get("main_file"), "main_file") or DEFAULT_MAIN_FILE,
+            dockerignore=_strings(data.get("dockerignore"), "dockerignore"),
+            ci=CISettings.from_value(data.get("ci")),
+            extends=None if extends is None else _scalar(extends, "extends"),
+            overlays=_strings(data.get("overlays"), "overlays"),
+            hooks=_hooks(data.get("hooks")),
+            sandbox=bool(data.get("sandbox", False)),
+            raw=MappingProxyType(data),
+        )
+
+    def defaults(self) -> Dict[str, Any]:
+        """Return the default value of every declared variable."""
+        return {name: spec.default for name, spec in self.variables.items()}
@@ -0,0 +1,370 @@
+"""Directory-tree file picker for repository imports.
+
+``scan_tree`` walks a checkout once with ``os.scandir``, honouring every
+``.gitignore`` on the way down plus ``--include``/``--exclude`` globs, and
+records the size and file count of each directory. ``pick_files`` then
+lets the user browse that tree one directory at a time: only the current
+directory's entries are turned into prompt choices, so opening the picker
+costs the same for a ten-file repository as for a hundred-thousand-file one.
+
+Patterns follow ``.gitignore`` rules: a pattern without a slash matches a
+name at any depth, one with a slash is anchored, ``**`` spans directories,
+a trailing ``/`` matches directories only and ``!`` re-includes.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import questionary
+
+
+class GlobRule(NamedTuple):
+    """One compiled gitignore-style pattern."""
+
+    regex: "re.Pattern"
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a glob into a regex where ``*`` stops at ``/`` and ``**`` does not."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif char == "*":
+            out.append("[^/]*")
+            i += 1
+        elif char == "?":
+            out.append("[^/]")
+            i += 1
+        elif char == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            chars = pattern[i + 1 : end]
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            out.append(f"[{chars}]")
+            i = end + 1
+        else:
+            if char == "\\" and i + 1 < len(pattern):
+                i += 1
+                char = pattern[i]
+            out.append(re.escape(char))
+            i += 1
+    return "".join(out)
+
+
+def compile_pattern(pattern: str, base: str = "") -> Optional[GlobRule]:
+    """Compile a gitignore-style pattern relative to directory base ("" = root)."""
+    pattern = pattern.rstrip()
+    if not pattern or pattern.startswith("#"):
+        return None
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+    anchored = "/" in pattern
+    prefix = re.escape(base + "/") if base else ""
+    body = _translate(pattern.lstrip("/"))
+    regex = prefix + body if anchored else prefix + "(?:.*/)?" + body
+    return GlobRule(re.compile(regex + r"\Z"), negate, dir_only)
+
+
+def _matches(rules: List[GlobRule], rel_path: str, is_dir: bool) -> bool:
+    """Return whether the last rule matching rel_path is a positive one."""
+    matched = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.regex.match(rel_path):
+            matched = not rule.negate
+    return matched
+
+
+def parse_ignore(text: str, base: str = "") -> List[GlobRule]:
+    """Compile the patterns of a .gitignore found in directory base."""
+    rules = (compile_pattern(line, base) for line in text.splitlines())
+    return [rule for rule in rules if rule]
+
+
+def _gitignore_rules(directory: Path, base: str) -> List[GlobRule]:
+    try:
+        with open(directory / ".gitignore", "r", encoding="utf-8") as file_handle:
+            return parse_ignore(file_handle.read(), base)
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return ""  # pragma: no cover
+
+
+class TreeNode:
+    """A directory of the picker tree with aggregate size and file count."""
+
+    __slots__ = ("path", "parent", "dirs", "files", "size", "count", "selected")
+
+    def __init__(self, path: str = "", parent: Optional["TreeNode"] = None):
+        self.path = path  # Relative POSIX path; "" for the root.
+        self.parent = parent
+        self.dirs: Dict[str, TreeNode] = {}
+        self.files: Dict[str, int] = {}  # name -> size in bytes
+        self.size = 0
+        self.count = 0
+        self.selected = 0  # Selected files in this subtree.
+
+    def child_path(self, name: str) -> str:
+        return f"{self.path}/{name}" if self.path else name
+
+    def iter_files(self) -> Iterator[str]:
+        """Yield the relative path of every file in this subtree."""
+        for name in self.files:
+            yield self.child_path(name)
+        for child in self.dirs.values():
+            yield from child.iter_files()
+
+
+def scan_tree(
+    root: Path, include: Iterable[str] = (), exclude: Iterable[str] = ()
+) -> TreeNode:
+    """Walk root once into a TreeNode, skipping .git, ignored and excluded paths.
+
+    With include patterns, only files matching one (or inside a matching
+    directory) are kept; directories left empty are dropped.
+    """
+    include_rules = [rule for rule in map(compile_pattern, include) if rule]
+    exclude_rules = [rule for rule in map(compile_pattern, exclude) if rule]
+
+    def scan(directory: Path, node: TreeNode, rules: List[GlobRule], included: bool):
+        rules = rules + _gitignore_rules(directory, node.path)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name == ".git":
+                continue
+            rel_path = node.child_path(entry.name)
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file(follow_symlinks=False):
+                    continue  # Symlinks, sockets and the like are not imported.
+                if _matches(rules, rel_path, is_dir) or _matches(
+                    exclude_rules, rel_path, is_dir
+                ):
+                    continue
+                if is_dir:
+                    child = TreeNode(rel_path, node)
+                    scan(
+                        Path(entry.path),
+                        child,
+                        rules,
+                        included or _matches(include_rules, rel_path, True),
+                    )
+                    if child.count:
+                        node.dirs[entry.name] = child
+                        node.size += child.size
+                        node.count += child.count
+                    continue
+                if (
+                    include_rules
+                    and not included
+                    and not _matches(include_rules, rel_path, False)
+                ):
+                    continue
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            node.files[entry.name] = size
+            node.size += size
+            node.count += 1
+
+    tree = TreeNode()
+    scan(Path(root), tree, [], not include_rules)
+    return tree
+
+
+def tree_from_entries(
+    entries: Iterable[Tuple[str, int]],
+    gitignores: Optional[Dict[str, str]] = None,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+) -> TreeNode:
+    """Build a TreeNode from (relative path, size) pairs, such as an archive listing.
+
+    gitignores maps a directory ("" for the root) to the text of its
+    .gitignore; filtering matches scan_tree.
+    """
+    include_rules = [rule for rule in map(compile_pattern, include) if rule]
+    exclude_rules = [rule for rule in map(compile_pattern, exclude) if rule]
+    ignore_rules = {
+        base: parse_ignore(text, base) for base, text in (gitignores or {}).items()
+    }
+    tree = TreeNode()
+    for rel_path, size in sorted(entries):
+        *dirs, name = rel_path.split("/")
+        if ".git" in dirs or name == ".git":
+            continue
+        rules = ignore_rules.get("", [])
+        included = not include_rules
+        skip = False
+        for depth in range(len(dirs)):
+            dir_path = "/".join(dirs[: depth + 1])
+            if _matches(rules, dir_path, True) or _matches(
+                exclude_rules, dir_path, True
+            ):
+                skip = True
+                break
+            included = included or _matches(include_rules, dir_path, True)
+            rules = rules + ignore_rules.get(dir_path, [])
+        if (
+            skip
+            or _matches(rules, rel_path, False)
+            or _matches(exclude_rules, rel_path, False)
+            or not (included or _matches(include_rules, rel_path, False))
+        ):
+            continue
+        node = tree
+        node.size += size
+        node.count += 1
+        for part in dirs:
+            if part not in node.dirs:
+                node.dirs[part] = TreeNode(node.child_path(part), node)
+            node = node.dirs[part]
+            node.size += size
+            node.count += 1
+        node.files[name] = size
+    return tree
+
+
+class TreePicker:
+    """Selection state over a TreeNode, browsed one directory at a time."""
+
+    def __init__(self, tree: TreeNode, select_all: bool = False):
+        self.tree = tree
+        self.selected: Dict[str, int] = {}  # relative path -> size
+        if select_all:
+            self.set_dir(tree, True)
+
+    @property
+    def selected_size(self) -> int:
+        return sum(self.selected.values())
+
+    def _bump(self, node: Optional[TreeNode], delta: int) -> None:
+        while node is not None:
+            node.selected += delta
+            node = node.parent
+
+    def toggle_file(self, node: TreeNode, name: str) -> None:
+        rel_path = node.child_path(name)
+        if self.selected.pop(rel_path, None) is not None:
+            self._bump(node, -1)
+        else:
+            self.selected[rel_path] = node.files[name]
+            self._bump(node, 1)
+
+    def set_dir(self, node: TreeNode, on: bool) -> None:
+        """Select or clear every file below node."""
+        before = node.selected
+        self._set_subtree(node, on)
+        self._bump(node.parent, node.selected - before)
+
+    def _set_subtree(self, node: TreeNode, on: bool) -> None:
+        for name, size in node.files.items():
+            if on:
+                self.selected[node.child_path(name)] = size
+            else:
+                self.selected.pop(node.child_path(name), None)
+        for child in node.dirs.values():
+            self._set_subtree(child, on)
+        node.selected = node.count if on else 0
+
+    @staticmethod
+    def _mark(selected: int, total: int) -> str:
+        return "[x]" if selected == total else "[ ]" if not selected else "[-]"
+
+    def choices(self, node: TreeNode) -> List[questionary.Choice]:
+        """Build the prompt entries for one directory."""
+        summary = f"{len(self.selected)} files, {_format_size(self.selected_size)}"
+        choices = [questionary.Choice(f"Done ({summary} selected)", ("done", None))]
+        if node.parent is not None:
+            choices.append(questionary.Choice(".. (up)", ("up", None)))
+        if node.selected < node.count:
+            choices.append(questionary.Choice("Select everything here", ("all", None)))
+        if node.selected:
+            choices.append(questionary.Choice("Clear everything here", ("none", None)))
+        for name, child in node.dirs.items():
+            choices.append(
+                questionary.Choice(
+                    f"{self._mark(child.selected, child.count)} {name}/  "
+                    f"({child.count} files, {_format_size(child.size)})",
+                    ("dir", name),
+                )
+            )
+        for name, size in node.files.items():
+            mark = "[x]" if node.child_path(name) in self.selected else "[ ]"
+            choices.append(
+                questionary.Choice(
+                    f"{mark} {name}  ({_format_size(size)})", ("file", name)
+                )
+            )
+        return choices
+
+
+def _select(message: str, choices: List[questionary.Choice]) -> Any:
+    return questionary.select(message, choices=choices).ask()
+
+
+def pick_files(
+    tree: TreeNode,
+    select_all: bool = False,
+    prompt: Callable[[str, List[questionary.Choice]], Any] = _select,
+) -> List[str]:
+    """Let the user browse the tree and return the selected relative paths.
+
+    Entering a directory lists only its own entries; files toggle in place
+    and directories can be selected or cleared as a whole. Returns an empty
+    list if the prompt is cancelled.
+    """
+    picker = TreePicker(tree, select_all)
+    node = tree
+    while True:
+        answer = prompt(f"Select files to include: /{node.path}", picker.choices(node))
+        if answer is None:
+            return []
+        action, name = answer
+        if action == "done":
+            return sorted(picker.selected)
+        if action == "up":
+            node = node.parent
+        elif action == "dir":
+            node = node.dirs[name]
+        elif action == "file":
+            picker.toggle_file(node, name)
+        else:
+            picker.set_dir(node, action == "all")
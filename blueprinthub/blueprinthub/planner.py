@@ -0,0 +1,181 @@
+"""Dry-run planning for BlueprintHub.
+
+``plan_project`` renders a template the way ``create`` would, but streams
+every file into a hash instead of onto disk, so it catches rendering
+errors and reports exactly which files would be written, how large they
+are and what they would do to an existing output directory. Templates
+that must be sandboxed are rendered by the sandbox worker into a scratch
+directory instead, which stops at the first failing file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import jinja2
+
+from .bundle import Bundle, BundleLoader, is_bundle
+from .core import (
+    _output_path,
+    _walk_template_files,
+    component_file_contents,
+    dependency_file_content,
+    load_metadata,
+)
+from .sandbox import SandboxViolation, render_in_sandbox
+from .update import RECORD_FILE, project_files
+
+PLAN_VERSION = 1
+# create replaces the whole output directory, so files it does not
+# produce are removed; everything else is compared by hash.
+STATUSES = ("create", "overwrite", "unchanged", "conflict", "delete")
+
+
+def _hash_text(chunks) -> Dict:
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        digest.update(data)
+        size += len(data)
+    return {"size": size, "sha256": digest.hexdigest()}
+
+
+def _existing_state(output_dir: Path) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return (current hashes, hashes recorded at generation) for output_dir."""
+    if not output_dir.is_dir():
+        return {}, {}
+    try:
+        with open(output_dir / RECORD_FILE, "r", encoding="utf-8") as file_handle:
+            recorded = json.load(file_handle).get("files") or {}
+    except (OSError, ValueError, AttributeError):
+        recorded = {}
+    return project_files(output_dir), recorded
+
+
+def _rendered_entries(
+    template_path: Path, output_dir: Path, variables: Dict
+) -> Tuple[List[Dict], List[Dict]]:
+    """Render every template file in memory; return (files, errors)."""
+    files: List[Dict] = []
+    errors: List[Dict] = []
+    bundle = Bundle(template_path) if is_bundle(template_path) else None
+    try:
+        if bundle is not None:
+            loader: jinja2.BaseLoader = BundleLoader(bundle)
+            template_files = bundle.names()
+        else:
+            loader = jinja2.FileSystemLoader(template_path)
+            template_files = _walk_template_files(template_path)
+        env = jinja2.Environment(loader=loader, undefined=jinja2.StrictUndefined)
+        for rel_path in sorted(template_files):
+            if rel_path.rsplit("/", 1)[-1] == ".template.yml":
+                continue
+            target = _output_path(rel_path, output_dir, variables)
+            try:
+                stats = _hash_text(env.get_template(rel_path).generate(**variables))
+            except (jinja2.TemplateError, OSError, UnicodeDecodeError) as e:
+                # create fails on the same files, so report them rather than crash.
+                errors.append({"source": rel_path, "error": str(e)})
+                continue
+            files.append(
+                {
+                    "path": target.relative_to(output_dir).as_posix(),
+                    "source": rel_path,
+                    "kind": "rendered",
+                    **stats,
+                }
+            )
+    finally:
+        if bundle is not None:
+            bundle.close()
+    return files, errors
+
+
+def _sandboxed_entries(
+    template_path: Path, variables: Dict
+) -> Tuple[List[Dict], List[Dict]]:
+    """Like _rendered_entries, but rendered by the sandbox worker."""
+    files: List[Dict] = []
+    with tempfile.TemporaryDirectory(prefix="blueprinthub-plan-") as tmp_dir:
+        scratch = Path(tmp_dir) / "out"
+        try:
+            sizes = render_in_sandbox(template_path, scratch, variables)
+        except SandboxViolation as e:
+            return [], [{"source": None, "error": str(e)}]
+        for rel_path in sorted(sizes):
+            target = _output_path(rel_path, scratch, variables)
+            with open(target, "r", encoding="utf-8") as file_handle:
+                stats = _hash_text([file_handle.read()])
+            files.append(
+                {
+                    "path": target.relative_to(scratch).as_posix(),
+                    "source": rel_path,
+                    "kind": "rendered",
+                    **stats,
+                }
+            )
+    return files, []
+
+
+def plan_project(
+    template_path: Path, output_dir: Path, variables: Dict, sandbox: bool = False
+) -> Dict:
+    """Compute what rendering template_path into output_dir would write."""
+    output_dir = Path(output_dir)
+    metadata = load_metadata(template_path)
+    if sandbox or metadata.sandbox:
+        files, errors = _sandboxed_entries(template_path, variables)
+    else:
+        files, errors = _rendered_entries(template_path, output_dir, variables)
+
+    generated = dict(component_file_contents(variables, metadata))
+    dependency_file = dependency_file_content(variables, metadata)
+    if dependency_file is not None:
+        generated[dependency_file[0]] = dependency_file[1]
+    planned = {entry["path"]: entry for entry in files}
+    for rel_path, content in generated.items():
+        # Generated files are written after rendering and win on clashes.
+        planned[rel_path] = {
+            "path": rel_path,
+            "source": None,
+            "kind": "generated",
+            **_hash_text([content]),
+        }
+
+    current, recorded = _existing_state(output_dir)
+    for rel_path, entry in planned.items():
+        existing = current.get(rel_path)
+        if existing is None:
+            entry["status"] = "create"
+        elif existing == entry["sha256"]:
+            entry["status"] = "unchanged"
+        elif rel_path in recorded and existing != recorded[rel_path]:
+            entry["status"] = "conflict"  # Edited since it was generated.
+        else:
+            entry["status"] = "overwrite"
+    removed = [
+        {"path": rel_path, "source": None, "kind": "existing", "status": "delete"}
+        for rel_path in sorted(set(current) - set(planned))
+    ]
+
+    entries = sorted(planned.values(), key=lambda entry: entry["path"]) + removed
+    summary = {status: 0 for status in STATUSES}
+    for entry in entries:
+        summary[entry["status"]] += 1
+    return {
+        "version": PLAN_VERSION,
+        "template": str(template_path),
+        "output_dir": os.path.abspath(output_dir),
+        "variables": variables,
+        "files": entries,
+        "summary": {
+            **summary,
+            "files": len(planned),
+            "bytes": sum(entry["size"] for entry in planned.values()),
+        },
+        "errors": errors,
+    }
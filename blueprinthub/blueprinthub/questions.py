@@ -0,0 +1,204 @@
+"""Question engine shared by the create command and the wizard.
+
+Questions are VariableSpec objects: the common project questions below,
+followed by whatever a template declares under ``variables`` in its
+``.template.yml``. Answers can come from an answers file, ``--var k=v``
+pairs or interactive prompts; only questions without an answer are
+asked, and nothing is asked when stdin is not a terminal.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import questionary
+import typer
+import yaml
+
+from .core import console
+from .models import TemplateMetadata, VariableSpec
+
+COMPONENT_CHOICES = ("Docker", "CI/CD (GitHub Actions)")
+
+PROJECT_QUESTIONS = (
+    VariableSpec("name", description="Project name"),
+    VariableSpec("author", "Your Name", "Author name"),
+    VariableSpec("version", "0.1.0", "Version"),
+    VariableSpec("dep_manager", "poetry", "Package manager", ("poetry", "pip", "uv")),
+    VariableSpec(
+        "components", [], "Optional components", COMPONENT_CHOICES, type="list"
+    ),
+    VariableSpec(
+        "extra_libs",
+        [],
+        "Additional libraries (comma-separated, e.g., pydantic, httpx)",
+        type="list",
+    ),
+)
+
+Asker = Callable[..., Any]
+_TRUE = {"true", "yes", "y", "on", "1"}
+_FALSE = {"false", "no", "n", "off", "0", ""}
+
+
+class AnswerError(ValueError):
+    """Raised when a given answer does not fit its question's type or choices."""
+
+
+def _ask_question(prompt, qtype, **kwargs):
+    """Wrapper for questionary calls to aid mocking."""
+    if qtype == "select":
+        return questionary.select(prompt, **kwargs).ask()
+    if qtype == "checkbox":
+        return questionary.checkbox(prompt, **kwargs).ask()
+    if qtype == "text":
+        return questionary.text(prompt, **kwargs).ask()
+    if qtype == "confirm":
+        return questionary.confirm(prompt, **kwargs).ask()
+    return None
+
+
+def template_questions(
+    metadata: TemplateMetadata, defaults: Optional[Dict[str, Any]] = None
+) -> List[VariableSpec]:
+    """Return the project questions followed by the template's own variables."""
+    questions = {spec.name: spec for spec in PROJECT_QUESTIONS}
+    questions.update(metadata.variables)
+    # The caller's defaults (e.g. the project directory as the name) win
+    # over the template's own.
+    for name, default in (defaults or {}).items():
+        spec = questions.get(name)
+        if spec is not None:
+            questions[name] = VariableSpec(
+                name, default, spec.description, spec.choices, spec.type
+            )
+    return list(questions.values())
+
+
+def ask_variable(spec: VariableSpec, ask: Asker = _ask_question) -> Any:
+    """Prompt for one variable, converting the reply to the declared type."""
+    prompt = spec.description or spec.name
+    kwargs: Dict[str, Any] = {}
+    if spec.type == "bool":
+        if spec.default is not None:
+            kwargs["default"] = bool(spec.default)
+        return ask(prompt, "confirm", **kwargs)
+    if spec.choices and spec.type == "list":
+        checked = spec.default or []
+        choices = [
+            questionary.Choice(choice, checked=choice in checked)
+            for choice in spec.choices
+        ]
+        return ask(prompt, "checkbox", choices=choices)
+    if spec.choices:
+        if spec.default is not None:
+            kwargs["default"] = str(spec.default)
+        return ask(prompt, "select", choices=[*spec.choices], **kwargs)
+
+    default = spec.default
+    if isinstance(default, (list, tuple)):
+        default = ", ".join(str(item) for item in default)
+    if default is not None:
+        kwargs["default"] = str(default)
+    reply = ask(prompt, "text", **kwargs)
+    if reply is None:
+        return None
+    if spec.type == "list":
+        return [item.strip() for item in reply.split(",") if item.strip()]
+    if spec.type == "int":
+        return int(reply)
+    return reply
+
+
+def coerce_answer(spec: VariableSpec, value: Any) -> Any:
+    """Convert a given answer (often text from --var) to the question's type.
+
+    Lists are split on commas, bools and ints are parsed, and every value
+    must be one of the question's choices, if it has any.
+    """
+    if value is None:
+        return None
+    if spec.type == "list":
+        if isinstance(value, str):
+            value = [item.strip() for item in value.split(",") if item.strip()]
+        elif isinstance(value, (list, tuple)):
+            value = [*value]
+        else:
+            value = [value]
+    elif spec.type == "bool" and not isinstance(value, bool):
+        text = str(value).strip().lower()
+        if text not in _TRUE | _FALSE:
+            raise AnswerError(f"{spec.name}: expected true or false, got {value!r}")
+        value = text in _TRUE
+    elif spec.type == "int" and not isinstance(value, int):
+        try:
+            value = int(str(value).strip())
+        except ValueError:
+            raise AnswerError(
+                f"{spec.name}: expected an integer, got {value!r}"
+            ) from None
+    if spec.choices:
+        for item in value if spec.type == "list" else [value]:
+            if str(item) not in spec.choices:
+                raise AnswerError(
+                    f"{spec.name}: {item!r} is not one of {', '.join(spec.choices)}"
+                )
+    return value
+
+
+def resolve_answers(
+    questions: Iterable[VariableSpec],
+    answers: Optional[Dict[str, Any]] = None,
+    interactive: Optional[bool] = None,
+    ask: Asker = _ask_question,
+) -> Dict[str, Any]:
+    """Merge given answers with prompts (or defaults) for every missing question.
+
+    Given answers are converted with coerce_answer, which raises AnswerError.
+    """
+    answers = dict(answers or {})
+    if interactive is None:
+        interactive = sys.stdin.isatty()
+    variables: Dict[str, Any] = {}
+    for spec in questions:
+        if spec.name in answers:
+            variables[spec.name] = coerce_answer(spec, answers.pop(spec.name))
+        elif interactive:
+            variables[spec.name] = ask_variable(spec, ask)
+        else:
+            variables[spec.name] = spec.default
+    variables.update(answers)
+    return variables
+
+
+def load_answers(answers_file: Optional[Path], pairs: Iterable[str] = ()) -> Dict:
+    """Read an answers file (YAML or JSON) and apply --var k=v overrides."""
+    answers: Dict[str, Any] = {}
+    if answers_file is not None:
+        try:
+            with open(answers_file, "r", encoding="utf-8") as file_handle:
+                if answers_file.suffix == ".json":
+                    answers = json.load(file_handle)
+                else:
+                    answers = yaml.safe_load(file_handle) or {}
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            console.print(f"Error: Failed to read {answers_file}: {e}", style="red")
+            raise typer.Exit(1)
+        if not isinstance(answers, dict):
+            console.print(f"Error: {answers_file} must be a mapping.", style="red")
+            raise typer.Exit(1)
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or not key.strip():
+            console.print(f"Error: Expected KEY=VALUE, got '{pair}'.", style="red")
+            raise typer.Exit(1)
+        if value.startswith(("[", "{")):
+            # Flow collections let --var components=[Docker] set a list.
+            try:
+                answers[key.strip()] = yaml.safe_load(value)
+                continue
+            except yaml.YAMLError:
+                pass
+        answers[key.strip()] = value
+    return answers
@@ -0,0 +1,416 @@
+"""Template registry server and caching client for BlueprintHub.
+
+The server publishes packed bundles from a directory over HTTP/1.1:
+
+* ``GET /index.json`` lists templates with their descriptions and ETags.
+* ``GET /templates/<name>.bphub`` serves a bundle; honours ``If-None-Match``
+  and single ``Range`` requests.
+* ``GET /templates/<name>/index.json`` serves a bundle's file index.
+
+The client keeps bundles in a local cache. When a bundle changes it fetches
+the new index and downloads only the records it does not already hold, as
+byte ranges over a pooled keep-alive connection.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+import typer
+
+from .bundle import BUNDLE_SUFFIX, Bundle, BundleError, write_records
+from .core import CACHE_DIR, console, load_metadata
+
+REGISTRY_ENV = "BLUEPRINTHUB_REGISTRY"
+RANGE_GAP = 4096  # Merge ranges separated by fewer bytes than this.
+DELTA_RATIO = 0.5  # Above this share of changed bytes, download the whole bundle.
+
+
+class RegistryError(Exception):
+    """Raised when the registry cannot be reached or returns bad data."""
+
+
+_etags: Dict[Tuple[str, int, int], str] = {}
+
+
+def _file_etag(path: Path) -> str:
+    """Return a strong ETag for a file, memoized by mtime and size."""
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _etags:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file_handle:
+            for chunk in iter(lambda: file_handle.read(1 << 20), b""):
+                digest.update(chunk)
+        _etags[key] = f'"{digest.hexdigest()}"'
+    return _etags[key]
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """Serve bundles from ``server.root`` with ETag and Range support."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "BlueprintHubRegistry/1"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler API
+        if self.server.verbose:
+            console.print(format % args, style="dim")
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path)
+        if path == "/index.json":
+            return self._send_bytes(self._index(), "application/json")
+        match = re.fullmatch(r"/templates/([^/]+)(/index\.json|\.bphub)", path)
+        if not match:
+            return self._send_status(404)
+        bundle_path = self.server.root / f"{match.group(1)}{BUNDLE_SUFFIX}"
+        if not bundle_path.is_file():
+            return self._send_status(404)
+        etag = _file_etag(bundle_path)
+        if match.group(2) == "/index.json":
+            with Bundle(bundle_path) as bundle:
+                body = json.dumps({"files": bundle.files}).encode("utf-8")
+            return self._send_bytes(body, "application/json", etag)
+        return self._send_file(bundle_path, etag)
+
+    def _index(self) -> bytes:
+        templates = {}
+        for bundle_path in sorted(self.server.root.glob(f"*{BUNDLE_SUFFIX}")):
+            metadata = load_metadata(bundle_path)
+            templates[bundle_path.stem] = {
+                "description": metadata.description,
+                "tags": list(metadata.tags),
+                "etag": _file_etag(bundle_path),
+                "size": bundle_path.stat().st_size,
+            }
+        return json.dumps({"templates": templates}, sort_keys=True).encode("utf-8")
+
+    def _not_modified(self, etag: str) -> bool:
+        if etag and etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return True
+        return False
+
+    def _send_status(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_bytes(self, body: bytes, content_type: str, etag: str = "") -> None:
+        etag = etag or f'"{hashlib.sha256(body).hexdigest()}"'
+        if self._not_modified(etag):
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: Path, etag: str) -> None:
+        if self._not_modified(etag):
+            return
+        size = path.stat().st_size
+        if_match = self.headers.get("If-Match")
+        if if_match and etag not in if_match:
+            return self._send_status(412)
+        start, end = 0, size - 1
+        status = 200
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2) or end), size - 1)
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        with open(path, "rb") as file_handle:
+            file_handle.seek(start)
+            self.wfile.write(file_handle.read(end - start + 1))
+
+
+def make_server(
+    root: Path, host: str = "127.0.0.1", port: int = 8765, verbose: bool = False
+) -> ThreadingHTTPServer:
+    """Create (but do not start) a registry server for the bundles in root."""
+    server = ThreadingHTTPServer((host, port), RegistryHandler)
+    server.daemon_threads = True
+    server.root = Path(root)
+    server.verbose = verbose
+    return server
+
+
+class ConnectionPool:
+    """A small LIFO pool of keep-alive connections to one host."""
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise RegistryError(f"Unsupported registry URL: {base_url}")
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(
+            size
+        )
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = (
+            http.client.HTTPSConnection
+            if self.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return cls(self.netloc, timeout=self.timeout)
+
+    def request(
+        self, path: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """GET path, reusing an idle connection and retrying once if it went stale."""
+        for attempt in range(2):
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                conn.request("GET", self.prefix + path, headers=headers or {})
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if attempt:
+                    raise RegistryError(f"Registry request failed: {e}") from e
+                continue
+            if response.will_close:
+                conn.close()
+            else:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            return response.status, response.headers, body
+        raise RegistryError("Registry request failed")
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RegistryClient:
+    """Fetch template bundles from a registry into a local cache."""
+
+    def __init__(self, base_url: str, cache_dir: Optional[Path] = None):
+        self.pool = ConnectionPool(base_url)
+        host_key = re.sub(r"[^A-Za-z0-9_.-]", "_", self.pool.netloc + self.pool.prefix)
+        self.cache_dir = Path(cache_dir or CACHE_DIR / "registry") / host_key
+        self.bytes_downloaded = 0
+        self._lock = threading.Lock()
+
+    def _get(
+        self,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        allowed: Tuple[int, ...] = (),
+    ):
+        status, response_headers, body = self.pool.request(path, headers)
+        with self._lock:
+            self.bytes_downloaded += len(body)
+        if status >= 400 and status not in allowed:
+            raise RegistryError(f"GET {path} returned HTTP {status}")
+        return status, response_headers, body
+
+    def _read_cached(self, name: str) -> Tuple[Optional[bytes], str]:
+        body_path = self.cache_dir / name
+        etag_path = self.cache_dir / f"{name}.etag"
+        if body_path.exists() and etag_path.exists():
+            return body_path.read_bytes(), etag_path.read_text()
+        return None, ""
+
+    def _write_cached(self, name: str, body: bytes, etag: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_dir / f".{name}.tmp"
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, self.cache_dir / name)
+        (self.cache_dir / f"{name}.etag").write_text(etag)
+
+    def index(self) -> Dict[str, Dict]:
+        """Return the registry index, revalidated with If-None-Match."""
+        cached, etag = self._read_cached("index.json")
+        headers = {"If-None-Match": etag} if cached is not None else {}
+        status, response_headers, body = self._get("/index.json", headers)
+        if status == 304:
+            body = cached
+        else:
+            self._write_cached("index.json", body, response_headers.get("ETag", ""))
+        return json.loads(body)["templates"]
+
+    def list_templates(self) -> Dict[str, str]:
+        """Return registry template names and descriptions."""
+        return {name: info["description"] for name, info in self.index().items()}
+
+    def bundle_path(self, name: str) -> Path:
+        """Return where the cached bundle for name lives."""
+        return self.cache_dir / f"{name}{BUNDLE_SUFFIX}"
+
+    def fetch(self, name: str) -> Path:
+        """Bring the cached bundle for name up to date and return its path."""
+        remote = self.index().get(name)
+        if remote is None:
+            raise RegistryError(f"Template '{name}' not found in registry")
+        bundle_path = self.bundle_path(name)
+        etag_path = self.cache_dir / f"{name}{BUNDLE_SUFFIX}.etag"
+        local_etag = etag_path.read_text() if etag_path.exists() else ""
+        if bundle_path.exists() and local_etag == remote["etag"]:
+            return bundle_path
+
+        fetched = bundle_path.exists() and self._fetch_delta(name, remote["etag"])
+        if not fetched:
+            self._fetch_full(name, local_etag if bundle_path.exists() else "")
+        return bundle_path
+
+    def _fetch_full(self, name: str, etag: str) -> None:
+        headers = {"If-None-Match": etag} if etag else {}
+        status, response_headers, body = self._get(
+            f"/templates/{quote(name)}{BUNDLE_SUFFIX}", headers
+        )
+        if status == 304:
+            return
+        self._write_cached(
+            f"{name}{BUNDLE_SUFFIX}", body, response_headers.get("ETag", "")
+        )
+
+    def _fetch_delta(self, name: str, etag: str) -> bool:
+        """Patch the cached bundle with only the changed records."""
+        _, response_headers, body = self._get(f"/templates/{quote(name)}/index.json")
+        if response_headers.get("ETag") != etag:
+            return False  # Bundle changed again in between; take the full path.
+        remote_files: Dict[str, Dict] = json.loads(body)["files"]
+        try:
+            local = Bundle(self.bundle_path(name))
+        except BundleError:
+            return False
+        with local:
+            have = {
+                (entry["sha256"], entry["codec"]): path
+                for path, entry in local.files.items()
+            }
+            missing = sorted(
+                {
+                    (entry["offset"], entry["length"])
+                    for entry in remote_files.values()
+                    if (entry["sha256"], entry["codec"]) not in have
+                }
+            )
+            total = sum(entry["length"] for entry in remote_files.values()) or 1
+            if sum(length for _, length in missing) > total * DELTA_RATIO:
+                return False
+            chunks = self._fetch_ranges(name, etag, missing)
+            if chunks is None:
+                return False
+
+            records = []
+            for path, entry in sorted(remote_files.items()):
+                key = (entry["sha256"], entry["codec"])
+                if key in have:
+                    stored = bytes(local.stored(have[key]))
+                else:
+                    stored = _slice_chunks(chunks, entry["offset"], entry["length"])
+                meta = {k: entry[k] for k in ("size", "codec", "sha256")}
+                records.append((path, stored, meta))
+        write_records(self.bundle_path(name), records)
+        with Bundle(self.bundle_path(name)) as bundle:
+            for path, entry in bundle.files.items():
+                if hashlib.sha256(bundle.read(path)).hexdigest() != entry["sha256"]:
+                    raise RegistryError(f"Checksum mismatch for {path} in '{name}'")
+        (self.cache_dir / f"{name}{BUNDLE_SUFFIX}.etag").write_text(etag)
+        return True
+
+    def _fetch_ranges(
+        self, name: str, etag: str, ranges: List[Tuple[int, int]]
+    ) -> Optional[List[Tuple[int, bytes]]]:
+        """Download coalesced byte ranges; None if the bundle changed meanwhile."""
+        merged: List[List[int]] = []
+        for offset, length in ranges:
+            if merged and offset - (merged[-1][0] + merged[-1][1]) < RANGE_GAP:
+                merged[-1][1] = max(merged[-1][1], offset + length - merged[-1][0])
+            else:
+                merged.append([offset, length])
+        chunks = []
+        for offset, length in merged:
+            status, _, body = self._get(
+                f"/templates/{quote(name)}{BUNDLE_SUFFIX}",
+                {"Range": f"bytes={offset}-{offset + length - 1}", "If-Match": etag},
+                allowed=(412, 416),
+            )
+            if status != 206:
+                return None
+            chunks.append((offset, body))
+        return chunks
+
+    def close(self) -> None:
+        """Release pooled connections."""
+        self.pool.close()
+
+    def __enter__(self) -> "RegistryClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _slice_chunks(chunks: List[Tuple[int, bytes]], offset: int, length: int) -> bytes:
+    """Extract [offset, offset + length) from downloaded range chunks."""
+    for start, data in chunks:
+        if start <= offset and offset + length <= start + len(data):
+            return data[offset - start : offset - start + length]
+    raise RegistryError(f"Range {offset}+{length} was not downloaded")
+
+
+def get_client(registry_url: Optional[str]) -> Optional[RegistryClient]:
+    """Return a client for the given URL or $BLUEPRINTHUB_REGISTRY, if any."""
+    url = registry_url or os.environ.get(REGISTRY_ENV)
+    if not url:
+        return None
+    try:
+        return RegistryClient(url)
+    except RegistryError as e:
+        console.print(f"Error: {e}", style="red")
+        raise typer.Exit(1)
+
+
+def fetch_template(client: RegistryClient, template_name: str) -> Path:
+    """Fetch a template bundle for the CLI, reporting failures the CLI way."""
+    try:
+        return client.fetch(template_name)
+    except (RegistryError, BundleError) as e:
+        console.print(f"Error: {e}", style="red")
+        raise typer.Exit(1)
@@ -0,0 +1,238 @@
+"""Render-output cache for BlueprintHub.
+
+Whole rendered projects are memoized under ``CACHE_DIR/renders/<key>``,
+where the key hashes the template's content, the canonicalized variables
+and the generator code itself. A hit is materialized by reflinking (or,
+where the filesystem cannot, copying) the cached tree instead of
+re-rendering. Hardlinks are deliberately not used: editing the generated
+project in place would silently corrupt the cache.
+
+Readers hold a shared lock on an entry while copying it out and eviction
+takes it exclusively, so an entry is never removed mid-copy; the hit and
+miss counters are updated under their own lock.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from .bundle import is_bundle
+from .core import CACHE_DIR
+from .store import _flock
+from .utils import fingerprint_tree
+
+RENDER_CACHE_DIR = CACHE_DIR / "renders"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl: share extents between two files.
+
+_content_hashes: Dict[str, str] = {}
+_NO_REFLINK = (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EBADF)
+
+
+def template_hash(template_path: Path) -> str:
+    """Hash every file of a template, memoized by its stat fingerprint."""
+    if is_bundle(template_path):
+        stat = template_path.stat()
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+    else:
+        fingerprint = fingerprint_tree(template_path)
+    memo_key = f"{template_path.resolve()}:{fingerprint}"
+    if memo_key not in _content_hashes:
+        digest = hashlib.sha256()
+        files = (
+            [template_path]
+            if is_bundle(template_path)
+            else sorted(p for p in template_path.rglob("*") if p.is_file())
+        )
+        for file in files:
+            digest.update(file.relative_to(template_path).as_posix().encode() + b"\0")
+            with open(file, "rb") as file_handle:
+                for chunk in iter(lambda: file_handle.read(1 << 20), b""):
+                    digest.update(chunk)
+        _content_hashes[memo_key] = digest.hexdigest()
+    return _content_hashes[memo_key]
+
+
+def variables_hash(variables: Dict) -> str:
+    """Hash variables in a canonical form (sorted keys, no whitespace)."""
+    canonical = json.dumps(
+        variables, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _generator_hash() -> str:
+    """Fingerprint BlueprintHub's own code so generator changes miss the cache."""
+    digest = hashlib.sha256()
+    for source in sorted(Path(__file__).parent.glob("*.py")):
+        stat = source.stat()
+        digest.update(f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def render_key(template_path: Path, variables: Dict) -> str:
+    """Return the cache key for rendering template_path with variables."""
+    return digest_key(_generator_hash(), template_hash(template_path), variables)
+
+
+def digest_key(generator_digest: str, template_digest: str, variables: Dict) -> str:
+    """Return the cache key from already computed generator and template hashes."""
+    digest = hashlib.sha256()
+    for part in (generator_digest, template_digest, variables_hash(variables)):
+        digest.update(part.encode() + b"\n")
+    return digest.hexdigest()[:40]
+
+
+def _clone_file(src: str, dest: str) -> None:
+    """Reflink src to dest when the filesystem supports it, else copy."""
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as src_handle, open(dest, "wb") as dest_handle:
+                fcntl.ioctl(dest_handle.fileno(), FICLONE, src_handle.fileno())
+            shutil.copymode(src, dest)
+            return
+        except OSError as e:
+            if e.errno not in _NO_REFLINK:
+                raise
+    shutil.copy2(src, dest)
+
+
+def _tree_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class RenderCache:
+    """Size-bounded LRU cache of rendered project trees."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or RENDER_CACHE_DIR)
+        self.max_bytes = max_bytes or int(
+            os.environ.get("BLUEPRINTHUB_RENDER_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.stats_path = self.root / "stats.json"
+
+    def _entry(self, key: str) -> Path:
+        return self.root / "entries" / key
+
+    def _entry_lock(self, key: str, exclusive: bool = False):
+        return _flock(self.root / "locks" / key, exclusive, "a cached render")
+
+    def _counters(self) -> Dict[str, int]:
+        try:
+            return json.loads(self.stats_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, counter: str) -> None:
+        with _flock(self.root / ".stats.lock", True, "the render cache statistics"):
+            counters = self._counters()
+            counters[counter] = counters.get(counter, 0) + 1
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.stats_path.with_name(f".stats-{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(counters))
+            os.replace(tmp_path, self.stats_path)
+
+    def materialize(self, key: str, output_dir: Path) -> bool:
+        """Recreate a cached render at output_dir; return False on a miss.
+
+        A copy that fails part way is removed and counted as a miss.
+        """
+        entry = self._entry(key)
+        tree = entry / "tree"
+        with self._entry_lock(key):
+            hit = tree.is_dir()
+            if hit:
+                try:
+                    shutil.copytree(
+                        tree, output_dir, copy_function=_clone_file, dirs_exist_ok=True
+                    )
+                    info = self._read_info(entry)
+                    self._write_info(entry, {**info, "last_used": time.time_ns()})
+                except (OSError, ValueError):
+                    shutil.rmtree(output_dir, ignore_errors=True)
+                    hit = False
+        self._record("hits" if hit else "misses")
+        return hit
+
+    def store(self, key: str, output_dir: Path) -> None:
+        """Add a freshly rendered tree to the cache and enforce the size budget."""
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        size = _tree_size(output_dir)
+        if size > self.max_bytes:
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=entry.parent))
+        try:
+            shutil.copytree(output_dir, staging / "tree", copy_function=_clone_file)
+            self._write_info(staging, {"size": size, "last_used": time.time_ns()})
+            staging.rename(entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self.evict()
+
+    @staticmethod
+    def _read_info(entry: Path) -> Dict[str, int]:
+        return json.loads((entry / "entry.json").read_text())
+
+    @staticmethod
+    def _write_info(entry: Path, info: Dict[str, int]) -> None:
+        tmp_path = entry / f".entry-{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(info))
+        os.replace(tmp_path, entry / "entry.json")
+
+    def _entries(self) -> List[Tuple[int, int, Path]]:
+        entries_dir = self.root / "entries"
+        if not entries_dir.is_dir():
+            return []
+        entries = []
+        for entry in entries_dir.iterdir():
+            try:
+                info = self._read_info(entry)
+                entries.append((info["last_used"], info["size"], entry))
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def evict(self) -> int:
+        """Drop least recently used entries until within budget; return count."""
+        entries = sorted(self._entries(), key=lambda item: item[0])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            with self._entry_lock(entry.name, exclusive=True):
+                shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters plus current entry count and size."""
+        counters = self._counters()
+        entries = self._entries()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Remove every cached render and reset the counters."""
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,206 @@
+"""Sandboxed rendering for untrusted templates.
+
+Templates imported from third-party repositories are rendered with Jinja's
+``ImmutableSandboxedEnvironment`` in a separate worker process. Each file
+gets a CPU-time budget (enforced in the worker with ``ITIMER_PROF``) and
+an output size cap, and the whole render a total output cap. The parent
+watches the worker's progress and kills it if a file stops making
+progress, so a hostile template cannot hang or exhaust the caller.
+"""
+
+import multiprocessing
+import shutil
+import signal
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+import jinja2
+import typer
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+from .bundle import Bundle, BundleLoader, is_bundle
+from .core import _output_path, _walk_template_files, console, prepare_output_dir
+
+# Slack on top of the CPU budget before the parent gives up on a silent worker.
+WALL_CLOCK_GRACE = 5.0
+
+
+class SandboxLimits(NamedTuple):
+    """Resource limits for one sandboxed render."""
+
+    cpu_seconds: float = 2.0
+    max_file_bytes: int = 5 * 1024 * 1024
+    max_total_bytes: int = 50 * 1024 * 1024
+    max_memory_bytes: int = 1024 * 1024 * 1024
+
+
+class SandboxViolation(Exception):
+    """Raised when a file exceeds a sandbox limit or the worker is stopped."""
+
+
+class _LimitedSandbox(ImmutableSandboxedEnvironment):
+    """Sandbox that also refuses to build oversized strings and lists."""
+
+    intercepted_binops = frozenset({"*", "**"})
+
+    def __init__(self, max_bytes: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+
+    def call_binop(self, context, operator, left, right):
+        if operator == "**" and isinstance(right, int) and right > 1024:
+            raise SandboxViolation(f"exponent {right} is too large")
+        if operator == "*":
+            for seq, count in ((left, right), (right, left)):
+                if isinstance(seq, (str, list, tuple)) and isinstance(count, int):
+                    if len(seq) * count > self.max_bytes:
+                        raise SandboxViolation(
+                            "expression would exceed the per-file output cap"
+                        )
+        return super().call_binop(context, operator, left, right)
+
+
+def _on_cpu_budget(signum, frame):
+    raise SandboxViolation("CPU time budget exceeded")
+
+
+def _render_worker(
+    template_path: str,
+    output_dir: str,
+    variables: Dict,
+    limits: SandboxLimits,
+    conn,
+) -> None:
+    """Render every file, reporting progress over conn; runs in a child process."""
+    if resource is not None:
+        resource.setrlimit(
+            resource.RLIMIT_AS, (limits.max_memory_bytes, limits.max_memory_bytes)
+        )
+    signal.signal(signal.SIGPROF, _on_cpu_budget)
+
+    template_path, output_dir = Path(template_path), Path(output_dir)
+    bundle = Bundle(template_path) if is_bundle(template_path) else None
+    rel_path = None
+    try:
+        if bundle is not None:
+            loader: jinja2.BaseLoader = BundleLoader(bundle)
+            template_files = bundle.names()
+        else:
+            loader = jinja2.FileSystemLoader(template_path)
+            template_files = _walk_template_files(template_path)
+        env = _LimitedSandbox(
+            limits.max_file_bytes, loader=loader, undefined=jinja2.StrictUndefined
+        )
+        total = 0
+        for rel_path in template_files:
+            if rel_path.rsplit("/", 1)[-1] == ".template.yml":
+                continue
+            conn.send(("start", rel_path))
+            output_file = _output_path(rel_path, output_dir, variables)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            size = 0
+            signal.setitimer(signal.ITIMER_PROF, limits.cpu_seconds)
+            try:
+                with open(output_file, "w", encoding="utf-8") as file_handle:
+                    for chunk in env.get_template(rel_path).generate(**variables):
+                        size += len(chunk.encode("utf-8"))
+                        if size > limits.max_file_bytes:
+                            raise SandboxViolation(
+                                f"output exceeds {limits.max_file_bytes} bytes"
+                            )
+                        if total + size > limits.max_total_bytes:
+                            raise SandboxViolation(
+                                f"total output exceeds {limits.max_total_bytes} bytes"
+                            )
+                        file_handle.write(chunk)
+            finally:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+            total += size
+            conn.send(("done", rel_path, size))
+        conn.send(("finished", total))
+    except (SandboxViolation, MemoryError, RecursionError) as e:
+        conn.send(("violation", rel_path, str(e) or type(e).__name__))
+    except (jinja2.TemplateError, OSError) as e:
+        conn.send(("error", rel_path, str(e)))
+    finally:
+        if bundle is not None:
+            bundle.close()
+        conn.close()
+
+
+def render_sandboxed(
+    template_path: Path,
+    output_dir: Path,
+    variables: Dict,
+    limits: Optional[SandboxLimits] = None,
+) -> Dict[str, int]:
+    """Render a template in a killable sandboxed worker; return file sizes."""
+    output_dir = Path(output_dir)
+    prepare_output_dir(output_dir)
+    try:
+        return render_in_sandbox(template_path, output_dir, variables, limits)
+    except SandboxViolation as e:
+        console.print(f"Error: {e}", style="red")
+        raise typer.Exit(1)
+
+
+def render_in_sandbox(
+    template_path: Path,
+    output_dir: Path,
+    variables: Dict,
+    limits: Optional[SandboxLimits] = None,
+) -> Dict[str, int]:
+    """Like render_sandboxed, but never prompts and raises SandboxViolation."""
+    limits = limits or SandboxLimits()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(
+        target=_render_worker,
+        args=(str(template_path), str(output_dir), variables, limits, child_conn),
+        daemon=True,
+    )
+    worker.start()
+    child_conn.close()
+
+    sizes: Dict[str, int] = {}
+    current = None
+    failure = None
+    try:
+        while True:
+            if not parent_conn.poll(limits.cpu_seconds + WALL_CLOCK_GRACE):
+                failure = (current, "stopped making progress; worker killed")
+                break
+            try:
+                message = parent_conn.recv()
+            except EOFError:
+                failure = (current, f"worker died (exit code {worker.exitcode})")
+                break
+            if message[0] == "start":
+                current = message[1]
+            elif message[0] == "done":
+                sizes[message[1]] = message[2]
+            elif message[0] == "finished":
+                break
+            else:
+                failure = (message[1], message[2])
+                break
+    finally:
+        if worker.is_alive():
+            worker.kill()
+        worker.join()
+        parent_conn.close()
+
+    if failure is not None:
+        rel_path, reason = failure
+        shutil.rmtree(output_dir, ignore_errors=True)
+        raise SandboxViolation(
+            f"Sandbox stopped rendering {rel_path or template_path}: {reason}"
+        )
+    return sizes
@@ -0,0 +1,235 @@
+"""Persistent full-text search over templates for BlueprintHub.
+
+The index lives in ``CACHE_DIR/search-index.json`` and maps terms to the
+templates containing them, weighted by field (name, tags, description,
+dependencies, variables, file contents). ``refresh`` re-indexes only the
+templates whose fingerprint changed, so searching thousands of templates
+costs one directory scan plus dictionary lookups. A template directory is
+fingerprinted by its own and its ``.template.yml`` stat only; edits to
+existing files below it are picked up by ``refresh(full=True)``
+(``blueprint search --reindex``).
+"""
+
+import bisect
+import difflib
+import json
+import math
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .bundle import Bundle, BundleError, is_bundle
+from .core import CACHE_DIR, load_metadata
+from .templates import iter_templates
+
+INDEX_PATH = CACHE_DIR / "search-index.json"
+INDEX_VERSION = 2
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "tags": 3.0,
+    "description": 2.0,
+    "dependencies": 2.0,
+    "variables": 1.0,
+    "content": 0.2,
+}
+MAX_FILE_BYTES = 256 * 1024
+PREFIX_WEIGHT = 0.6
+FUZZY_WEIGHT = 0.4
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking camelCase and snake_case."""
+    return _TOKEN.findall(_CAMEL.sub(" ", text).lower())
+
+
+def _stat_key(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return "-"
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _fingerprint(path: Path) -> str:
+    """Cheap change marker: the template's own stat, plus its metadata file's."""
+    if path.is_dir():
+        metadata = _stat_key(path / ".template.yml")
+        return f"{_stat_key(path)}/{metadata}"
+    return _stat_key(path)
+
+
+def _iter_contents(path: Path) -> Iterator[bytes]:
+    """Yield the text-like file contents of a template directory or bundle."""
+    if is_bundle(path):
+        with Bundle(path) as bundle:
+            for name in bundle.names():
+                if bundle.files[name]["size"] <= MAX_FILE_BYTES:
+                    yield bytes(bundle.read(name))
+        return
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                if os.path.getsize(file_path) <= MAX_FILE_BYTES:
+                    with open(file_path, "rb") as file_handle:
+                        yield file_handle.read()
+            except OSError:
+                continue
+
+
+def _document_terms(name: str, path: Path) -> Tuple[Dict[str, float], str]:
+    """Return weighted terms and the description for one template."""
+    metadata = load_metadata(path)
+    fields = {
+        "name": [name, metadata.name],
+        "tags": metadata.tags,
+        "description": [metadata.description],
+        "dependencies": [d for deps in metadata.dependencies.values() for d in deps],
+        "variables": metadata.variables,
+    }
+    terms: Dict[str, float] = {}
+    for field, texts in fields.items():
+        for text in texts:
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0.0) + FIELD_WEIGHTS[field]
+    try:
+        for data in _iter_contents(path):
+            if b"\0" in data[:1024]:
+                continue  # Binary file.
+            for term in set(tokenize(data.decode("utf-8", "ignore"))):
+                terms[term] = terms.get(term, 0.0) + FIELD_WEIGHTS["content"]
+    except BundleError:
+        pass
+    return {
+        term: round(weight, 3) for term, weight in terms.items()
+    }, metadata.description
+
+
+class SearchIndex:
+    """Inverted index of template terms, persisted as JSON."""
+
+    def __init__(self, index_path: Optional[Path] = None):
+        self.index_path = Path(index_path or INDEX_PATH)
+        self.docs: Dict[str, Dict] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file_handle:
+                data = json.load(file_handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            self.docs = data["docs"]
+            self.postings = data["postings"]
+
+    def save(self) -> None:
+        """Write the index atomically."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", dir=self.index_path.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as file_handle:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "docs": self.docs,
+                    "postings": self.postings,
+                },
+                file_handle,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_name, self.index_path)
+
+    def _remove(self, name: str) -> None:
+        for term in self.docs.pop(name, {}).get("terms", {}):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(name, None)
+                if not posting:
+                    del self.postings[term]
+
+    def _add(self, name: str, path: Path, fingerprint: str) -> None:
+        terms, description = _document_terms(name, path)
+        self.docs[name] = {
+            "path": str(path),
+            "fingerprint": fingerprint,
+            "description": description,
+            "terms": list(terms),
+            "length": sum(terms.values()),
+        }
+        for term, weight in terms.items():
+            self.postings.setdefault(term, {})[name] = weight
+
+    def refresh(self, full: bool = False) -> int:
+        """Re-index new or changed templates, drop removed ones; return changes.
+
+        With ``full`` every template is re-indexed, catching content edits
+        that leave the directory and metadata stats unchanged.
+        """
+        changed = 0
+        current = set()
+        for name, path, _ in iter_templates():
+            current.add(name)
+            fingerprint = _fingerprint(path)
+            doc = self.docs.get(name)
+            if (
+                not full
+                and doc
+                and doc["fingerprint"] == fingerprint
+                and doc["path"] == str(path)
+            ):
+                continue
+            self._remove(name)
+            self._add(name, path, fingerprint)
+            changed += 1
+        for name in set(self.docs) - current:
+            self._remove(name)
+            changed += 1
+        if changed:
+            self._vocabulary = []
+            self.save()
+        return changed
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Return (term, weight) matches for a query token: exact, prefix, fuzzy."""
+        if not self._vocabulary:
+            self._vocabulary = sorted(self.postings)
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) >= 2:
+            start = bisect.bisect_left(self._vocabulary, token)
+            for term in self._vocabulary[start:]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    matches.append((term, PREFIX_WEIGHT))
+        if not matches:
+            for term in difflib.get_close_matches(
+                token, self._vocabulary, n=3, cutoff=0.75
+            ):
+                matches.append((term, FUZZY_WEIGHT))
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float, str]]:
+        """Return (name, score, description) tuples ranked by relevance."""
+        total = len(self.docs) or 1
+        average = sum(doc["length"] for doc in self.docs.values()) / total or 1.0
+        scores: Dict[str, float] = {}
+        for token in tokenize(query):
+            for term, match_weight in self._expand(token):
+                posting = self.postings[term]
+                idf = math.log(1 + total / len(posting))
+                for name, weight in posting.items():
+                    norm = weight / (weight + 1.2 * self.docs[name]["length"] / average)
+                    scores[name] = scores.get(name, 0.0) + match_weight * idf * norm
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            (name, round(score, 4), self.docs[name]["description"])
+            for name, score in ranked[:limit]
+        ]
@@ -0,0 +1,343 @@
+"""Library API for rendering projects from Python code.
+
+The CLI functions in ``core`` and ``templates`` report problems with
+``console.print`` and ``typer.Exit`` and ask before overwriting anything.
+A ``Session`` does the same work for a long-running service instead: it
+never prompts, exits or prints. It raises ``SessionError`` subclasses,
+reports problems that do not stop a render (unreadable metadata, waiting
+for a lock) as ``BlueprintWarning`` through ``warnings``, and returns a
+``RenderResult`` describing what it wrote::
+
+    with Session() as session:
+        result = session.render("fastapi_app", Path("out/my-api"), {"orm": "none"})
+        print(result.files, result.bytes, result.seconds)
+
+Each template is loaded once per session: it is located, its layers are
+resolved, its metadata is parsed and validated, its content is hashed
+for the render cache and its Jinja environment keeps every compiled file
+in memory. Later renders only stat the template directory, so a template
+republished by ``import`` (which swaps in a new directory) is reloaded
+automatically. Templates edited in place, or layers changed underneath
+a composed template, are picked up after ``refresh()``.
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import jinja2
+
+from .bundle import Bundle, BundleError, BundleLoader, is_bundle
+from .core import (
+    FileRenderError,
+    _render_files,
+    _walk_template_files,
+    component_file_contents,
+    dependency_file_content,
+    load_template_metadata,
+    locate_template,
+    split_template_ref,
+)
+from .hooks import HookResult, run_post_render_hooks
+from .layers import LayerError, resolve_layers
+from .models import MetadataError, TemplateMetadata
+from .questions import AnswerError, resolve_answers, template_questions
+from .render_cache import RenderCache, _generator_hash, digest_key, template_hash
+from .sandbox import SandboxViolation, render_in_sandbox
+from .store import template_lock, template_version
+from .templates import TemplateEntry, iter_templates
+from .update import BYTECODE_DIR, write_project_record
+
+
+class SessionError(Exception):
+    """Base class of the errors a Session raises."""
+
+
+class TemplateNotFoundError(SessionError):
+    """No local, starter or versioned template has the requested name."""
+
+
+class OutputExistsError(SessionError):
+    """The output directory exists and overwriting was not allowed."""
+
+
+class RenderError(SessionError):
+    """A template file failed to render; path is relative to the template."""
+
+    def __init__(self, path: Optional[str], message: str):
+        super().__init__(f"{path}: {message}" if path else message)
+        self.path = path
+
+
+class RenderResult(NamedTuple):
+    """What one render wrote, and how long it took."""
+
+    template: str
+    version: Optional[int]
+    output_dir: Path
+    variables: Dict[str, Any]
+    files: Dict[str, int]  # relative path -> size in bytes
+    bytes: int
+    seconds: float
+    cached: bool
+    hooks: List[HookResult]
+
+
+class _LoadedTemplate(NamedTuple):
+    """Everything a Session keeps about one template between renders."""
+
+    located: Path
+    stamp: Tuple[int, int]  # (inode, mtime) of located; changes on republish
+    path: Path  # Resolved layers, or located itself.
+    version: Optional[int]
+    metadata: TemplateMetadata
+    digest: str
+    env: jinja2.Environment
+    files: List[str]
+    bundle: Optional[Bundle]
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _tree_files(root: Path) -> Dict[str, int]:
+    """Return {relative path: size} for every file below root."""
+    files = {}
+    for dir_path, _, names in os.walk(root):
+        rel_root = os.path.relpath(dir_path, root)
+        for name in names:
+            rel_path = name if rel_root == "." else f"{rel_root}/{name}"
+            files[rel_path.replace(os.sep, "/")] = os.path.getsize(
+                os.path.join(dir_path, name)
+            )
+    return files
+
+
+class Session:
+    """Renders projects in-process, reusing loaded templates across calls."""
+
+    def __init__(
+        self,
+        use_cache: bool = True,
+        hooks: bool = True,
+        sandbox: bool = False,
+        record: bool = True,
+    ):
+        self.use_cache = use_cache
+        self.hooks = hooks
+        self.sandbox = sandbox
+        self.record = record
+        self._render_cache = RenderCache() if use_cache else None
+        BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+        self._bytecode_cache = jinja2.FileSystemBytecodeCache(str(BYTECODE_DIR))
+        self._generator_digest = _generator_hash()
+        self._loaded: Dict[str, _LoadedTemplate] = {}
+        self._entries: Optional[List[TemplateEntry]] = None
+
+    def templates(self) -> List[TemplateEntry]:
+        """Return the local and starter templates, discovered once per session."""
+        if self._entries is None:
+            self._entries = [*iter_templates()]
+        return self._entries
+
+    def metadata(self, template: str) -> TemplateMetadata:
+        """Return a template's validated metadata."""
+        located = self._locate(template)
+        with template_lock(located):
+            return self._load(template, located).metadata
+
+    @staticmethod
+    def _locate(template: str) -> Path:
+        located = locate_template(template)
+        if located is None:
+            raise TemplateNotFoundError(f"Template '{template}' not found")
+        return located
+
+    def _load(self, template: str, located: Path) -> _LoadedTemplate:
+        """Return the loaded template, reloading it if it was republished.
+
+        Called with the template's lock held, so the directory cannot be
+        swapped out while it is read.
+        """
+        try:
+            stamp = _stamp(located)
+        except OSError as e:
+            raise TemplateNotFoundError(f"Template '{template}' not found") from e
+        loaded = self._loaded.get(template)
+        if loaded is not None and loaded.located == located and loaded.stamp == stamp:
+            return loaded
+        if loaded is not None:
+            self._unload(template)
+
+        try:
+            path = resolve_layers(located)
+        except LayerError as e:
+            raise SessionError(f"Cannot resolve the layers of '{template}': {e}") from e
+        try:
+            metadata = TemplateMetadata.from_dict(load_template_metadata(path))
+        except MetadataError as e:
+            raise SessionError(f"Invalid metadata in '{template}': {e}") from e
+        bundle = None
+        try:
+            bundle = Bundle(path) if is_bundle(path) else None
+            if bundle is not None:
+                loader: jinja2.BaseLoader = BundleLoader(bundle)
+                files = bundle.names()
+            else:
+                loader = jinja2.FileSystemLoader(path)
+                files = _walk_template_files(path)
+            digest = template_hash(path)
+        except (BundleError, OSError) as e:
+            if bundle is not None:
+                bundle.close()
+            raise SessionError(f"Cannot read template '{template}': {e}") from e
+        env = jinja2.Environment(
+            loader=loader,
+            undefined=jinja2.StrictUndefined,
+            bytecode_cache=self._bytecode_cache,
+            auto_reload=False,
+            cache_size=-1,
+        )
+        loaded = _LoadedTemplate(
+            located,
+            stamp,
+            path,
+            template_version(located),
+            metadata,
+            digest,
+            env,
+            [f for f in files if f.rsplit("/", 1)[-1] != ".template.yml"],
+            bundle,
+        )
+        self._loaded[template] = loaded
+        return loaded
+
+    def _unload(self, template: str) -> None:
+        loaded = self._loaded.pop(template)
+        if loaded.bundle is not None:
+            loaded.bundle.close()
+
+    def _write(
+        self, loaded: _LoadedTemplate, output_dir: Path, variables: Dict[str, Any]
+    ) -> None:
+        """Render every file of a loaded template, then the generated files.
+
+        Any failure removes output_dir and is raised as RenderError.
+        """
+        try:
+            if self.sandbox or loaded.metadata.sandbox:
+                render_in_sandbox(loaded.path, output_dir, variables)
+            else:
+                _render_files(loaded.env, loaded.files, output_dir, variables)
+            generated = {}
+            dependency_file = dependency_file_content(variables, loaded.metadata)
+            if dependency_file is not None:
+                generated[dependency_file[0]] = dependency_file[1]
+            generated.update(component_file_contents(variables, loaded.metadata))
+            for rel_path, content in generated.items():
+                (output_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(output_dir / rel_path, "w", encoding="utf-8") as file_handle:
+                    file_handle.write(content)
+        except FileRenderError as e:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise RenderError(e.rel_path, str(e.error)) from e
+        except (SandboxViolation, OSError) as e:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise RenderError(None, str(e)) from e
+
+    def render(
+        self,
+        template: str,
+        output_dir: Path,
+        answers: Optional[Dict[str, Any]] = None,
+        overwrite: bool = False,
+    ) -> RenderResult:
+        """Render template (``name`` or ``name@version``) into output_dir.
+
+        Questions missing from answers take their defaults, as in a
+        non-interactive ``create``; a ``name`` the template does not default
+        is the output directory's name. Hook failures are reported in the
+        result rather than raised.
+        """
+        start = time.perf_counter()
+        output_dir = Path(output_dir)
+        template_name, _ = split_template_ref(template)
+        located = self._locate(template)
+        if output_dir.exists() and not overwrite:
+            raise OutputExistsError(f"{output_dir} already exists")
+
+        with template_lock(located):
+            loaded = self._load(template, located)
+            questions = template_questions(loaded.metadata, {"name": output_dir.name})
+            try:
+                variables = resolve_answers(questions, answers, interactive=False)
+            except AnswerError as e:
+                raise SessionError(f"Invalid answers for '{template}': {e}") from e
+            key = digest_key(self._generator_digest, loaded.digest, variables)
+            # Only replace an existing project once the render can go ahead.
+            if output_dir.exists():
+                try:
+                    shutil.rmtree(output_dir)
+                except OSError as e:
+                    raise SessionError(f"Cannot replace {output_dir}: {e}") from e
+            cached = self._render_cache is not None and self._render_cache.materialize(
+                key, output_dir
+            )
+            if not cached:
+                self._write(loaded, output_dir, variables)
+                if self._render_cache is not None:
+                    self._render_cache.store(key, output_dir)
+
+            hook_results: List[HookResult] = []
+            if (
+                self.hooks
+                and loaded.metadata.hooks
+                and not (self.sandbox or loaded.metadata.sandbox)
+            ):
+                hook_results = run_post_render_hooks(
+                    output_dir, loaded.metadata.hooks, self.use_cache
+                )
+            files = _tree_files(output_dir)
+            if self.record:
+                try:
+                    write_project_record(
+                        output_dir,
+                        template_name,
+                        loaded.path,
+                        variables,
+                        version=loaded.version,
+                        digest=loaded.digest,
+                        key=key,
+                    )
+                except (BundleError, OSError) as e:
+                    raise SessionError(f"Cannot record {output_dir}: {e}") from e
+        return RenderResult(
+            template_name,
+            loaded.version,
+            output_dir,
+            variables,
+            files,
+            sum(files.values()),
+            time.perf_counter() - start,
+            cached,
+            hook_results,
+        )
+
+    def refresh(self) -> None:
+        """Forget loaded templates and discovery results."""
+        for template in [*self._loaded]:
+            self._unload(template)
+        self._entries = None
+
+    def close(self) -> None:
+        self.refresh()
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
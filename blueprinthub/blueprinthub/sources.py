@@ -0,0 +1,258 @@
+"""Where ``import`` reads a repository from.
+
+Every source offers the same three things to the import pipeline: a
+``TreeNode`` of its files for the picker, a directory holding the files
+the user selected, and the authors from its history, if it has one.
+
+* ``DirectorySource`` - a local directory, read in place.
+* ``GitSource`` - any git remote, including ``file://`` and local paths
+  to bare repositories; cloned into a temporary directory.
+* ``TarSource`` / ``ZipSource`` - archives. The listing (and any
+  ``.gitignore``) is read without extracting anything; only the
+  selected files are then extracted. Tar archives, compressed or not,
+  are read as a stream, one member at a time.
+"""
+
+import abc
+import re
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import typer
+from git import Repo
+
+from .analysis import git_authors, repo_name
+from .picker import TreeNode, scan_tree, tree_from_entries
+from .utils import console, handle_error
+
+GIT_SCHEMES = ("http", "https", "git", "ssh", "file")
+_SCP_REMOTE = re.compile(r"^[\w.-]+@[\w.-]+:")  # git@github.com:user/repo.git
+_ARCHIVE_SUFFIXES = (".tar.gz", ".tar.bz2", ".tar.xz", ".tgz", ".tar", ".zip")
+
+
+def _safe_name(name: str) -> Optional[str]:
+    """Normalise an archive member name; None if it would escape the target."""
+    name = name.replace("\\", "/")
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if not parts or name.startswith("/") or ".." in parts or ":" in parts[0]:
+        return None
+    return "/".join(parts)
+
+
+class ImportSource:
+    """Base class: a directory of files, read in place."""
+
+    def __init__(self, location: str, root: Optional[Path] = None):
+        self.location = location
+        self.name = repo_name(location)
+        self.root = root
+
+    def tree(
+        self, include: Iterable[str] = (), exclude: Iterable[str] = ()
+    ) -> TreeNode:
+        return scan_tree(self.root, include, exclude)
+
+    def checkout(self, rel_paths: List[str]) -> Path:
+        """Return a directory containing (at least) rel_paths."""
+        return self.root
+
+    def authors(self) -> Counter:
+        return git_authors(self.root)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ImportSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DirectorySource(ImportSource):
+    """A local directory; nothing is copied until the template is written."""
+
+    def __init__(self, location: str):
+        super().__init__(location, Path(location).resolve())
+        self.name = self.root.name
+
+
+class GitSource(ImportSource):
+    """Any git remote, cloned into a temporary directory."""
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix="blueprinthub-import-")
+        self.root = Path(self._tmp_dir.name)
+        console.print(f"Cloning {location}...", style="yellow")
+        try:
+            Repo.clone_from(location, self.root, env={"GIT_ASKPASS": "false"})
+        except Exception as e:
+            self.close()
+            handle_error(e, "Failed to clone repository")
+
+    def close(self) -> None:
+        self._tmp_dir.cleanup()
+
+
+class _ArchiveSource(ImportSource, abc.ABC):
+    """Shared listing and extraction logic for tar and zip archives."""
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        self.name = self._archive_name(Path(location).name)
+        self._tmp_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._prefix = ""
+        try:
+            entries, gitignores = self._list()
+        except (OSError, tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+            handle_error(e, f"Failed to read archive {location}")
+        # Archives of a repository usually wrap it in one top-level directory.
+        tops = {rel_path.split("/", 1)[0] for rel_path, _ in entries}
+        if len(tops) == 1 and all("/" in rel_path for rel_path, _ in entries):
+            self._prefix = f"{tops.pop()}/"
+        self._entries = [(self._strip(rel_path), size) for rel_path, size in entries]
+        self._gitignores = {
+            self._strip(f"{base}/").rstrip("/"): text
+            for base, text in gitignores.items()
+        }
+
+    @staticmethod
+    def _archive_name(file_name: str) -> str:
+        for suffix in _ARCHIVE_SUFFIXES:
+            if file_name.endswith(suffix):
+                return file_name[: -len(suffix)]
+        return file_name
+
+    def _strip(self, rel_path: str) -> str:
+        return rel_path[len(self._prefix) :]
+
+    @abc.abstractmethod
+    def _list(self) -> Tuple[List[Tuple[str, int]], Dict[str, str]]:
+        """Return [(member path, size)] and {directory: .gitignore text}."""
+
+    @abc.abstractmethod
+    def _extract(self, wanted: Dict[str, str], dest: Path) -> None:
+        """Extract the members named in wanted (member -> relative path)."""
+
+    def tree(
+        self, include: Iterable[str] = (), exclude: Iterable[str] = ()
+    ) -> TreeNode:
+        return tree_from_entries(self._entries, self._gitignores, include, exclude)
+
+    def checkout(self, rel_paths: List[str]) -> Path:
+        self.close()
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix="blueprinthub-import-")
+        self.root = Path(self._tmp_dir.name)
+        wanted = {f"{self._prefix}{rel_path}": rel_path for rel_path in rel_paths}
+        try:
+            self._extract(wanted, self.root)
+        except (OSError, tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+            handle_error(e, f"Failed to extract from {self.location}")
+        return self.root
+
+    def authors(self) -> Counter:
+        return Counter()  # Archives carry no history.
+
+    def close(self) -> None:
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+
+class TarSource(_ArchiveSource):
+    """A tar archive (optionally gzip/bz2/xz compressed), read as a stream."""
+
+    def _list(self) -> Tuple[List[Tuple[str, int]], Dict[str, str]]:
+        entries, gitignores = [], {}
+        with tarfile.open(self.location, mode="r|*") as archive:
+            for member in archive:
+                rel_path = _safe_name(member.name)
+                if rel_path is None or not member.isfile():
+                    continue
+                entries.append((rel_path, member.size))
+                if rel_path.rsplit("/", 1)[-1] == ".gitignore":
+                    data = archive.extractfile(member).read()
+                    base = rel_path.rpartition("/")[0]
+                    gitignores[base] = data.decode("utf-8", errors="replace")
+        return entries, gitignores
+
+    def _extract(self, wanted: Dict[str, str], dest: Path) -> None:
+        remaining = set(wanted)
+        with tarfile.open(self.location, mode="r|*") as archive:
+            for member in archive:
+                rel_path = _safe_name(member.name)
+                if rel_path not in remaining or not member.isfile():
+                    continue
+                target = dest / wanted[rel_path]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with open(target, "wb") as file_handle:
+                    shutil.copyfileobj(archive.extractfile(member), file_handle)
+                remaining.discard(rel_path)
+                if not remaining:
+                    break
+
+
+class ZipSource(_ArchiveSource):
+    """A zip archive, listed from its central directory."""
+
+    @staticmethod
+    def _members(archive: zipfile.ZipFile):
+        for info in archive.infolist():
+            is_link = (info.external_attr >> 16) & 0o170000 == 0o120000
+            rel_path = _safe_name(info.filename)
+            if rel_path is not None and not info.is_dir() and not is_link:
+                yield rel_path, info
+
+    def _list(self) -> Tuple[List[Tuple[str, int]], Dict[str, str]]:
+        entries, gitignores = [], {}
+        with zipfile.ZipFile(self.location) as archive:
+            for rel_path, info in self._members(archive):
+                entries.append((rel_path, info.file_size))
+                if rel_path.rsplit("/", 1)[-1] == ".gitignore":
+                    base = rel_path.rpartition("/")[0]
+                    gitignores[base] = archive.read(info).decode(
+                        "utf-8", errors="replace"
+                    )
+        return entries, gitignores
+
+    def _extract(self, wanted: Dict[str, str], dest: Path) -> None:
+        with zipfile.ZipFile(self.location) as archive:
+            for rel_path, info in self._members(archive):
+                if rel_path not in wanted:
+                    continue
+                target = dest / wanted[rel_path]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with archive.open(info) as src, open(target, "wb") as file_handle:
+                    shutil.copyfileobj(src, file_handle)
+
+
+def open_source(location: str) -> ImportSource:
+    """Pick the import source for a directory, archive or git remote."""
+    path = Path(location).expanduser()
+    if path.is_dir() and not (path / "HEAD").is_file():
+        return DirectorySource(str(path))
+    if path.is_file():
+        if zipfile.is_zipfile(path):
+            return ZipSource(str(path))
+        if tarfile.is_tarfile(path):
+            return TarSource(str(path))
+        console.print(f"Error: {location} is not a tar or zip archive.", style="red")
+        raise typer.Exit(1)
+    if (
+        path.is_dir()  # A bare repository.
+        or urlparse(location).scheme in GIT_SCHEMES
+        or _SCP_REMOTE.match(location)
+    ):
+        return GitSource(location)
+    console.print(
+        f"Error: {location} is not a directory, archive or git remote URL.",
+        style="red",
+    )
+    raise typer.Exit(1)
@@ -0,0 +1,346 @@
+"""Content-addressed blob store behind TEMPLATES_DIR.
+
+Template files are hardlinks to read-only blobs in ``TEMPLATES_DIR/.blobs``,
+named by the SHA-256 of their content. Identical files across templates share
+one inode, the link count doubles as the reference count, and rendering reads
+the template trees exactly as before.
+
+Concurrent processes coordinate through ``flock`` locks in
+``TEMPLATES_DIR/.locks``: readers of a template take it shared (so any
+number of ``create`` runs proceed together), writers take it exclusive.
+Writers build the new template in a hidden staging directory and publish
+it with a single rename, so readers see the old template or the new one,
+never a mix. ``gc`` takes the whole store exclusively.
+
+Every publish also keeps an immutable copy of the new template in
+``TEMPLATES_DIR/.versions/<name>/<n>``, numbered from 1. Its files are
+further hardlinks to the same blobs, so a version costs one directory
+entry per file and only changed files take new space; ``name@<n>`` then
+resolves to that directory and renders exactly like the current template.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import warnings
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+import typer
+
+from .bundle import BUNDLE_SUFFIX
+from .core import (
+    PROJECT_STATE_NAMES,
+    TEMPLATES_DIR,
+    VERSIONS_DIR,
+    BlueprintWarning,
+    console,
+)
+
+BLOBS_DIR = TEMPLATES_DIR / ".blobs"
+LOCKS_DIR = TEMPLATES_DIR / ".locks"
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+BLOB_MODE = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+UNLINKED_FILES = (".template.yml",)  # Small and rewritten in place.
+
+
+def blob_path(digest: str) -> Path:
+    """Return the store path for a content digest."""
+    return BLOBS_DIR / digest[:2] / digest[2:]
+
+
+def put_blob(data: bytes) -> Path:
+    """Store data once and return the path of its blob."""
+    path = blob_path(hashlib.sha256(data).hexdigest())
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as file_handle:
+            file_handle.write(data)
+        os.chmod(tmp_name, BLOB_MODE)
+        os.replace(tmp_name, path)
+    except OSError:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return path
+
+
+def _link(blob: Path, dest: Path) -> bool:
+    """Atomically point dest at blob; return False if hardlinks are unsupported."""
+    tmp_dest = dest.with_name(f".{dest.name}.link")
+    try:
+        if tmp_dest.exists():
+            tmp_dest.unlink()
+        os.link(blob, tmp_dest)
+    except OSError:
+        return False
+    os.replace(tmp_dest, dest)
+    return True
+
+
+def write_file(dest: Path, data: bytes) -> None:
+    """Write a template file through the blob store."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.name not in UNLINKED_FILES:
+        for _ in range(2):  # Retry once if a concurrent gc removed the blob.
+            try:
+                if _link(put_blob(data), dest):
+                    return
+                break
+            except FileNotFoundError:
+                continue
+    if dest.exists():
+        dest.unlink()
+    with open(dest, "wb") as file_handle:
+        file_handle.write(data)
+
+
+def store_tree(src_dir: Path, template_path: Path) -> None:
+    """Copy a directory tree into a template, deduplicating file contents.
+
+    A generated project's .blueprint state is left out.
+    """
+    for root, dirs, files in os.walk(src_dir):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        rel_root = Path(root).relative_to(src_dir)
+        if rel_root == Path("."):
+            dirs[:] = [d for d in dirs if d not in PROJECT_STATE_NAMES]
+            files = [f for f in files if f not in PROJECT_STATE_NAMES]
+        (template_path / rel_root).mkdir(parents=True, exist_ok=True)
+        for name in files:
+            with open(Path(root) / name, "rb") as file_handle:
+                write_file(template_path / rel_root / name, file_handle.read())
+
+
+def dedupe_template(template_path: Path) -> int:
+    """Replace loose files in an existing template with blob links."""
+    converted = 0
+    for file in template_path.rglob("*"):
+        if not file.is_file() or file.name in UNLINKED_FILES:
+            continue
+        data = file.read_bytes()
+        blob = blob_path(hashlib.sha256(data).hexdigest())
+        if blob.exists() and os.path.samefile(blob, file):
+            continue
+        write_file(file, data)
+        converted += 1
+    return converted
+
+
+def collect_garbage() -> Tuple[int, int]:
+    """Delete blobs no template links to; return (blobs removed, bytes freed)."""
+    removed = freed = 0
+    if not BLOBS_DIR.exists():
+        return removed, freed
+    for blob in BLOBS_DIR.glob("*/*"):
+        info = blob.stat()
+        if info.st_nlink <= 1:
+            blob.unlink()
+            removed += 1
+            freed += info.st_size
+    for shard in BLOBS_DIR.iterdir():
+        if shard.is_dir() and not any(shard.iterdir()):
+            shutil.rmtree(shard, ignore_errors=True)
+    return removed, freed
+
+
+def store_stats() -> Dict[str, int]:
+    """Summarize blob count, stored bytes and bytes saved by sharing."""
+    stats = {"blobs": 0, "references": 0, "stored_bytes": 0, "saved_bytes": 0}
+    if not BLOBS_DIR.exists():
+        return stats
+    for blob in BLOBS_DIR.glob("*/*"):
+        info = blob.stat()
+        references = max(info.st_nlink - 1, 0)
+        stats["blobs"] += 1
+        stats["references"] += references
+        stats["stored_bytes"] += info.st_size
+        stats["saved_bytes"] += info.st_size * max(references - 1, 0)
+    return stats
+
+
+@contextmanager
+def _flock(path: Path, exclusive: bool, what: str) -> Iterator[None]:
+    """Hold an flock on path; proceed unlocked where locking is impossible."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_handle = open(path, "a")
+    except OSError:
+        file_handle = None  # e.g. a read-only install: nothing can write either.
+    if fcntl is None or file_handle is None:
+        yield
+        return
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    with file_handle:
+        try:
+            fcntl.flock(file_handle, mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            warnings.warn(f"Waiting for {what}...", BlueprintWarning)
+            fcntl.flock(file_handle, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(file_handle, fcntl.LOCK_UN)
+
+
+def template_lock(template_path: Path, exclusive: bool = False) -> ContextManager:
+    """Lock a user template: shared to read it, exclusive to replace it.
+
+    Starter templates and registry bundles are never rewritten in place,
+    so they are not locked.
+    """
+    template_path = Path(template_path)
+    if template_path.parent != TEMPLATES_DIR:
+        return nullcontext()
+    name = template_path.name.removesuffix(BUNDLE_SUFFIX)
+    return _flock(LOCKS_DIR / f"{name}.lock", exclusive, f"template '{name}'")
+
+
+def store_lock(exclusive: bool = False) -> ContextManager:
+    """Lock the whole store: writers share it, gc holds it exclusively."""
+    return _flock(LOCKS_DIR / ".store.lock", exclusive, "the template store")
+
+
+def template_versions(template_name: str) -> List[int]:
+    """Return the stored versions of a local template, oldest first."""
+    try:
+        names = os.listdir(VERSIONS_DIR / template_name)
+    except OSError:
+        return []
+    return sorted(int(name) for name in names if name.isdigit())
+
+
+def template_version(template_path: Path) -> Optional[int]:
+    """Return which stored version template_path is; None if unversioned."""
+    template_path = Path(template_path)
+    if template_path.parent.parent == VERSIONS_DIR and template_path.name.isdigit():
+        return int(template_path.name)
+    if template_path.parent == TEMPLATES_DIR and template_path.is_dir():
+        versions = template_versions(template_path.name)
+        return versions[-1] if versions else None
+    return None
+
+
+def _save_version(template_path: Path, template_name: str, version: int) -> Path:
+    """Record template_path as a version, sharing its blobs; return the copy."""
+    versions_dir = VERSIONS_DIR / template_name
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=versions_dir))
+    try:
+        for root, dirs, files in os.walk(template_path):
+            rel_root = Path(root).relative_to(template_path)
+            (staging / rel_root).mkdir(parents=True, exist_ok=True)
+            for name in files:
+                src, dest = Path(root) / name, staging / rel_root / name
+                if name in UNLINKED_FILES:
+                    shutil.copy2(src, dest)
+                    continue
+                if src.stat().st_nlink > 1:
+                    try:
+                        os.link(src, dest)  # Already a blob: share it.
+                        continue
+                    except OSError:
+                        pass
+                write_file(dest, src.read_bytes())
+        version_path = versions_dir / str(version)
+        os.rename(staging, version_path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return version_path
+
+
+def _exchange(a: Path, b: Path) -> bool:
+    """Atomically swap two paths with renameat2; False where unsupported."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError, TypeError):
+        return False
+    return (
+        renameat2(
+            _AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE
+        )
+        == 0
+    )
+
+
+def _publish(staging: Path, target: Path) -> None:
+    """Move staging to target, replacing any existing template in one step."""
+    if not target.exists():
+        os.rename(staging, target)
+        return
+    if _exchange(staging, target):
+        shutil.rmtree(staging)  # Now holds the previous template.
+        return
+    # No atomic swap: move the old template aside first. Readers hold the
+    # shared lock, so none of them can observe the gap.
+    trash = Path(tempfile.mkdtemp(prefix=f".trash-{target.name}-", dir=target.parent))
+    os.rename(target, trash / "old")
+    try:
+        os.rename(staging, target)
+    except OSError:
+        os.rename(trash / "old", target)
+        raise
+    finally:
+        shutil.rmtree(trash, ignore_errors=True)
+
+
+@contextmanager
+def template_transaction(template_name: str) -> Iterator[Path]:
+    """Yield a staging directory that replaces the named template on success.
+
+    The staging directory lives inside TEMPLATES_DIR (hidden, so listings
+    skip it) and is renamed over the template when the block exits
+    cleanly; on any error it is discarded and the old template is left as
+    it was. The published tree is kept as the next version; a template
+    from before versioning is first kept as version 1. Concurrent writers
+    of the same template are serialized.
+    """
+    if (
+        not template_name
+        or template_name.startswith(".")
+        or any(char in template_name for char in "/\\@")
+    ):
+        console.print(f"Error: Invalid template name '{template_name}'.", style="red")
+        raise typer.Exit(1)
+    target = TEMPLATES_DIR / template_name
+    with store_lock(), template_lock(target, exclusive=True):
+        try:
+            TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
+            staging = Path(
+                tempfile.mkdtemp(prefix=f".staging-{template_name}-", dir=TEMPLATES_DIR)
+            )
+            os.chmod(staging, 0o755)
+        except OSError as e:
+            console.print(f"Error: Cannot write to {TEMPLATES_DIR}: {e}", style="red")
+            raise typer.Exit(1)
+        version_path = None
+        try:
+            yield staging
+            versions = template_versions(template_name)
+            if not versions and target.is_dir():
+                _save_version(target, template_name, 1)
+                versions = [1]
+            version = versions[-1] + 1 if versions else 1
+            version_path = _save_version(staging, template_name, version)
+            _publish(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            if version_path is not None:
+                shutil.rmtree(version_path, ignore_errors=True)
+            raise
@@ -1,30 +1,78 @@
+import os
+from enum import Enum
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Iterator, NamedTuple, Optional, Dict
 import typer
 from .core import (
     TEMPLATES_DIR,
     STARTER_TEMPLATES_DIR,
+    is_local_template,
+    locate_template,
+    prepare_output_dir,
     render_template,
-    load_template_metadata,
+    load_metadata,
+    split_template_ref,
     generate_dependency_file,
     generate_component_files,
     console,
 )
+from .bundle import BUNDLE_SUFFIX
+from .hooks import report_hooks, run_post_render_hooks
+from .layers import resolve_template
+from .planner import STATUSES, plan_project
+from .render_cache import RenderCache, render_key
+from .sandbox import render_sandboxed
+from .store import template_lock, template_version
+from .update import write_project_record
+
+
+class TemplateSource(str, Enum):
+    """Where a template comes from."""
+
+    user = "user"
+    starter = "starter"
+    registry = "registry"
+
+
+class TemplateEntry(NamedTuple):
+    """A discovered template; metadata is loaded separately, on demand."""
+
+    name: str
+    path: Path
+    source: TemplateSource
+
+
+def iter_templates(
+    source: Optional[TemplateSource] = None,
+) -> Iterator[TemplateEntry]:
+    """Yield templates as they are discovered, without reading any metadata."""
+    seen = set()
+    for dir_source, dir_path in (
+        (TemplateSource.user, TEMPLATES_DIR),
+        (TemplateSource.starter, STARTER_TEMPLATES_DIR),
+    ):
+        if source not in (None, dir_source) or not dir_path.is_dir():
+            continue
+        with os.scandir(dir_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    name = entry.name
+                elif entry.name.endswith(BUNDLE_SUFFIX) and entry.is_file():
+                    name = entry.name.removesuffix(BUNDLE_SUFFIX)
+                else:
+                    continue
+                if name not in seen:
+                    seen.add(name)
+                    yield TemplateEntry(name, Path(entry.path), dir_source)
 
 
 def get_template_descriptions() -> Dict[str, str]:
     """Return a dictionary of template names and their descriptions."""
-    templates = {}
-    for dir_path in (TEMPLATES_DIR, STARTER_TEMPLATES_DIR):
-        for template_dir in dir_path.iterdir():
-            if template_dir.is_dir():
-                try:
-                    metadata = load_template_metadata(template_dir) or {}
-                    desc = metadata.get("description", "No description available")
-                except FileNotFoundError:
-                    desc = "No description available"
-                templates[template_dir.name] = desc
-    return templates
+    return {
+        entry.name: load_metadata(entry.path).description for entry in iter_templates()
+    }
 
 
 def create_project(
@@ -32,27 +80,91 @@ def create_project(
     output_dir: Optional[Path] = None,
     variables: Optional[dict] = None,
     dry_run: bool = False,
+    template_path: Optional[Path] = None,
+    use_cache: bool = True,
+    sandbox: bool = False,
+    hooks: Optional[bool] = None,
 ) -> None:
-    """Create a project from a template."""
-    template_path = TEMPLATES_DIR / template_name
-    if not template_path.exists():
-        template_path = STARTER_TEMPLATES_DIR / template_name
-        if not template_path.exists():
-            console.print(f"Template '{template_name}' not found.", style="red")
-            raise typer.Exit(1)
+    """Create a project from a template, reusing cached renders when possible.
 
-    metadata = load_template_metadata(template_path) or {}
-    variables = variables or metadata.get("variables", {})
-    output_dir = output_dir or Path.cwd() / template_name
+    template_name may pin a stored version as ``name@3``. Post-render hooks
+    run for local templates unless hooks is False; templates from elsewhere
+    only run them when hooks is True.
+    """
+    template_path = template_path or locate_template(template_name)
+    if template_path is None:
+        console.print(f"Template '{template_name}' not found.", style="red")
+        raise typer.Exit(1)
+    template_name, _ = split_template_ref(template_name)
+    version = template_version(template_path)
+    local = is_local_template(template_path)
 
-    if dry_run:
-        console.print(
-            f"[Dry Run] Would render {template_path} to {output_dir} with variables: {variables}",
-            style="yellow",
-        )
-        return
+    # Shared: concurrent creates proceed together; imports and saves wait.
+    with template_lock(template_path):
+        template_path = resolve_template(template_path)
+        metadata = load_metadata(template_path)
+        variables = variables or metadata.defaults()
+        output_dir = output_dir or Path.cwd() / template_name
+
+        if dry_run:
+            plan = plan_project(template_path, output_dir, variables, sandbox)
+            summary = plan["summary"]
+            console.print(
+                f"[Dry Run] Would render {template_path} to {output_dir}: "
+                f"{summary['files']} files, {summary['bytes']} bytes",
+                style="yellow",
+            )
+            console.print(
+                ", ".join(f"{summary[status]} {status}" for status in STATUSES),
+                style="yellow",
+            )
+            for error in plan["errors"]:
+                console.print(
+                    f"Error rendering {error['source']}: {error['error']}", style="red"
+                )
+            if plan["errors"]:
+                raise typer.Exit(1)
+            return
+
+        render_cache = RenderCache() if use_cache else None
+        cached = False
+        if render_cache is not None:
+            key = render_key(template_path, variables)
+            prepare_output_dir(output_dir)
+            cached = render_cache.materialize(key, output_dir)
 
-    render_template(template_path, output_dir, variables)
-    generate_dependency_file(output_dir, variables, metadata)
-    generate_component_files(output_dir, variables, metadata)
-    console.print(f"Project rendered to {output_dir}", style="green")
+        if not cached:
+            if sandbox or metadata.sandbox:
+                render_sandboxed(template_path, output_dir, variables)
+            else:
+                render_template(template_path, output_dir, variables)
+            generate_dependency_file(output_dir, variables, metadata)
+            generate_component_files(output_dir, variables, metadata)
+            if render_cache is not None:
+                render_cache.store(key, output_dir)
+
+        hooks_ok = True
+        if hooks is not False and metadata.hooks:
+            if sandbox or metadata.sandbox:
+                console.print(
+                    f"Skipping {len(metadata.hooks)} post-render hooks: "
+                    "the template is untrusted.",
+                    style="yellow",
+                )
+            elif hooks is None and not local:
+                console.print(
+                    f"Skipping {len(metadata.hooks)} post-render hooks: "
+                    "the template is not local; pass --hooks to run them.",
+                    style="yellow",
+                )
+            else:
+                hooks_ok = report_hooks(
+                    run_post_render_hooks(output_dir, metadata.hooks, use_cache)
+                )
+        write_project_record(
+            output_dir, template_name, template_path, variables, version=version
+        )
+        suffix = " (from render cache)" if cached else ""
+        console.print(f"Project rendered to {output_dir}{suffix}", style="green")
+        if not hooks_ok:
+            raise typer.Exit(1)
@@ -0,0 +1,449 @@
+"""Bring generated projects up to date with their template.
+
+``create`` leaves two things in a project: ``.blueprint.json`` (template
+name and version, render key, answers and the hash of every generated file) and
+``.blueprint/base.bphub``, a bundle of the files exactly as generated.
+``update`` re-renders the current template with the recorded answers and
+three-way merges (``git merge-file``) each file: the bundle is the common
+ancestor, the project holds the user's edits, the new render holds the
+template's. Files whose generated hash did not change are skipped
+without being read.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import jinja2
+import typer
+
+from .bundle import (
+    Bundle,
+    BundleError,
+    BundleLoader,
+    encode_record,
+    is_bundle,
+    write_records,
+)
+from .core import (
+    CACHE_DIR,
+    console,
+    generate_component_files,
+    generate_dependency_file,
+    is_local_template,
+    load_metadata,
+    locate_template,
+    render_template,
+)
+from .hooks import report_hooks, run_post_render_hooks
+from .layers import resolve_template
+from .render_cache import render_key, template_hash
+from .sandbox import render_sandboxed
+from .store import template_lock, template_version
+
+RECORD_FILE = ".blueprint.json"
+BASE_BUNDLE = Path(".blueprint") / "base.bphub"
+RECORD_VERSION = 1
+BYTECODE_DIR = CACHE_DIR / "bytecode"
+_SKIP_DIRS = {".git", ".blueprint"}
+
+
+class UpdateResult(NamedTuple):
+    """Relative paths touched by an update, grouped by outcome."""
+
+    updated: List[str]
+    merged: List[str]
+    conflicts: List[str]
+    removed: List[str]
+    unchanged: int
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_handle:
+        for chunk in iter(lambda: file_handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def project_files(project_dir: Path) -> Dict[str, str]:
+    """Return {relative path: sha256} for every file BlueprintHub generated."""
+    files = {}
+    for root, dirs, names in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
+        rel_root = Path(root).relative_to(project_dir)
+        for name in names:
+            if rel_root == Path(".") and name == RECORD_FILE:
+                continue
+            rel_path = (rel_root / name).as_posix()
+            files[rel_path] = _file_hash(project_dir / rel_path)
+    return files
+
+
+def _write_base(project_dir: Path, rendered_dir: Path, files: Dict[str, str]) -> None:
+    """Snapshot the rendered files as the merge base for the next update."""
+
+    def records():
+        for rel_path in sorted(files):
+            with open(rendered_dir / rel_path, "rb") as file_handle:
+                stored, entry = encode_record(file_handle.read())
+            yield rel_path, stored, entry
+
+    write_records(project_dir / BASE_BUNDLE, records())
+
+
+def write_project_record(
+    project_dir: Path,
+    template_name: str,
+    template_path: Path,
+    variables: Dict,
+    rendered_dir: Optional[Path] = None,
+    version: Optional[int] = None,
+    digest: Optional[str] = None,
+    key: Optional[str] = None,
+) -> None:
+    """Record how project_dir was generated so it can be updated later.
+
+    digest and key are the template's content hash and the render key;
+    callers that already computed them pass them in to skip re-hashing.
+    """
+    rendered_dir = rendered_dir or project_dir
+    files = project_files(rendered_dir)
+    _write_base(project_dir, rendered_dir, files)
+    record = {
+        "version": RECORD_VERSION,
+        "template_name": template_name,
+        "template_version": version,
+        "template_hash": digest or template_hash(template_path),
+        "render_key": key or render_key(template_path, variables),
+        "variables": variables,
+        "files": files,
+    }
+    tmp_path = project_dir / f".{RECORD_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file_handle:
+        json.dump(record, file_handle, indent=2, default=str)
+    os.replace(tmp_path, project_dir / RECORD_FILE)
+
+
+def read_project_record(project_dir: Path) -> Dict:
+    """Load a project's .blueprint.json or exit with a readable error."""
+    try:
+        with open(project_dir / RECORD_FILE, "r", encoding="utf-8") as file_handle:
+            record = json.load(file_handle)
+    except (OSError, ValueError) as e:
+        console.print(
+            f"Error: {project_dir} has no readable {RECORD_FILE}: {e}", style="red"
+        )
+        raise typer.Exit(1)
+    if record.get("version") != RECORD_VERSION or "files" not in record:
+        console.print(
+            f"Error: {project_dir / RECORD_FILE} was not written by 'create'.",
+            style="red",
+        )
+        raise typer.Exit(1)
+    return record
+
+
+def render_project(
+    template_path: Path,
+    output_dir: Path,
+    variables: Dict,
+    bytecode_cache: Optional[jinja2.BytecodeCache] = None,
+) -> None:
+    """Render template_path plus generated files into a fresh output_dir.
+
+    Templates whose metadata asks for the sandbox render in the sandbox
+    worker, which does not use bytecode_cache.
+    """
+    metadata = load_metadata(template_path)
+    if metadata.sandbox:
+        render_sandboxed(template_path, output_dir, variables)
+    else:
+        render_template(template_path, output_dir, variables, bytecode_cache)
+    generate_dependency_file(output_dir, variables, metadata)
+    generate_component_files(output_dir, variables, metadata)
+
+
+def merge_file(current: bytes, base: bytes, new: bytes) -> Tuple[bytes, bool]:
+    """Three-way merge with git merge-file; return (content, had_conflicts)."""
+    with tempfile.TemporaryDirectory(prefix="blueprinthub-merge-") as tmp_dir:
+        paths = []
+        for label, data in (("current", current), ("base", base), ("new", new)):
+            path = os.path.join(tmp_dir, label)
+            with open(path, "wb") as file_handle:
+                file_handle.write(data)
+            paths.append(path)
+        result = subprocess.run(
+            ["git", "merge-file", "-p"]
+            + ["-L", "yours", "-L", "base", "-L", "template"]
+            + paths,
+            capture_output=True,
+        )
+    if result.returncode < 0 or result.returncode > 127:
+        raise OSError(result.stderr.decode("utf-8", "replace").strip())
+    return result.stdout, result.returncode > 0
+
+
+def _is_binary(*contents: bytes) -> bool:
+    return any(b"\0" in data[:8192] for data in contents)
+
+
+def _apply_file(
+    rel_path: str,
+    project_dir: Path,
+    new_dir: Path,
+    base: Optional[Bundle],
+    base_hash: Optional[str],
+    new_hash: Optional[str],
+    result: UpdateResult,
+) -> None:
+    """Reconcile one file whose generated content changed between renders."""
+    target = project_dir / rel_path
+    current_hash = _file_hash(target) if target.is_file() else None
+    if current_hash == new_hash:
+        return  # Already identical to the new render.
+
+    if new_hash is None:  # The template dropped the file.
+        if current_hash is not None and current_hash == base_hash:
+            target.unlink()
+            result.removed.append(rel_path)
+        elif current_hash is not None:
+            result.conflicts.append(rel_path)  # Edited locally; keep it.
+        return
+
+    new_file = new_dir / rel_path
+    if current_hash is None or current_hash == base_hash:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(new_file, target)
+        result.updated.append(rel_path)
+        return
+
+    current = target.read_bytes()
+    new = new_file.read_bytes()
+    try:
+        ancestor = bytes(base.read(rel_path)) if base and rel_path in base else b""
+    except BundleError:
+        ancestor = b""
+    if _is_binary(current, new, ancestor):
+        shutil.copy2(new_file, target.with_name(target.name + ".blueprint-new"))
+        result.conflicts.append(rel_path)
+        return
+    merged, conflicted = merge_file(current, ancestor, new)
+    target.write_bytes(merged)
+    (result.conflicts if conflicted else result.merged).append(rel_path)
+
+
+def update_project(
+    project_dir: Path,
+    template_path: Optional[Path] = None,
+    bytecode_cache: Optional[jinja2.BytecodeCache] = None,
+    hooks: Optional[bool] = None,
+    version: Optional[int] = None,
+) -> Optional[UpdateResult]:
+    """Merge the template's current output into project_dir.
+
+    The new render goes through the template's post-render hooks first, as
+    it did in create, so formatter or lockfile output is not seen as a
+    template change. As in create, hooks default to running only for
+    local templates. version is recorded as the template version merged
+    (default: the version template_path is). Returns None when the project
+    is already up to date.
+    """
+    project_dir = Path(project_dir)
+    record = read_project_record(project_dir)
+    template_name = record["template_name"]
+    template_path = template_path or locate_template(template_name)
+    if template_path is None:
+        console.print(f"Template '{template_name}' not found.", style="red")
+        raise typer.Exit(1)
+    if version is None:
+        version = template_version(template_path)
+    if hooks is None:
+        hooks = is_local_template(template_path)
+    with template_lock(template_path):
+        return _update_from(
+            project_dir,
+            record,
+            resolve_template(template_path),
+            bytecode_cache,
+            hooks,
+            version,
+        )
+
+
+def _update_from(
+    project_dir: Path,
+    record: Dict,
+    template_path: Path,
+    bytecode_cache: Optional[jinja2.BytecodeCache],
+    hooks: bool,
+    version: Optional[int],
+) -> Optional[UpdateResult]:
+    """Merge a fresh render of template_path into project_dir."""
+    template_name = record["template_name"]
+    variables = record.get("variables") or {}
+    if render_key(template_path, variables) == record.get("render_key"):
+        return None
+
+    old_files: Dict[str, str] = record["files"]
+    with tempfile.TemporaryDirectory(prefix="blueprinthub-update-") as tmp_dir:
+        new_dir = Path(tmp_dir) / "render"
+        render_project(template_path, new_dir, variables, bytecode_cache)
+        metadata = load_metadata(template_path)
+        if hooks and metadata.hooks and not metadata.sandbox:
+            report_hooks(run_post_render_hooks(new_dir, metadata.hooks))
+        new_files = project_files(new_dir)
+
+        result = UpdateResult([], [], [], [], 0)
+        unchanged = 0
+        base = None
+        try:
+            base = Bundle(project_dir / BASE_BUNDLE)
+        except BundleError:
+            pass  # Merge against an empty ancestor.
+        try:
+            for rel_path in sorted(set(old_files) | set(new_files)):
+                base_hash = old_files.get(rel_path)
+                new_hash = new_files.get(rel_path)
+                if base_hash == new_hash:
+                    unchanged += 1  # Template output unchanged: keep the user's file.
+                    continue
+                _apply_file(
+                    rel_path, project_dir, new_dir, base, base_hash, new_hash, result
+                )
+        finally:
+            if base is not None:
+                base.close()
+
+        write_project_record(
+            project_dir,
+            template_name,
+            template_path,
+            variables,
+            rendered_dir=new_dir,
+            version=version,
+        )
+    return result._replace(unchanged=unchanged)
+
+
+class FleetEntry(NamedTuple):
+    """Outcome of updating one project in a fleet run."""
+
+    project_dir: Path
+    status: str  # "up-to-date", "changed", "conflicts" or "failed"
+    result: Optional[UpdateResult]
+    error: str = ""
+
+
+def warm_bytecode_cache(
+    template_path: Path, bytecode_cache: jinja2.BytecodeCache
+) -> int:
+    """Compile every file of a template into bytecode_cache; return the count."""
+    bundle = Bundle(template_path) if is_bundle(template_path) else None
+    try:
+        loader = (
+            BundleLoader(bundle)
+            if bundle is not None
+            else jinja2.FileSystemLoader(template_path)
+        )
+        env = jinja2.Environment(
+            loader=loader,
+            undefined=jinja2.StrictUndefined,
+            bytecode_cache=bytecode_cache,
+        )
+        compiled = 0
+        for name in env.list_templates():
+            if name.rsplit("/", 1)[-1] == ".template.yml":
+                continue
+            try:
+                env.get_template(name)
+                compiled += 1
+            except (jinja2.TemplateError, OSError, UnicodeDecodeError):
+                pass  # Reported with context when the project renders it.
+        return compiled
+    finally:
+        if bundle is not None:
+            bundle.close()
+
+
+def _update_worker(
+    job: Tuple[Path, Optional[Path], str, bool, Optional[int]]
+) -> FleetEntry:
+    """Update one project inside a pool worker, never prompting or exiting."""
+    project_dir, template_path, bytecode_dir, hooks, version = job
+    bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_dir)
+    try:
+        result = update_project(
+            project_dir, template_path, bytecode_cache, hooks, version
+        )
+    except typer.Exit:
+        return FleetEntry(project_dir, "failed", None, "see messages above")
+    except Exception as e:  # One broken project must not stop the fleet.
+        return FleetEntry(project_dir, "failed", None, f"{type(e).__name__}: {e}")
+    if result is None:
+        return FleetEntry(project_dir, "up-to-date", None)
+    return FleetEntry(
+        project_dir, "conflicts" if result.conflicts else "changed", result
+    )
+
+
+def update_fleet(
+    project_dirs: Iterable[Path],
+    template_path: Optional[Path] = None,
+    jobs: Optional[int] = None,
+    hooks: Optional[bool] = None,
+) -> List[FleetEntry]:
+    """Update many projects in a process pool sharing one bytecode cache.
+
+    Each distinct template is resolved and compiled once up front, so the
+    workers load compiled templates from the shared cache instead of
+    parsing them again per project.
+    """
+    project_dirs = [Path(p) for p in project_dirs]
+    entries: Dict[Path, FleetEntry] = {}
+    templates: Dict[str, Tuple[Optional[Path], Optional[int], bool, str]] = {}
+    plan: List[Tuple[Path, Optional[Path], str, bool, Optional[int]]] = []
+    BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+    bytecode_cache = jinja2.FileSystemBytecodeCache(str(BYTECODE_DIR))
+
+    for project_dir in project_dirs:
+        try:
+            name = read_project_record(project_dir)["template_name"]
+        except typer.Exit:
+            entries[project_dir] = FleetEntry(
+                project_dir, "failed", None, f"no usable {RECORD_FILE}"
+            )
+            continue
+        if name not in templates:
+            path = template_path or locate_template(name)
+            version = None
+            run_hooks = False
+            error = "" if path is not None else f"template '{name}' not found"
+            if path is not None:
+                run_hooks = is_local_template(path) if hooks is None else hooks
+                try:
+                    version = template_version(path)
+                    path = resolve_template(path)
+                    warm_bytecode_cache(path, bytecode_cache)
+                except typer.Exit:
+                    error = f"template '{name}' cannot be resolved"
+                except Exception as e:  # Fail its projects, not the whole fleet.
+                    error = f"template '{name}': {type(e).__name__}: {e}"
+            templates[name] = (path, version, run_hooks, error)
+        path, version, run_hooks, error = templates[name]
+        if error:
+            entries[project_dir] = FleetEntry(project_dir, "failed", None, error)
+            continue
+        plan.append((project_dir, path, str(BYTECODE_DIR), run_hooks, version))
+
+    if plan:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for entry in pool.map(_update_worker, plan, chunksize=4):
+                entries[entry.project_dir] = entry
+    return [entries[project_dir] for project_dir in project_dirs]
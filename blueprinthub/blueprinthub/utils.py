@@ -1,3 +1,6 @@
+import hashlib
+import os
+from pathlib import Path
 from rich.console import Console
 import typer
 
@@ -8,3 +11,17 @@ def handle_error(e: Exception, message: str) -> None:
     """Gracefully handle and display errors."""
     console.print(f"{message}: {str(e)}", style="red")
     raise typer.Exit(1)
+
+
+def fingerprint_tree(path: Path) -> str:
+    """Hash a directory's relative paths, sizes and mtimes for cheap change detection."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        rel_root = os.path.relpath(root, path)
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            digest.update(
+                f"{rel_root}/{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode()
+            )
+    return digest.hexdigest()
@@ -0,0 +1,301 @@
+"""Watch mode for template authors.
+
+``watch`` renders a template once into a preview directory and then
+re-renders only what an edit affects: the edited file plus every template
+that includes, imports or extends it. A single long-lived Jinja
+environment keeps compiled templates, so only changed sources are
+recompiled. Changes are detected with inotify (through ctypes) on Linux
+and by polling stat fingerprints elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import jinja2
+import jinja2.meta
+import typer
+
+from .core import (
+    FileRenderError,
+    _output_path,
+    _render_files,
+    _walk_template_files,
+    component_file_contents,
+    console,
+    dependency_file_content,
+    load_metadata,
+)
+from .layers import is_composed
+
+POLL_INTERVAL = 0.2
+DEBOUNCE_SECONDS = 0.02
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+# Swap, backup and probe files editors write next to the file being saved.
+EDITOR_SUFFIXES = ("~", ".swp", ".swo", ".swx")
+EDITOR_NAMES = {"4913"}  # Vim checks it can create files in the directory.
+
+
+def is_editor_file(rel_path: str) -> bool:
+    """Return True for an editor's temporary file rather than template content."""
+    name = rel_path.rsplit("/", 1)[-1]
+    return (
+        name.endswith(EDITOR_SUFFIXES)
+        or name in EDITOR_NAMES
+        or name.startswith(".#")
+        or (name.startswith("#") and name.endswith("#"))
+    )
+
+
+class Inotify:
+    """Minimal recursive inotify watcher built on libc through ctypes."""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = Path(root)
+        self.fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        for root_dir, dirs, _ in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            self._add_watch(Path(root_dir))
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        self._dirs[wd] = directory
+
+    def read(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait up to timeout for events; return changed paths relative to root."""
+        changed: Set[str] = set()
+        while select.select([self.fd], [], [], timeout)[0]:
+            data = os.read(self.fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if wd not in self._dirs or not name:
+                    continue
+                path = self._dirs[wd] / name
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._add_watch(path)
+                    continue
+                changed.add(path.relative_to(self.root).as_posix())
+            # Editors save in several steps; collect them into one batch.
+            timeout = DEBOUNCE_SECONDS
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Poller:
+    """Portable fallback that diffs stat fingerprints of a directory tree."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        state = {}
+        for rel_path in _walk_template_files(self.root):
+            try:
+                stat = os.stat(self.root / rel_path)
+            except OSError:
+                continue
+            state[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def read(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._snapshot()
+            changed = {
+                path
+                for path in set(state) | set(self._state)
+                if state.get(path) != self._state.get(path)
+            }
+            self._state = state
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(POLL_INTERVAL)
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(root: Path):
+    """Return an inotify watcher where supported, else a polling one."""
+    try:
+        return Inotify(root)
+    except (OSError, AttributeError, TypeError):
+        return Poller(root)
+
+
+class IncrementalRenderer:
+    """Render a template into a preview directory, one affected file at a time."""
+
+    def __init__(self, template_path: Path, preview_dir: Path, variables: Dict):
+        self.template_path = Path(template_path)
+        self.preview_dir = Path(preview_dir)
+        self.variables = variables
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(self.template_path),
+            undefined=jinja2.StrictUndefined,
+            auto_reload=True,
+        )
+        # template -> templates it includes/imports/extends
+        self._references: Dict[str, Set[str]] = {}
+
+    def _scan_references(self, rel_path: str) -> None:
+        try:
+            source = (self.template_path / rel_path).read_text(encoding="utf-8")
+            ast = self.env.parse(source)
+            self._references[rel_path] = {
+                ref
+                for ref in jinja2.meta.find_referenced_templates(ast)
+                if ref is not None
+            }
+        except (OSError, UnicodeDecodeError, jinja2.TemplateSyntaxError):
+            self._references[rel_path] = set()
+
+    def affected(self, changed: Iterable[str]) -> Set[str]:
+        """Return the changed templates plus everything that depends on them."""
+        affected = set(changed)
+        pending = list(affected)
+        while pending:
+            target = pending.pop()
+            for rel_path, refs in self._references.items():
+                if target in refs and rel_path not in affected:
+                    affected.add(rel_path)
+                    pending.append(rel_path)
+        return affected
+
+    def _render_one(self, rel_path: str) -> Optional[str]:
+        output_file = _output_path(rel_path, self.preview_dir, self.variables)
+        if not (self.template_path / rel_path).is_file():
+            self._references.pop(rel_path, None)
+            if output_file.exists():
+                output_file.unlink()
+            return None
+        try:
+            _render_files(self.env, [rel_path], self.preview_dir, self.variables)
+        except FileRenderError as e:
+            console.print(f"Error rendering {rel_path}: {e.error}", style="red")
+            return None
+        return rel_path
+
+    def _render_generated(self) -> None:
+        metadata = load_metadata(self.template_path)
+        generated = component_file_contents(self.variables, metadata)
+        dependency_file = dependency_file_content(self.variables, metadata)
+        if dependency_file is not None:
+            generated[dependency_file[0]] = dependency_file[1]
+        for rel_path, content in generated.items():
+            target = self.preview_dir / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content, encoding="utf-8")
+
+    def render_all(self) -> List[str]:
+        """Render every file; used at start-up and when metadata changes."""
+        self.preview_dir.mkdir(parents=True, exist_ok=True)
+        rendered = []
+        for rel_path in _walk_template_files(self.template_path):
+            if rel_path.rsplit("/", 1)[-1] == ".template.yml":
+                continue
+            if is_editor_file(rel_path):
+                continue
+            self._scan_references(rel_path)
+            if self._render_one(rel_path):
+                rendered.append(rel_path)
+        self._render_generated()
+        return rendered
+
+    def render_changed(self, changed: Iterable[str]) -> List[str]:
+        """Re-render only the outputs affected by the changed template files."""
+        changed = {path for path in changed if not is_editor_file(path)}
+        if any(path.rsplit("/", 1)[-1] == ".template.yml" for path in changed):
+            return self.render_all()
+        for rel_path in changed:
+            self._scan_references(rel_path)
+        return [
+            rel_path
+            for rel_path in sorted(self.affected(changed))
+            if self._render_one(rel_path)
+        ]
+
+
+def watch_template(template_path: Path, preview_dir: Path, variables: Dict) -> None:
+    """Render into preview_dir and keep it in sync until interrupted."""
+    renderer = IncrementalRenderer(template_path, preview_dir, variables)
+    start = time.perf_counter()
+    count = len(renderer.render_all())
+    console.print(
+        f"Rendered {count} files to {preview_dir} in "
+        f"{(time.perf_counter() - start) * 1000:.0f} ms. Watching {template_path}...",
+        style="green",
+    )
+    watcher = make_watcher(template_path)
+    try:
+        while True:
+            changed = {
+                path for path in watcher.read(timeout=1.0) if not is_editor_file(path)
+            }
+            if not changed:
+                continue
+            start = time.perf_counter()
+            rendered = renderer.render_changed(changed)
+            console.print(
+                f"Re-rendered {len(rendered)} of {len(changed)} changed files in "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms: {', '.join(rendered)}"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def check_watchable(template_path: Path) -> None:
+    """Exit with an error unless template_path is a plain, trusted template."""
+    if not template_path.is_dir():
+        console.print(
+            f"Error: {template_path} is not a template directory; "
+            "unpack bundles before watching them.",
+            style="red",
+        )
+        raise typer.Exit(1)
+    metadata = load_metadata(template_path)
+    if metadata.sandbox:
+        console.print(
+            "Error: Templates marked 'sandbox' cannot be watched; watch renders "
+            "in-process without the sandbox's limits.",
+            style="red",
+        )
+        raise typer.Exit(1)
+    if is_composed(metadata.raw):
+        console.print(
+            "Error: Composed templates cannot be watched as a whole; "
+            "watch the layer you are editing instead.",
+            style="red",
+        )
+        raise typer.Exit(1)
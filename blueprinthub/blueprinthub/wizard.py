@@ -1,64 +1,91 @@
 """Interactive CLI wizard for creating new project templates."""
 
 import json
-import shutil
 from pathlib import Path
 
-import questionary
-
-from .core import TEMPLATES_DIR, save_template_metadata, console
+from typing import Dict, Optional
+
+from .core import (
+    console,
+    load_metadata,
+    locate_template,
+    save_template_metadata,
+)
+from .models import VariableSpec
+from .questions import _ask_question, resolve_answers, template_questions
+from .store import store_tree, template_transaction
 from .templates import create_project
 
 
-def _ask_question(prompt, qtype, **kwargs):
-    """Wrapper for questionary calls to aid mocking."""
-    if qtype == "select":
-        return questionary.select(prompt, **kwargs).ask()
-    if qtype == "checkbox":
-        return questionary.checkbox(prompt, **kwargs).ask()
-    if qtype == "text":
-        return questionary.text(prompt, **kwargs).ask()
-    if qtype == "confirm":
-        return questionary.confirm(prompt, **kwargs).ask()
-    return None
-
-
-def run_create_wizard(dry_run: bool = False) -> None:
-    """Run the interactive project creation wizard."""
-    project_type = _ask_question(
-        "Select project type:",
-        "select",
-        choices=[
+WIZARD_QUESTIONS = (
+    VariableSpec(
+        "project_type",
+        description="Select project type:",
+        choices=(
             "Python CLI Tool",
             "FastAPI App",
             "Data Science Notebook",
             "Flask/Django REST API",
-        ],
-    )
-
-    tech_stack = _ask_question(
-        "Select tech stack:", "select", choices=["Basic", "Advanced"]
-    )
-
-    dep_manager = _ask_question(
-        "Choose dependency manager:", "select", choices=["pip", "poetry", "uv"]
-    )
-
-    components = _ask_question(
-        "Select optional components:",
-        "checkbox",
-        choices=["Docker", "CI/CD (GitHub Actions)", "Tests (pytest)", "pre-commit"],
+        ),
+    ),
+    VariableSpec(
+        "tech_stack", description="Select tech stack:", choices=("Basic", "Advanced")
+    ),
+    VariableSpec(
+        "dep_manager",
+        description="Choose dependency manager:",
+        choices=("pip", "poetry", "uv"),
+    ),
+    VariableSpec(
+        "components",
+        description="Select optional components:",
+        choices=("Docker", "CI/CD (GitHub Actions)", "Tests (pytest)", "pre-commit"),
+        type="list",
+    ),
+    VariableSpec("project_dir", description="Enter project directory name:"),
+    VariableSpec(
+        "import_repo",
+        description="Import from a git repo, directory or archive?",
+        type="bool",
+    ),
+)
+
+METADATA_QUESTIONS = (
+    VariableSpec("name", description="Project name:"),
+    VariableSpec("author", description="Author:"),
+    VariableSpec(
+        "license", description="License:", choices=("MIT", "Apache 2.0", "GPLv3")
+    ),
+    VariableSpec("version", "0.1.0", "Version:"),
+)
+
+
+def _pick(answers: Dict, questions) -> Dict:
+    """Return the answers that belong to the given questions."""
+    names = {spec.name for spec in questions}
+    return {key: value for key, value in answers.items() if key in names}
+
+
+def run_create_wizard(dry_run: bool = False, answers: Optional[Dict] = None) -> None:
+    """Run the interactive project creation wizard; answers skip their prompts."""
+    answers = answers or {}
+    choices = resolve_answers(
+        WIZARD_QUESTIONS,
+        _pick(answers, WIZARD_QUESTIONS),
+        interactive=True,
+        ask=_ask_question,
     )
+    project_type = choices["project_type"]
+    tech_stack = choices["tech_stack"]
+    dep_manager = choices["dep_manager"]
+    components = choices["components"]
+    output_dir = Path.cwd() / choices["project_dir"]
 
-    project_name = _ask_question("Enter project directory name:", "text")
-    output_dir = Path.cwd() / project_name
-
-    import_repo = _ask_question("Import from a GitHub repo?", "confirm")
-    if import_repo:
-        from .github import import_github_repo
+    if choices["import_repo"]:
+        from .github import import_repo
 
-        github_url = _ask_question("Enter GitHub URL:", "text")
-        import_github_repo(github_url)
+        location = _ask_question("Enter a git URL, directory or archive:", "text")
+        import_repo(location)
         template_name = _ask_question(
             "Enter template name to save this config:", "text"
         )
@@ -72,19 +99,21 @@ def run_create_wizard(dry_run: bool = False) -> None:
     }
     template_name = template_map[project_type]
 
-    metadata = {
-        "name": _ask_question("Project name:", "text"),
-        "author": _ask_question("Author:", "text"),
-        "license": _ask_question(
-            "License:", "select", choices=["MIT", "Apache 2.0", "GPLv3"]
-        ),
-        "version": _ask_question("Version:", "text", default="0.1.0"),
-    }
+    metadata = resolve_answers(
+        METADATA_QUESTIONS,
+        _pick(answers, METADATA_QUESTIONS),
+        interactive=True,
+        ask=_ask_question,
+    )
 
     variables = metadata.copy()
     variables["dep_manager"] = dep_manager
     variables["components"] = components
     variables["tech_stack"] = tech_stack  # Now used to avoid 'unused-variable'
+    # Template-specific questions the wizard does not ask take their defaults.
+    template_metadata = load_metadata(locate_template(template_name))
+    for spec in template_questions(template_metadata):
+        variables.setdefault(spec.name, spec.default)
 
     create_project(template_name, output_dir, variables, dry_run=dry_run)
 
@@ -94,9 +123,11 @@ def run_create_wizard(dry_run: bool = False) -> None:
         )
         if save_template:
             new_template_name = _ask_question("Enter template name:", "text")
-            template_path = TEMPLATES_DIR / new_template_name
-            shutil.copytree(output_dir, template_path, dirs_exist_ok=True)
-            save_template_metadata(template_path, {"variables": variables, **metadata})
+            with template_transaction(new_template_name) as template_path:
+                store_tree(output_dir, template_path)
+                save_template_metadata(
+                    template_path, {"variables": variables, **metadata}
+                )
             console.print(f"Template saved as '{new_template_name}'.", style="green")
 
             config = {
@@ -0,0 +1,49 @@
+from collections import Counter
+
+import jinja2
+
+from blueprinthub.analysis import name_variants, suggest_variables, templatize
+
+
+def test_name_variants_render_back_from_one_answer():
+    variants = name_variants("TO_DO_APP")
+    assert {"to-do-app", "to_do_app", "TO_DO_APP", "ToDoApp", "To Do App"} <= set(
+        variants
+    )
+    env = jinja2.Environment()
+    for text, expression in variants.items():
+        rendered = env.from_string(f"{{{{ {expression} }}}}").render(name="to-do-app")
+        assert rendered == text
+
+
+def test_suggest_variables_ranks_by_spread(tmp_path):
+    (tmp_path / "package.json").write_text(
+        '{"name": "to-do-app", "version": "1.4.0", "author": "Ada Lovelace"}'
+    )
+    (tmp_path / "App.js").write_text("export default function ToDoApp() {}\n")
+    (tmp_path / "README.md").write_text("# to-do-app 1.4.0\nby Ada Lovelace\n")
+    files = ["package.json", "App.js", "README.md"]
+
+    suggestions = suggest_variables(
+        tmp_path, files, "to-do-app", authors=Counter({"Ada Lovelace": 3})
+    )
+    found = {s.text: s for s in suggestions}
+    assert found["to-do-app"].files == 2
+    assert found["ToDoApp"].expression.startswith("name |")
+    assert found["Ada Lovelace"].variable == "author"
+    assert found["1.4.0"].variable == "version" and found["1.4.0"].checked
+    assert suggestions[-1].text == "ToDoApp"
+
+    mapping = {s.text: s.expression for s in suggestions}
+    assert (
+        templatize("to-do-app v1.4.0, not 11.4.0", mapping)
+        == "{{ name }} v{{ version }}, not 11.4.0"
+    )
+
+
+def test_templatize_leaves_longer_words_alone():
+    mapping = {"app": "name", "1.0": "version"}
+    assert (
+        templatize("app, application, happy, my-app v1.0", mapping)
+        == "{{ name }}, application, happy, my-{{ name }} v{{ version }}"
+    )
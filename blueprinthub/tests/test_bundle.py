@@ -0,0 +1,30 @@
+import pytest
+from pathlib import Path
+from blueprinthub.bundle import Bundle, BundleLoader, pack_template
+from blueprinthub.core import load_template_metadata, render_template
+
+STARTERS = Path(__file__).parent.parent / "starter_templates"
+
+
+def test_pack_and_read_bundle(tmp_path):
+    bundle_path = tmp_path / "fastapi_app.bphub"
+    count = pack_template(STARTERS / "fastapi_app", bundle_path)
+    with Bundle(bundle_path) as bundle:
+        assert len(bundle.names()) == count
+        assert "{{ name }}/main.py" in bundle
+        assert (
+            bundle.read_text("pyproject.toml")
+            == (STARTERS / "fastapi_app" / "pyproject.toml").read_text()
+        )
+        source, _, _ = BundleLoader(bundle).get_source(None, "pyproject.toml")
+        assert source.startswith("[build-system]")
+    assert load_template_metadata(bundle_path)["name"] == "FastAPI Application"
+
+
+def test_render_template_from_bundle(tmp_path):
+    bundle_path = tmp_path / "python_cli.bphub"
+    pack_template(STARTERS / "python_cli", bundle_path)
+    output_dir = tmp_path / "out"
+    render_template(bundle_path, output_dir, {"name": "tool", "cli_tool": "typer"})
+    assert (output_dir / "tool" / "cli.py").exists()
+    assert '"typer>=0.7.0"' in (output_dir / "pyproject.toml").read_text()
@@ -28,3 +28,46 @@ def test_create_dry_run():
     assert result.exit_code == 0
     assert "[Dry Run]" in result.output
     assert "Would render" in result.output
+
+
+def test_list_pages_and_filters():
+    result = runner.invoke(
+        app, ["list", "--source", "starter", "--page", "2", "--page-size", "1"]
+    )
+    assert result.exit_code == 0
+    assert "2. fastapi_app" in result.output
+    assert "data_science" not in result.output
+    assert "--page 3" in result.output
+
+    result = runner.invoke(app, ["list", "--tag", "no-such-tag"])
+    assert "No templates available." in result.output
+
+
+def test_create_headless_with_answers(tmp_path):
+    answers_file = tmp_path / "answers.yml"
+    answers_file.write_text("name: demo\ncli_tool: typer\n")
+    result = runner.invoke(
+        app,
+        [
+            "create",
+            "python_cli",
+            str(tmp_path / "demo"),
+            "--answers",
+            str(answers_file),
+            "--var",
+            "dep_manager=pip",
+            "--no-cache",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "demo" / "demo" / "cli.py").exists()
+    assert (tmp_path / "demo" / "requirements.txt").exists()
+
+
+def test_find_template_only_contacts_registry_when_needed(monkeypatch):
+    from blueprinthub import cli
+
+    opened = []
+    monkeypatch.setattr(cli, "get_client", lambda url: opened.append(url))
+    assert cli._find_template("python_cli", "http://registry").name == "python_cli"
+    assert opened == []
@@ -0,0 +1,61 @@
+import pytest
+import yaml
+from blueprinthub.components import (
+    generate_ci_workflow,
+    generate_dockerfile,
+    generate_dockerignore,
+)
+from blueprinthub.models import TemplateMetadata
+
+
+def test_dockerfile_copies_manifests_before_source():
+    variables = {"name": "myapi", "dep_manager": "poetry"}
+    dockerfile = generate_dockerfile(variables, TemplateMetadata(main_file="main.py"))
+    assert dockerfile.index("COPY pyproject.toml poetry.lock* ./") < dockerfile.index(
+        "COPY --chown=app:app . ."
+    )
+    assert "pip install poetry" in dockerfile
+    assert "--mount=type=cache,target=/root/.cache/pypoetry" in dockerfile
+    assert 'CMD ["python", "myapi/main.py"]' in dockerfile
+
+
+def test_dockerfile_uv_uses_cache_mount():
+    dockerfile = generate_dockerfile(
+        {"name": "x", "dep_manager": "uv"}, TemplateMetadata()
+    )
+    assert "COPY requirements.txt ./" in dockerfile
+    assert "--mount=type=cache,target=/root/.cache/uv" in dockerfile
+
+
+def test_dockerignore_excludes_venv_and_git():
+    content = generate_dockerignore({}, TemplateMetadata(dockerignore=("data/",)))
+    assert ".venv" in content.splitlines()
+    assert ".git" in content.splitlines()
+    assert content.endswith("data/\n")
+
+
+def test_ci_workflow_caches_and_shards():
+    workflow = generate_ci_workflow(
+        {"dep_manager": "pip", "test_shards": 2},
+        TemplateMetadata.from_dict({"ci": {"python_versions": ["3.11"]}}),
+    )
+    job = yaml.safe_load(workflow)["jobs"]["test"]
+    assert job["strategy"]["matrix"] == {"python-version": ["3.11"], "shard": [1, 2]}
+    setup = next(
+        s for s in job["steps"] if s.get("uses", "").startswith("actions/setup-python")
+    )
+    assert setup["with"]["cache"] == "pip"
+    assert "pytest --splits 2 --group ${{ matrix.shard }}" in workflow
+    assert "poetry" not in workflow
+
+
+def test_dockerfile_notebook_installs_nbconvert():
+    dockerfile = generate_dockerfile(
+        {"name": "x", "dep_manager": "uv"}, TemplateMetadata(main_file="run.ipynb")
+    )
+    assert "uv:latest" not in dockerfile
+    assert (
+        "uv pip install --python /app/.venv/bin/python nbconvert ipykernel"
+        in dockerfile
+    )
+    assert 'CMD ["jupyter", "nbconvert"' in dockerfile
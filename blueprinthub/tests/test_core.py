@@ -17,3 +17,26 @@ def test_render_template(tmp_path):
     render_template(template_path, output_dir, variables)
     assert (output_dir / "testcli" / "cli.py").exists()
     assert (output_dir / "pyproject.toml").exists()
+
+
+def test_load_template_metadata_cache(tmp_path, monkeypatch):
+    from blueprinthub import core
+
+    cache = core._MetadataCache(tmp_path / "metadata.marshal")
+    monkeypatch.setattr(core, "_metadata_cache", cache)
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / ".template.yml").write_text("name: tpl\ntags: [a]\n")
+
+    first = core.load_template_metadata(template_path)
+    first["tags"].append("mutated")
+    assert core.load_template_metadata(template_path) == {"name": "tpl", "tags": ["a"]}
+
+    cache.flush()
+    reloaded = core._MetadataCache(tmp_path / "metadata.marshal")
+    key = str((template_path / ".template.yml").resolve())
+    stat = (template_path / ".template.yml").stat()
+    assert reloaded.get(key, stat.st_mtime_ns, stat.st_size)["name"] == "tpl"
+
+    (template_path / ".template.yml").write_text("name: changed-name\n")
+    assert core.load_template_metadata(template_path)["name"] == "changed-name"
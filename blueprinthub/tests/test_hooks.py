@@ -0,0 +1,105 @@
+import sys
+
+import pytest
+import yaml
+
+from blueprinthub import hooks
+from blueprinthub.models import MetadataError, TemplateMetadata
+
+
+def _metadata(hook_list):
+    return TemplateMetadata.from_dict({"name": "t", "hooks": hook_list})
+
+
+def test_hooks_are_validated():
+    metadata = _metadata(["git init", {"name": "fmt", "run": ["black", "."]}])
+    assert [hook.run for hook in metadata.hooks] == [("git", "init"), ("black", ".")]
+    with pytest.raises(MetadataError, match="cycle"):
+        _metadata(
+            [
+                {"name": "a", "run": "x", "after": "b"},
+                {"name": "b", "run": "y", "after": "a"},
+            ]
+        )
+    with pytest.raises(MetadataError, match="no hook named"):
+        _metadata([{"run": "x", "after": "missing"}])
+
+
+def test_hooks_run_in_order_and_replay_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(hooks, "HOOK_CACHE_DIR", tmp_path / "cache")
+    runs = tmp_path / "runs.log"
+    script = (
+        "import pathlib, sys; "
+        f"open({str(runs)!r}, 'a').write(sys.argv[1]); "
+        "pathlib.Path(sys.argv[1]).write_text("
+        "pathlib.Path('main.py').read_text().upper())"
+    )
+    metadata = _metadata(
+        [
+            {"name": "upper", "run": [sys.executable, "-c", script, "UPPER.txt"]},
+            {
+                "name": "copy",
+                "run": [
+                    sys.executable,
+                    "-c",
+                    script.replace("main.py", "UPPER.txt"),
+                    "copy.txt",
+                ],
+                "after": "upper",
+            },
+            {
+                "name": "rm",
+                "run": [sys.executable, "-c", "import os; os.remove('junk')"],
+            },
+        ]
+    )
+    for name in ("first", "second"):
+        project = tmp_path / name
+        project.mkdir()
+        (project / "main.py").write_text("print('hi')\n")
+        (project / "junk").write_text("x")
+        results = hooks.run_post_render_hooks(project, metadata.hooks)
+        assert (project / "copy.txt").read_text() == "PRINT('HI')\n"
+        assert not (project / "junk").exists()
+    assert [result.status for result in results] == ["cached"] * 3
+    assert runs.read_text() == "UPPER.txtcopy.txt"  # Ran once, replayed once.
+
+
+def test_failed_or_slow_hooks_skip_their_dependents(tmp_path):
+    metadata = _metadata(
+        [
+            {
+                "name": "slow",
+                "run": [sys.executable, "-c", "import time; time.sleep(5)"],
+                "timeout": 0.2,
+            },
+            {"name": "after-slow", "run": "true", "after": "slow"},
+            {"name": "fine", "run": "true"},
+        ]
+    )
+    results = {r.name: r.status for r in hooks.run_hooks(tmp_path, metadata.hooks)}
+    assert results == {"slow": "timeout", "after-slow": "skipped", "fine": "ok"}
+
+
+def test_create_runs_hooks_of_non_local_templates_only_when_asked(tmp_path):
+    from blueprinthub.templates import create_project
+
+    template_path = tmp_path / "downloaded"
+    template_path.mkdir()
+    (template_path / "a.txt").write_text("{{ name }}")
+    mark = [sys.executable, "-c", "open('ran.txt', 'w').close()"]
+    (template_path / ".template.yml").write_text(
+        yaml.safe_dump({"hooks": [{"name": "mark", "run": mark}]})
+    )
+    variables = {"name": "demo", "dep_manager": "pip"}
+    for output, requested in (("default", None), ("asked", True)):
+        create_project(
+            "downloaded",
+            tmp_path / output,
+            dict(variables),
+            template_path=template_path,
+            use_cache=False,
+            hooks=requested,
+        )
+    assert not (tmp_path / "default" / "ran.txt").exists()
+    assert (tmp_path / "asked" / "ran.txt").exists()
@@ -0,0 +1,72 @@
+import pytest
+import typer
+import yaml
+from blueprinthub import core, layers
+
+
+def _make_template(path, files, metadata):
+    path.mkdir(parents=True)
+    for rel, content in files.items():
+        (path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (path / rel).write_text(content)
+    (path / ".template.yml").write_text(yaml.safe_dump(metadata))
+
+
+def test_resolve_template_merges_layers(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "TEMPLATES_DIR", tmp_path / "templates")
+    monkeypatch.setattr(layers, "RESOLVED_DIR", tmp_path / "resolved")
+    templates = tmp_path / "templates"
+    _make_template(
+        templates / "base",
+        {"README.md": "base", "pyproject.toml": "base"},
+        {"description": "Base", "variables": {"name": {"default": "x"}}},
+    )
+    _make_template(templates / "docker", {"Dockerfile": "FROM python"}, {})
+    _make_template(
+        templates / "app",
+        {"README.md": "app"},
+        {
+            "extends": "base",
+            "overlays": ["docker"],
+            "variables": {"orm": {"default": "sqlalchemy"}},
+        },
+    )
+
+    resolved = layers.resolve_template(templates / "app")
+    assert (resolved / "README.md").read_text() == "app"
+    assert (resolved / "pyproject.toml").read_text() == "base"
+    assert (resolved / "Dockerfile").exists()
+    metadata = core.load_template_metadata(resolved)
+    assert set(metadata["variables"]) == {"name", "orm"}
+    assert "extends" not in metadata
+    assert layers.resolve_template(templates / "app") == resolved
+
+
+def test_resolve_template_detects_cycles(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "TEMPLATES_DIR", tmp_path)
+    _make_template(tmp_path / "a", {}, {"extends": "b"})
+    _make_template(tmp_path / "b", {}, {"extends": "a"})
+    with pytest.raises(typer.Exit):
+        layers.resolve_template(tmp_path / "a")
+
+
+def test_bundle_layers_and_pruning(tmp_path, monkeypatch):
+    from blueprinthub.bundle import pack_template
+
+    monkeypatch.setattr(core, "TEMPLATES_DIR", tmp_path / "templates")
+    monkeypatch.setattr(layers, "RESOLVED_DIR", tmp_path / "resolved")
+    templates = tmp_path / "templates"
+    _make_template(tmp_path / "base", {"pkg/base.py": "base"}, {"description": "B"})
+    pack_template(tmp_path / "base", templates / "base.bphub")
+    _make_template(templates / "app", {"app.py": "v1"}, {"extends": "base"})
+
+    old = layers.resolve_template(templates / "app")
+    assert (old / "pkg" / "base.py").read_text() == "base"
+    assert core.load_template_metadata(old)["description"] == "B"
+
+    (templates / "app" / "app.py").write_text("version 2")
+    current = layers.resolve_template(templates / "app")
+    assert current != old
+    assert layers.prune_resolved([templates / "app"]) == 1
+    assert current.exists() and not old.exists()
+    assert layers.prune_resolved() == 1 and not current.exists()
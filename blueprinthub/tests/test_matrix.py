@@ -0,0 +1,44 @@
+import itertools
+from blueprinthub.matrix import full_product, pairwise, run_matrix
+
+
+def test_pairwise_covers_every_pair():
+    space = {"a": [1, 2, 3], "b": ["x", "y"], "c": [True, False], "d": [[], ["z"]]}
+    rows = pairwise(space)
+    assert len(rows) < len(full_product(space))
+    for p, q in itertools.combinations(space, 2):
+        for a, b in itertools.product(space[p], space[q]):
+            assert any(row[p] == a and row[q] == b for row in rows)
+
+
+def test_run_matrix_reports_invalid_outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr("blueprinthub.matrix.BYTECODE_DIR", tmp_path / "bytecode")
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text(
+        "{% if style == 'bad' %}def broken(:{% else %}x = 1{% endif %}\n"
+    )
+    combinations = [
+        {"name": "demo", "dep_manager": "pip", "style": style}
+        for style in ("good", "bad")
+    ]
+    report = run_matrix(template_path, combinations, jobs=2)
+    assert report.combinations == 2
+    assert report.files == 4
+    [failure] = report.failures
+    assert failure.path == "app.py"
+    assert failure.variables["style"] == "bad"
+
+
+def test_run_matrix_survives_unexpected_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr("blueprinthub.matrix.BYTECODE_DIR", tmp_path / "bytecode")
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text("x = {{ 10 // count }}\n")
+    combinations = [
+        {"name": "demo", "dep_manager": "pip", "count": count} for count in (0, 1, 2)
+    ]
+    report = run_matrix(template_path, combinations, jobs=2)
+    assert report.combinations == 3
+    [failure] = report.failures
+    assert failure.variables["count"] == 0 and "ZeroDivisionError" in failure.error
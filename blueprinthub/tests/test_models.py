@@ -0,0 +1,32 @@
+import pytest
+from pathlib import Path
+from blueprinthub.core import load_metadata
+from blueprinthub.models import MetadataError, TemplateMetadata
+
+
+def test_variable_shapes():
+    spec = TemplateMetadata.from_dict(
+        {"variables": {"cli_tool": {"default": "click", "choices": ["click", "typer"]}}}
+    )
+    bare = TemplateMetadata.from_dict({"variables": {"name": "app", "components": []}})
+    names = TemplateMetadata.from_dict({"variables": ["name", "author"]})
+    assert spec.variables["cli_tool"].choices == ("click", "typer")
+    assert bare.defaults() == {"name": "app", "components": []}
+    assert bare.variables["components"].type == "list"
+    assert names.defaults() == {"name": None, "author": None}
+
+
+def test_invalid_metadata_rejected():
+    with pytest.raises(MetadataError, match="dependencies.pip"):
+        TemplateMetadata.from_dict({"dependencies": {"pip": "requests"}})
+    with pytest.raises(MetadataError, match="not in choices"):
+        TemplateMetadata.from_dict(
+            {"variables": {"db": {"default": "oracle", "choices": ["sqlite"]}}}
+        )
+
+
+def test_load_metadata_is_memoized():
+    template_path = Path(__file__).parent.parent / "starter_templates" / "python_cli"
+    metadata = load_metadata(template_path)
+    assert metadata is load_metadata(template_path)
+    assert metadata.defaults()["cli_tool"] == "click"
@@ -0,0 +1,56 @@
+from blueprinthub.picker import pick_files, scan_tree
+
+
+def _write(path, text="x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_scan_tree_honours_gitignore_and_patterns(tmp_path):
+    _write(tmp_path / ".gitignore", "build/\n*.log\n!keep.log\n")
+    _write(tmp_path / "src" / "app.py", "print('hi')\n")
+    _write(tmp_path / "src" / "deep" / "util.py", "x = 1\n")
+    _write(tmp_path / "src" / "debug.log")
+    _write(tmp_path / "keep.log")
+    _write(tmp_path / "build" / "out.js")
+    _write(tmp_path / "docs" / "index.md")
+    _write(tmp_path / ".git" / "HEAD")
+
+    tree = scan_tree(tmp_path)
+    assert sorted(tree.iter_files()) == [
+        ".gitignore",
+        "docs/index.md",
+        "keep.log",
+        "src/app.py",
+        "src/deep/util.py",
+    ]
+    assert tree.dirs["src"].count == 2
+    assert tree.dirs["src"].size == len("print('hi')\n") + len("x = 1\n")
+
+    tree = scan_tree(tmp_path, include=["src/"], exclude=["deep"])
+    assert [*tree.iter_files()] == ["src/app.py"]
+    assert [*scan_tree(tmp_path, include=["*.py"]).iter_files()] == [
+        "src/app.py",
+        "src/deep/util.py",
+    ]
+
+
+def test_pick_files_browses_one_directory_at_a_time(tmp_path):
+    _write(tmp_path / "README.md")
+    _write(tmp_path / "src" / "a.py")
+    _write(tmp_path / "src" / "b.py")
+    tree = scan_tree(tmp_path)
+    answers = iter(
+        [("dir", "src"), ("all", None), ("file", "b.py"), ("up", None), ("done", None)]
+    )
+    seen = []
+
+    def prompt(message, choices):
+        seen.append([choice.title for choice in choices])
+        return next(answers)
+
+    assert pick_files(tree, prompt=prompt) == ["src/a.py"]
+    # Only the current directory's entries are ever listed.
+    assert not any("a.py" in title for title in seen[0])
+    assert any(title.startswith("[-] src/") for title in seen[-1])
+    assert pick_files(tree, select_all=True, prompt=lambda *_: None) == []
@@ -0,0 +1,58 @@
+import json
+from blueprinthub.planner import plan_project
+
+
+def test_plan_classifies_files_without_writing(tmp_path):
+    template_path = tmp_path / "tpl"
+    (template_path / "{{ name }}").mkdir(parents=True)
+    (template_path / "{{ name }}" / "app.py").write_text("print('{{ name }}')")
+    (template_path / "broken.txt").write_text("{{ missing }}")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    (output_dir / "stale.txt").write_text("old")
+    (output_dir / "requirements.txt").write_text("")
+
+    variables = {"name": "demo", "dep_manager": "pip"}
+    plan = plan_project(template_path, output_dir, variables)
+    statuses = {entry["path"]: entry["status"] for entry in plan["files"]}
+    assert statuses == {
+        "demo/app.py": "create",
+        "requirements.txt": "unchanged",
+        "stale.txt": "delete",
+    }
+    assert plan["errors"][0]["source"] == "broken.txt"
+    assert plan["summary"]["bytes"] == len("print('demo')")
+    assert not (output_dir / "demo").exists()
+    json.dumps(plan)
+
+
+def test_plan_renders_sandboxed_templates_in_the_sandbox(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "ok.txt").write_text("{{ name }}")
+    (template_path / "evil.txt").write_text("{{ ''.__class__.__mro__ }}")
+    variables = {"name": "demo", "dep_manager": "pip"}
+    output_dir = tmp_path / "out"
+
+    plan = plan_project(template_path, output_dir, variables, sandbox=True)
+    [error] = plan["errors"]
+    assert "unsafe" in error["error"]
+
+    (template_path / "evil.txt").unlink()
+    (template_path / ".template.yml").write_text("sandbox: true\n")
+    plan = plan_project(template_path, output_dir, variables)
+    assert not plan["errors"]
+    ok = next(entry for entry in plan["files"] if entry["path"] == "ok.txt")
+    assert ok["size"] == 4 and ok["status"] == "create"
+    assert not output_dir.exists()
+
+
+def test_plan_reports_binary_files(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "ok.txt").write_text("{{ name }}")
+    (template_path / "logo.png").write_bytes(b"\x89PNG\r\n")
+    plan = plan_project(template_path, tmp_path / "out", {"name": "demo"})
+    [error] = plan["errors"]
+    assert error["source"] == "logo.png"
+    assert [entry["path"] for entry in plan["files"]][:1] == ["ok.txt"]
@@ -0,0 +1,60 @@
+import pytest
+from blueprinthub.models import TemplateMetadata
+from blueprinthub.questions import (
+    AnswerError,
+    load_answers,
+    resolve_answers,
+    template_questions,
+)
+
+
+def test_prompts_only_for_missing_answers():
+    metadata = TemplateMetadata.from_dict(
+        {"variables": {"cli_tool": {"default": "click", "choices": ["click", "typer"]}}}
+    )
+    asked = []
+
+    def ask(prompt, qtype, **kwargs):
+        asked.append(qtype)
+        return kwargs.get("default", [])
+
+    variables = resolve_answers(
+        template_questions(metadata, {"name": "demo"}),
+        {"author": "Ada", "version": "1.0.0", "dep_manager": "pip"},
+        interactive=True,
+        ask=ask,
+    )
+    assert asked == ["text", "checkbox", "text", "select"]
+    assert variables["name"] == "demo"
+    assert variables["cli_tool"] == "click"
+    assert variables["author"] == "Ada"
+
+
+def test_load_answers_file_and_vars(tmp_path):
+    answers_file = tmp_path / "answers.yml"
+    answers_file.write_text("name: demo\ndep_manager: poetry\n")
+    answers = load_answers(answers_file, ["dep_manager=uv", "components=[Docker]"])
+    assert answers == {"name": "demo", "dep_manager": "uv", "components": ["Docker"]}
+
+
+def test_given_answers_are_coerced_to_the_declared_type():
+    metadata = TemplateMetadata.from_dict(
+        {"variables": {"tests": False, "workers": {"default": 1, "type": "int"}}}
+    )
+    questions = template_questions(metadata, {"name": "myproj"})
+    answers = load_answers(
+        None, ["extra_libs=pydantic, httpx", "tests=false", "workers=4"]
+    )
+    variables = resolve_answers(questions, answers, interactive=False)
+    assert variables["extra_libs"] == ["pydantic", "httpx"]
+    assert variables["tests"] is False and variables["workers"] == 4
+    assert variables["name"] == "myproj"
+
+    with pytest.raises(AnswerError, match="dep_manager"):
+        resolve_answers(questions, {"dep_manager": "npm"}, interactive=False)
+
+
+def test_caller_default_overrides_template_default_name():
+    metadata = TemplateMetadata.from_dict({"variables": {"name": "mycli"}})
+    questions = template_questions(metadata, {"name": "myproj"})
+    assert resolve_answers(questions, {}, interactive=False)["name"] == "myproj"
@@ -0,0 +1,54 @@
+import threading
+import pytest
+from pathlib import Path
+from blueprinthub.bundle import Bundle, pack_template
+from blueprinthub.registry import RegistryClient, make_server
+
+STARTERS = Path(__file__).parent.parent / "starter_templates"
+
+
+@pytest.fixture
+def registry(tmp_path):
+    root = tmp_path / "served"
+    root.mkdir()
+    server = make_server(root, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_caches_and_revalidates(registry, tmp_path):
+    root, url = registry
+    pack_template(STARTERS / "fastapi_app", root / "fastapi_app.bphub")
+    client = RegistryClient(url, cache_dir=tmp_path / "cache")
+
+    assert "fastapi_app" in client.list_templates()
+    bundle_path = client.fetch("fastapi_app")
+    assert bundle_path.read_bytes() == (root / "fastapi_app.bphub").read_bytes()
+
+    downloaded = client.bytes_downloaded
+    client.fetch("fastapi_app")
+    assert client.bytes_downloaded == downloaded  # index answered with 304
+    client.close()
+
+
+def test_client_downloads_only_changed_records(registry, tmp_path):
+    root, url = registry
+    template = tmp_path / "tpl"
+    template.mkdir()
+    (template / "big.txt").write_bytes(bytes(range(256)) * 400)
+    (template / "small.txt").write_text("v1")
+    pack_template(template, root / "tpl.bphub", compress=False)
+    client = RegistryClient(url, cache_dir=tmp_path / "cache")
+    client.fetch("tpl")
+
+    (template / "small.txt").write_text("v2")
+    pack_template(template, root / "tpl.bphub", compress=False)
+    before = client.bytes_downloaded
+    with Bundle(client.fetch("tpl")) as bundle:
+        assert bundle.read_text("small.txt") == "v2"
+        assert len(bundle.read("big.txt")) == 256 * 400
+    assert client.bytes_downloaded - before < 256 * 400
+    client.close()
@@ -0,0 +1,86 @@
+import pytest
+from blueprinthub import core, layers, render_cache, templates, update
+from blueprinthub.render_cache import RenderCache, variables_hash
+
+VARIABLES = {
+    "name": "tool",
+    "author": "Test",
+    "version": "0.1.0",
+    "dep_manager": "pip",
+    "cli_tool": "click",
+    "components": ["Docker"],
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "RENDER_CACHE_DIR", tmp_path / "renders")
+    monkeypatch.setattr(update, "BYTECODE_DIR", tmp_path / "bytecode")
+    monkeypatch.setattr(layers, "RESOLVED_DIR", tmp_path / "resolved")
+    monkeypatch.setattr(
+        core, "_metadata_cache", core._MetadataCache(tmp_path / "metadata.marshal")
+    )
+
+
+def test_variables_hash_is_canonical():
+    assert variables_hash({"a": 1, "b": [2]}) == variables_hash({"b": [2], "a": 1})
+    assert variables_hash({"a": 1}) != variables_hash({"a": 2})
+
+
+def test_create_project_reuses_cached_render(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    templates.create_project("python_cli", first, dict(VARIABLES))
+    templates.create_project("python_cli", second, dict(VARIABLES))
+
+    stats = RenderCache().stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    for rel in ("tool/cli.py", "requirements.txt", "Dockerfile", ".dockerignore"):
+        assert (second / rel).read_bytes() == (first / rel).read_bytes()
+
+
+def test_evict_keeps_cache_within_budget(tmp_path):
+    cache = RenderCache(tmp_path / "renders", max_bytes=10)
+    for i in range(3):
+        tree = tmp_path / f"tree{i}"
+        tree.mkdir()
+        (tree / "file.txt").write_text("12345")
+        cache.store(f"key{i}", tree)
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert not cache.materialize("key0", tmp_path / "out")
+
+
+def _record_hits(root):
+    cache = RenderCache(root)
+    for _ in range(25):
+        cache._record("hits")
+
+
+def test_concurrent_counters_are_not_lost(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        [*pool.map(_record_hits, [tmp_path / "renders"] * 4)]
+    assert RenderCache(tmp_path / "renders").stats()["hits"] == 100
+
+
+def test_failed_materialize_is_a_clean_miss(tmp_path, monkeypatch):
+    cache = RenderCache(tmp_path / "renders")
+    tree = tmp_path / "tree"
+    (tree / "pkg").mkdir(parents=True)
+    (tree / "a.txt").write_text("a")
+    (tree / "pkg" / "b.txt").write_text("b")
+    cache.store("key", tree)
+
+    copied = []
+
+    def flaky_clone(src, dest):
+        if copied:
+            raise OSError("disk full")
+        copied.append(dest)
+        render_cache.shutil.copy2(src, dest)
+
+    monkeypatch.setattr(render_cache, "_clone_file", flaky_clone)
+    assert not cache.materialize("key", tmp_path / "out")
+    assert not (tmp_path / "out").exists()
+    assert cache.stats()["misses"] == 1
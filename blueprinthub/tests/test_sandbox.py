@@ -0,0 +1,45 @@
+import pytest
+import typer
+from blueprinthub.sandbox import SandboxLimits, render_sandboxed
+
+LIMITS = SandboxLimits(cpu_seconds=0.5, max_file_bytes=1024, max_total_bytes=4096)
+
+
+def _template(tmp_path, content):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "ok.txt").write_text("hello {{ name }}")
+    (template_path / "bad.txt").write_text(content)
+    return template_path
+
+
+def test_sandbox_renders_safe_templates(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "ok.txt").write_text("hello {{ name }}")
+    sizes = render_sandboxed(template_path, tmp_path / "out", {"name": "x"}, LIMITS)
+    assert sizes == {"ok.txt": 7}
+    assert (tmp_path / "out" / "ok.txt").read_text() == "hello x"
+
+
+@pytest.mark.parametrize(
+    "content, reason",
+    [
+        (
+            "{% for i in range(99999) %}{% for j in range(99999) %}{% endfor %}"
+            "{% endfor %}",
+            "CPU time budget exceeded",
+        ),
+        ("{% for i in range(99999) %}xxxxxxxx{% endfor %}", "output exceeds 1024"),
+        ("{{ 'x' * 10000000 }}", "would exceed"),
+        ("{{ ''.__class__.__mro__ }}", "unsafe"),
+    ],
+)
+def test_sandbox_reports_offending_file(tmp_path, capsys, content, reason):
+    template_path = _template(tmp_path, content)
+    with pytest.raises(typer.Exit):
+        render_sandboxed(template_path, tmp_path / "out", {"name": "x"}, LIMITS)
+    output = capsys.readouterr().out
+    assert "bad.txt" in output
+    assert reason in output
+    assert not (tmp_path / "out").exists()
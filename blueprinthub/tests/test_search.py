@@ -0,0 +1,40 @@
+import pytest
+from blueprinthub import templates
+from blueprinthub.search import SearchIndex, tokenize
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("FastAPI my_app-v2") == ["fast", "api", "my", "app", "v2"]
+
+
+def test_search_ranks_and_refreshes_incrementally(tmp_path, monkeypatch):
+    user_templates = tmp_path / "templates"
+    (user_templates / "graphql_api").mkdir(parents=True)
+    (user_templates / "graphql_api" / ".template.yml").write_text(
+        "description: Strawberry GraphQL server\ntags: [api, graphql]\n"
+    )
+    monkeypatch.setattr(templates, "TEMPLATES_DIR", user_templates)
+    index = SearchIndex(tmp_path / "index.json")
+    assert index.refresh() >= 5
+
+    assert index.search("graphql")[0][0] == "graphql_api"
+    assert index.search("fastapi")[0][0] == "fastapi_app"
+    assert index.search("grapql")[0][0] == "graphql_api"  # typo tolerated
+
+    reloaded = SearchIndex(tmp_path / "index.json")
+    assert reloaded.refresh() == 0
+    assert reloaded.search("sklearn scikit")[0][0] == "data_science"
+
+
+def test_refresh_skips_content_walk_until_full(tmp_path, monkeypatch):
+    user_templates = tmp_path / "templates"
+    (user_templates / "tiny" / "src").mkdir(parents=True)
+    (user_templates / "tiny" / "src" / "main.py").write_text("print('hi')\n")
+    monkeypatch.setattr(templates, "TEMPLATES_DIR", user_templates)
+    index = SearchIndex(tmp_path / "index.json")
+    index.refresh()
+
+    (user_templates / "tiny" / "src" / "main.py").write_text("import zeppelin\n")
+    assert index.refresh() == 0
+    assert index.refresh(full=True) >= 1
+    assert index.search("zeppelin")[0][0] == "tiny"
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from blueprinthub import render_cache, session
+from blueprinthub.core import BlueprintWarning
+from blueprinthub.session import (
+    OutputExistsError,
+    RenderError,
+    SessionError,
+    Session,
+    TemplateNotFoundError,
+)
+
+ANSWERS = {"name": "tool", "dep_manager": "pip", "cli_tool": "click", "components": []}
+
+
+def test_session_renders_and_reuses_loaded_templates(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "RENDER_CACHE_DIR", tmp_path / "renders")
+    with Session(hooks=False) as sess:
+        first = sess.render("python_cli", tmp_path / "tool", ANSWERS)
+        loaded = sess._loaded["python_cli"]
+        second = sess.render("python_cli", tmp_path / "other", ANSWERS)
+        assert sess._loaded["python_cli"] is loaded
+
+    assert not first.cached and first.files["tool/cli.py"] > 0
+    assert first.bytes == sum(first.files.values())
+    assert "requirements.txt" in first.files and first.variables["name"] == "tool"
+    assert second.cached and second.files == first.files
+    record = json.loads((tmp_path / "other" / ".blueprint.json").read_text())
+    assert record["template_name"] == "python_cli"
+
+
+def test_session_raises_typed_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(session, "locate_template", lambda name: None)
+    sess = Session(use_cache=False, hooks=False)
+    with pytest.raises(TemplateNotFoundError):
+        sess.render("missing", tmp_path / "out")
+
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "ok.txt").write_text("{{ name }}")
+    (template_path / "bad.txt").write_text("{{ undefined_thing }}")
+    monkeypatch.setattr(session, "locate_template", lambda name: template_path)
+    with pytest.raises(RenderError) as excinfo:
+        sess.render("tpl", tmp_path / "out", {"dep_manager": "pip"})
+    assert excinfo.value.path == "bad.txt"
+    assert not (tmp_path / "out").exists()
+
+    (tmp_path / "out").mkdir()
+    with pytest.raises(OutputExistsError):
+        sess.render("tpl", tmp_path / "out")
+
+
+def test_session_wraps_every_file_failure(tmp_path, monkeypatch):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "a.txt").write_text("{{ name }}")
+    (template_path / "b.bin").write_bytes(b"\xff\xfe{{ name }}")
+    monkeypatch.setattr(session, "locate_template", lambda name: template_path)
+    sess = Session(use_cache=False, hooks=False)
+    with pytest.raises(RenderError) as excinfo:
+        sess.render("tpl", tmp_path / "out", {"dep_manager": "pip"})
+    assert excinfo.value.path == "b.bin"
+    assert not (tmp_path / "out").exists()
+
+    with pytest.raises(SessionError):
+        sess.render("tpl", tmp_path / "out", {"dep_manager": "nope"})
+
+
+def test_session_warns_instead_of_printing(tmp_path, monkeypatch, capsys):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "a.txt").write_text("{{ name }}")
+    (template_path / ".template.yml").write_text("variables: [unclosed\n")
+    monkeypatch.setattr(session, "locate_template", lambda name: template_path)
+    sess = Session(use_cache=False, hooks=False)
+    with pytest.warns(BlueprintWarning, match="Failed to load"):
+        sess.render("tpl", tmp_path / "out", {"dep_manager": "pip"})
+    assert capsys.readouterr().out == ""
+
+    bundle_path = tmp_path / "junk.bphub"
+    bundle_path.write_bytes(b"not a bundle")
+    monkeypatch.setattr(session, "locate_template", lambda name: bundle_path)
+    with pytest.warns(BlueprintWarning), pytest.raises(SessionError):
+        sess.render("junk", tmp_path / "junk")
+    assert capsys.readouterr().out == ""
+
+
+def test_session_records_without_rehashing(tmp_path, monkeypatch):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "a.txt").write_text("{{ name }}")
+    monkeypatch.setattr(session, "locate_template", lambda name: template_path)
+    sess = Session(use_cache=False, hooks=False)
+    sess.render("tpl", tmp_path / "first", {"name": "x", "dep_manager": "pip"})
+
+    def rehash(*args):
+        raise AssertionError("template re-hashed")
+
+    monkeypatch.setattr("blueprinthub.update.template_hash", rehash)
+    monkeypatch.setattr("blueprinthub.update.render_key", rehash)
+    sess.render("tpl", tmp_path / "second", {"name": "x", "dep_manager": "pip"})
+    first, second = (
+        json.loads((tmp_path / name / ".blueprint.json").read_text())
+        for name in ("first", "second")
+    )
+    assert second["render_key"] == first["render_key"]
+    assert second["template_hash"] == first["template_hash"]
+
+
+def test_session_keeps_existing_output_when_answers_are_invalid(tmp_path, monkeypatch):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "a.txt").write_text("{{ name }}")
+    monkeypatch.setattr(session, "locate_template", lambda name: template_path)
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    (output_dir / "mine.txt").write_text("keep me")
+    sess = Session(use_cache=False, hooks=False)
+    with pytest.raises(SessionError):
+        sess.render("tpl", output_dir, {"dep_manager": "nope"}, overwrite=True)
+    assert (output_dir / "mine.txt").read_text() == "keep me"
+
+    sess.render("tpl", output_dir, {"dep_manager": "pip"}, overwrite=True)
+    assert not (output_dir / "mine.txt").exists()
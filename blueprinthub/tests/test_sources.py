@@ -0,0 +1,72 @@
+import io
+import tarfile
+import zipfile
+
+from git import Repo
+
+from blueprinthub.sources import (
+    DirectorySource,
+    GitSource,
+    TarSource,
+    ZipSource,
+    open_source,
+)
+
+FILES = {
+    "app-main/.gitignore": b"*.log\n",
+    "app-main/src/app.py": b"print('app')\n",
+    "app-main/src/debug.log": b"noise\n",
+    "app-main/README.md": b"# app\n",
+}
+
+
+def _tar(path):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        evil = tarfile.TarInfo("../evil.py")
+        evil.size = 1
+        archive.addfile(evil, io.BytesIO(b"x"))
+    return path
+
+
+def test_archive_sources_list_without_extracting_and_strip_top_dir(tmp_path):
+    zip_path = tmp_path / "app.zip"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for name, data in FILES.items():
+            archive.writestr(name, data)
+    for path in (_tar(tmp_path / "app.tar.gz"), zip_path):
+        with open_source(str(path)) as source:
+            assert isinstance(source, (TarSource, ZipSource))
+            assert source.name == "app"
+            tree = source.tree()
+            assert sorted(tree.iter_files()) == [
+                ".gitignore",
+                "README.md",
+                "src/app.py",
+            ]
+            assert source.root is None  # Nothing extracted yet.
+            root = source.checkout(["src/app.py"])
+            assert (root / "src" / "app.py").read_bytes() == b"print('app')\n"
+            assert not (root / "README.md").exists()
+        assert not root.exists()
+
+
+def test_open_source_dispatches_directories_and_git_remotes(tmp_path):
+    repo_dir = tmp_path / "demo-app"
+    repo = Repo.init(repo_dir)
+    (repo_dir / "main.py").write_text("print('demo-app')\n")
+    repo.index.add(["main.py"])
+    repo.index.commit("init")
+
+    with open_source(str(repo_dir)) as source:
+        assert isinstance(source, DirectorySource)
+        assert [*source.tree().iter_files()] == ["main.py"]
+        assert source.authors()
+
+    with open_source(repo_dir.as_uri()) as source:
+        assert isinstance(source, GitSource)
+        assert source.name == "demo-app"
+        assert (source.checkout(["main.py"]) / "main.py").exists()
@@ -0,0 +1,104 @@
+import os
+import pytest
+from blueprinthub import store
+from blueprinthub.core import BlueprintWarning
+
+
+def test_store_tree_shares_identical_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "BLOBS_DIR", tmp_path / "templates" / ".blobs")
+    src = tmp_path / "project"
+    src.mkdir()
+    (src / "LICENSE").write_text("MIT")
+    (src / "README.md").write_text("hello")
+
+    store.store_tree(src, tmp_path / "templates" / "a")
+    store.store_tree(src, tmp_path / "templates" / "b")
+
+    license_a = tmp_path / "templates" / "a" / "LICENSE"
+    license_b = tmp_path / "templates" / "b" / "LICENSE"
+    assert license_a.read_text() == "MIT"
+    assert os.path.samefile(license_a, license_b)
+    assert store.store_stats()["blobs"] == 2
+
+
+def test_collect_garbage_removes_unreferenced_blobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "BLOBS_DIR", tmp_path / ".blobs")
+    store.write_file(tmp_path / "t" / "keep.txt", b"keep")
+    store.write_file(tmp_path / "t" / "drop.txt", b"drop")
+    (tmp_path / "t" / "drop.txt").unlink()
+
+    removed, freed = store.collect_garbage()
+    assert (removed, freed) == (1, 4)
+    assert (tmp_path / "t" / "keep.txt").read_bytes() == b"keep"
+
+
+@pytest.fixture
+def templates_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "TEMPLATES_DIR", tmp_path / "templates")
+    monkeypatch.setattr(store, "BLOBS_DIR", tmp_path / "templates" / ".blobs")
+    monkeypatch.setattr(store, "LOCKS_DIR", tmp_path / "templates" / ".locks")
+    monkeypatch.setattr(store, "VERSIONS_DIR", tmp_path / "templates" / ".versions")
+    return tmp_path / "templates"
+
+
+def test_template_transaction_replaces_whole_template_or_nothing(templates_dir):
+    with store.template_transaction("demo") as staging:
+        store.write_file(staging / "a.txt", b"one")
+        store.write_file(staging / "old.txt", b"stale")
+    with pytest.raises(RuntimeError):
+        with store.template_transaction("demo") as staging:
+            store.write_file(staging / "a.txt", b"half-written")
+            raise RuntimeError("import failed")
+    assert (templates_dir / "demo" / "a.txt").read_bytes() == b"one"
+
+    with store.template_transaction("demo") as staging:
+        store.write_file(staging / "a.txt", b"two")
+    assert sorted(p.name for p in (templates_dir / "demo").iterdir()) == ["a.txt"]
+    assert (templates_dir / "demo" / "a.txt").read_bytes() == b"two"
+    assert not [p for p in templates_dir.iterdir() if p.name.startswith(".staging")]
+
+
+def test_readers_share_the_lock_and_writers_wait(templates_dir):
+    import threading
+
+    (templates_dir / "demo").mkdir(parents=True)
+    published = threading.Event()
+
+    def write():
+        with store.template_transaction("demo") as staging:
+            store.write_file(staging / "new.txt", b"new")
+        published.set()
+
+    with pytest.warns(BlueprintWarning, match="Waiting for template 'demo'"):
+        with store.template_lock(templates_dir / "demo"):
+            with store.template_lock(templates_dir / "demo"):  # Readers never block.
+                writer = threading.Thread(target=write)
+                writer.start()
+                assert not published.wait(0.3)
+        writer.join(5)
+    assert published.is_set()
+    assert (templates_dir / "demo" / "new.txt").read_bytes() == b"new"
+
+
+def test_each_publish_keeps_a_version_sharing_blobs(templates_dir, monkeypatch):
+    from blueprinthub import core
+
+    monkeypatch.setattr(core, "TEMPLATES_DIR", templates_dir)
+    monkeypatch.setattr(core, "VERSIONS_DIR", templates_dir / ".versions")
+    (templates_dir / "demo").mkdir(parents=True)
+    (templates_dir / "demo" / "a.txt").write_text("legacy")
+
+    for content in (b"one", b"two"):
+        with store.template_transaction("demo") as staging:
+            store.write_file(staging / "a.txt", content)
+            store.write_file(staging / "LICENSE", b"MIT")
+
+    assert store.template_versions("demo") == [1, 2, 3]
+    assert store.template_version(templates_dir / "demo") == 3
+    v1, v2 = core.locate_template("demo@1"), core.locate_template("demo@2")
+    assert store.template_version(v2) == 2
+    assert (v1 / "a.txt").read_text() == "legacy"
+    assert (v2 / "a.txt").read_text() == "one"
+    assert os.path.samefile(v2 / "LICENSE", templates_dir / "demo" / "LICENSE")
+    assert core.locate_template("demo@latest") == templates_dir / "demo"
+    assert core.locate_template("demo@9") is None
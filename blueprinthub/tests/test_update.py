@@ -0,0 +1,121 @@
+import json
+import pytest
+from blueprinthub import core, layers, render_cache, update
+from blueprinthub.update import (
+    RECORD_FILE,
+    render_project,
+    update_fleet,
+    update_project,
+    write_project_record,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "RENDER_CACHE_DIR", tmp_path / "renders")
+    monkeypatch.setattr(update, "BYTECODE_DIR", tmp_path / "bytecode")
+    monkeypatch.setattr(layers, "RESOLVED_DIR", tmp_path / "resolved")
+    monkeypatch.setattr(
+        core, "_metadata_cache", core._MetadataCache(tmp_path / "metadata.marshal")
+    )
+
+
+def test_update_merges_user_and_template_changes(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text("# {{ name }}\nimport os\n\n\nprint('hi')\n")
+    (template_path / "README.md").write_text("readme\n")
+    project_dir = tmp_path / "demo"
+    variables = {"name": "demo", "dep_manager": "pip"}
+    render_project(template_path, project_dir, variables)
+    write_project_record(project_dir, "tpl", template_path, variables)
+    assert update_project(project_dir, template_path) is None
+
+    (project_dir / "app.py").write_text("# demo\nimport os\n\n\nprint('hi')\nmain()")
+    (template_path / "app.py").write_text("# {{ name }}\nimport sys\n\n\nprint('hi')\n")
+    (template_path / "NEW.md").write_text("new\n")
+
+    result = update_project(project_dir, template_path)
+    assert result.merged == ["app.py"]
+    assert "NEW.md" in result.updated
+    assert not result.conflicts
+    assert (project_dir / "app.py").read_text() == (
+        "# demo\nimport sys\n\n\nprint('hi')\nmain()"
+    )
+    record = json.loads((project_dir / RECORD_FILE).read_text())
+    assert "NEW.md" in record["files"]
+    assert update_project(project_dir, template_path) is None
+
+
+def test_update_fleet_reports_per_project_status(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text("# {{ name }}\nprint('v1')\n")
+    variables = {"name": "demo", "dep_manager": "pip"}
+    projects = []
+    for name in ("one", "two"):
+        project_dir = tmp_path / name
+        render_project(template_path, project_dir, variables)
+        write_project_record(project_dir, "tpl", template_path, variables)
+        projects.append(project_dir)
+    (projects[1] / "app.py").write_text("# demo\nprint('mine')")
+    (template_path / "app.py").write_text("# {{ name }}\nprint('v2')\n")
+
+    entries = update_fleet(projects + [tmp_path / "missing"], template_path, jobs=2)
+    assert [entry.status for entry in entries] == ["changed", "conflicts", "failed"]
+    assert (projects[0] / "app.py").read_text() == "# demo\nprint('v2')"
+    assert any((tmp_path / "bytecode").iterdir())
+
+
+def test_update_fleet_keeps_going_after_unexpected_errors(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text("v1\n")
+    projects = []
+    for name, count in (("one", 1), ("zero", 0)):
+        variables = {"name": name, "dep_manager": "pip", "count": count}
+        project_dir = tmp_path / name
+        render_project(template_path, project_dir, variables)
+        write_project_record(project_dir, "tpl", template_path, variables)
+        projects.append(project_dir)
+    (template_path / "app.py").write_text("{{ 10 // count }}\n")
+
+    ok, broken = update_fleet(projects, template_path, jobs=2)
+    assert ok.status == "changed"
+    assert broken.status == "failed" and "ZeroDivisionError" in broken.error
+
+
+def test_update_renders_sandboxed_templates_in_the_sandbox(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text("v1\n")
+    variables = {"name": "demo", "dep_manager": "pip"}
+    project_dir = tmp_path / "demo"
+    render_project(template_path, project_dir, variables)
+    write_project_record(project_dir, "tpl", template_path, variables)
+    (template_path / ".template.yml").write_text("sandbox: true\n")
+    (template_path / "app.py").write_text("{{ ''.__class__.__mro__ }}\n")
+
+    [entry] = update_fleet([project_dir], template_path, hooks=False)
+    assert entry.status == "failed"
+    assert (project_dir / "app.py").read_text() == "v1"
+
+
+def test_update_fleet_isolates_broken_templates(tmp_path, monkeypatch):
+    variables = {"name": "demo", "dep_manager": "pip"}
+    templates = {}
+    for name in ("binary", "broken", "good"):
+        template_path = templates[name] = tmp_path / "templates" / name
+        template_path.mkdir(parents=True)
+        (template_path / "app.py").write_text("v1\n")
+        project_dir = tmp_path / name
+        render_project(template_path, project_dir, variables)
+        write_project_record(project_dir, name, template_path, variables)
+        (template_path / "app.py").write_text("v2\n")
+    (templates["binary"] / "logo.png").write_bytes(b"\x89PNG\r\n")
+    (templates["broken"] / ".template.yml").write_text("extends: no-such-layer\n")
+    monkeypatch.setattr("blueprinthub.update.locate_template", templates.get)
+
+    entries = update_fleet([tmp_path / name for name in templates], jobs=2)
+    assert [entry.status for entry in entries] == ["failed", "failed", "changed"]
+    assert "cannot be resolved" in entries[1].error
@@ -0,0 +1,73 @@
+import pytest
+import typer
+from blueprinthub.watch import IncrementalRenderer, check_watchable, make_watcher
+
+
+def test_renders_only_affected_files(tmp_path):
+    template_path = tmp_path / "tpl"
+    (template_path / "{{ name }}").mkdir(parents=True)
+    (template_path / "header.txt").write_text("v1")
+    (template_path / "{{ name }}" / "app.py").write_text(
+        "{% include 'header.txt' %} {{ name }}"
+    )
+    (template_path / "other.txt").write_text("other")
+    preview = tmp_path / "preview"
+    renderer = IncrementalRenderer(
+        template_path, preview, {"name": "demo", "dep_manager": "pip"}
+    )
+    assert len(renderer.render_all()) == 3
+    assert (preview / "requirements.txt").exists()
+
+    (template_path / "header.txt").write_text("v2")
+    rendered = renderer.render_changed({"header.txt"})
+    assert rendered == ["header.txt", "{{ name }}/app.py"]
+    assert (preview / "demo" / "app.py").read_text() == "v2 demo"
+
+    (template_path / "other.txt").unlink()
+    assert renderer.render_changed({"other.txt"}) == []
+    assert not (preview / "other.txt").exists()
+
+
+def test_watcher_reports_changed_paths(tmp_path):
+    (tmp_path / "sub").mkdir()
+    watcher = make_watcher(tmp_path)
+    try:
+        (tmp_path / "sub" / "a.txt").write_text("x")
+        assert "sub/a.txt" in watcher.read(timeout=2.0)
+    finally:
+        watcher.close()
+
+
+def test_check_watchable_refuses_sandboxed_templates(tmp_path):
+    (tmp_path / ".template.yml").write_text("sandbox: true\n")
+    with pytest.raises(typer.Exit):
+        check_watchable(tmp_path)
+
+
+def test_editor_files_are_not_rendered(tmp_path):
+    template_path = tmp_path / "tpl"
+    template_path.mkdir()
+    (template_path / "app.py").write_text("{{ name }}")
+    for name in (".app.py.swp", "app.py~", "4913"):
+        (template_path / name).write_text("junk {{")
+    preview = tmp_path / "preview"
+    renderer = IncrementalRenderer(template_path, preview, {"name": "demo"})
+    assert renderer.render_all() == ["app.py"]
+    assert renderer.render_changed({".app.py.swp", "4913", "app.py"}) == ["app.py"]
+    assert not (preview / "4913").exists()
+
+
+def test_watch_command_accepts_a_directory(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+
+    from blueprinthub import cli
+
+    calls = []
+    monkeypatch.setattr(cli, "watch_template", lambda *args: calls.append(args))
+    (tmp_path / "my-tpl").mkdir()
+    result = CliRunner().invoke(
+        cli.app, ["watch", str(tmp_path / "my-tpl"), "--preview", str(tmp_path / "p")]
+    )
+    assert result.exit_code == 0, result.output
+    [(template_path, preview, variables)] = calls
+    assert template_path == tmp_path / "my-tpl" and variables["name"] == "my-tpl"
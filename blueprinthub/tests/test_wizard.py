@@ -21,3 +21,41 @@ def test_wizard_dry_run():
         ],
     ):
         run_create_wizard(dry_run=True)
+
+
+def test_wizard_saved_template_can_be_created_from(tmp_path, monkeypatch):
+    from blueprinthub import core, render_cache, store
+    from blueprinthub.templates import create_project
+
+    templates_dir = tmp_path / "templates"
+    for module in (core, store):
+        monkeypatch.setattr(module, "TEMPLATES_DIR", templates_dir)
+        monkeypatch.setattr(module, "VERSIONS_DIR", templates_dir / ".versions")
+    monkeypatch.setattr(store, "BLOBS_DIR", templates_dir / ".blobs")
+    monkeypatch.setattr(store, "LOCKS_DIR", templates_dir / ".locks")
+    monkeypatch.setattr(render_cache, "RENDER_CACHE_DIR", tmp_path / "renders")
+    monkeypatch.chdir(tmp_path)
+    with patch(
+        "blueprinthub.wizard._ask_question",
+        side_effect=[
+            "Python CLI Tool",
+            "Basic",
+            "pip",
+            [],
+            "testproj",
+            False,
+            "testcli",
+            "Test",
+            "MIT",
+            "0.1.0",
+            True,  # save_template
+            "saved",
+        ],
+    ):
+        run_create_wizard()
+
+    assert (tmp_path / "testproj" / ".blueprint" / "base.bphub").exists()
+    assert not (templates_dir / "saved" / ".blueprint").exists()
+    assert not (templates_dir / "saved" / ".blueprint.json").exists()
+    create_project("saved", tmp_path / "again", hooks=False)
+    assert (tmp_path / "again" / "testcli" / "cli.py").exists()